@@ -0,0 +1,23 @@
+-- ============================================================================
+-- Create BJCP Style Sync State
+-- Migration: 048_create_bjcp_style_sync_state.sql
+--
+-- Stores a content hash per BeerStyle so populate_bjcp_data.py --sync can
+-- skip styles whose BJCP data has not changed since the last sync
+-- ============================================================================
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS "BJCP_StyleSyncState" (
+    "StyleId" uuid PRIMARY KEY,
+    "BJCPNumber" varchar(10) NOT NULL,
+    "ContentHash" char(64) NOT NULL, -- sha256 of the transformed style and its child rows
+    "Synced" timestamptz DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY ("StyleId") REFERENCES "BeerStyle"("StyleId") ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS "IX_BJCP_StyleSyncState_BJCPNumber" ON "BJCP_StyleSyncState"("BJCPNumber");
+
+GRANT SELECT, INSERT, UPDATE, DELETE ON "BJCP_StyleSyncState" TO fermentum_app;
+
+COMMIT;
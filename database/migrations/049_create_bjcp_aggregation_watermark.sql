@@ -0,0 +1,31 @@
+-- ============================================================================
+-- Create BJCP Aggregation Watermark
+-- Migration: 049_create_bjcp_aggregation_watermark.sql
+--
+-- Records, per popularity period and for style analytics, the latest recipe
+-- and brew session activity aggregate_bjcp_analytics.py has folded into
+-- BJCP_StylePopularity and BJCP_StyleAnalytics, and indexes the Updated
+-- columns it scans so each run only reads activity newer than its watermark
+-- ============================================================================
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS "BJCP_AggregationWatermark" (
+    "Period" varchar(20) PRIMARY KEY, -- 'monthly', 'quarterly', 'yearly', 'analytics'
+    "Watermark" timestamp NOT NULL, -- latest Updated value aggregated
+    "StylesAggregated" int DEFAULT 0, -- style rows refreshed by the last run
+    "Updated" timestamptz DEFAULT CURRENT_TIMESTAMP
+);
+
+GRANT SELECT, INSERT, UPDATE, DELETE ON "BJCP_AggregationWatermark" TO fermentum_app;
+
+-- Activity lookups used by the incremental aggregation
+CREATE INDEX IF NOT EXISTS "IX_Recipe_Updated" ON "Recipe"("Updated");
+CREATE INDEX IF NOT EXISTS "IX_RecipeBrewSession_RecipeId" ON "RecipeBrewSession"("RecipeId");
+CREATE INDEX IF NOT EXISTS "IX_RecipeBrewSession_Updated" ON "RecipeBrewSession"("Updated");
+CREATE INDEX IF NOT EXISTS "IX_RecipeGrain_Updated" ON "RecipeGrain"("Updated");
+CREATE INDEX IF NOT EXISTS "IX_RecipeHop_Updated" ON "RecipeHop"("Updated");
+CREATE INDEX IF NOT EXISTS "IX_RecipeYeast_Updated" ON "RecipeYeast"("Updated");
+CREATE INDEX IF NOT EXISTS "IX_RecipeAdditive_Updated" ON "RecipeAdditive"("Updated");
+
+COMMIT;
@@ -0,0 +1,23 @@
+-- ============================================================================
+-- Create BJCP Load Progress
+-- Migration: 050_create_bjcp_load_progress.sql
+--
+-- Ledger of the phases and style chunks a populate_bjcp_data.py --resume load
+-- has completed, so a rerun after a failure skips them. Rows are keyed by the
+-- catalog being loaded and removed once its load finishes
+-- ============================================================================
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS "BJCP_LoadProgress" (
+    "SourceKey" varchar(64) NOT NULL, -- catalog file digest, transformer version and chunk size
+    "Phase" varchar(20) NOT NULL, -- 'clear', 'styles', 'sort_orders', 'comparisons'
+    "ChunkIndex" int NOT NULL DEFAULT 0, -- chunk of styles, for the 'styles' phase
+    "StylesLoaded" int DEFAULT 0,
+    "Completed" timestamptz DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY ("SourceKey", "Phase", "ChunkIndex")
+);
+
+GRANT SELECT, INSERT, UPDATE, DELETE ON "BJCP_LoadProgress" TO fermentum_app;
+
+COMMIT;
@@ -0,0 +1,35 @@
+-- ============================================================================
+-- Make BJCP Foreign Keys Deferrable
+-- Migration: 051_make_bjcp_foreign_keys_deferrable.sql
+--
+-- Declares the foreign keys between the tables a BJCP catalog load writes
+-- DEFERRABLE INITIALLY IMMEDIATE. Normal statements still check them
+-- immediately; a bulk load (populate_bjcp_data.py --bulk or a migration
+-- generated with --bulk) runs SET CONSTRAINTS ALL DEFERRED so they are
+-- checked in one batch after the rows are in instead of after every row
+-- ============================================================================
+
+BEGIN;
+
+DO $$
+DECLARE
+    fk record;
+BEGIN
+    FOR fk IN
+        SELECT c.conrelid::regclass AS table_name, c.conname
+        FROM pg_constraint c
+        JOIN pg_class t ON t.oid = c.conrelid
+        JOIN pg_class r ON r.oid = c.confrelid
+        WHERE c.contype = 'f'
+          AND NOT c.condeferrable
+          AND t.relnamespace = current_schema()::regnamespace
+          AND t.relname IN ('BeerStyle', 'BJCP_StyleTagMapping', 'BJCP_StyleCharacteristics',
+                            'BJCP_CommercialExample', 'BJCP_StyleJudging', 'BJCP_StyleComparison')
+          AND r.relname IN ('BeerStyle', 'BJCP_BeerCategory', 'BJCP_StyleTag')
+    LOOP
+        EXECUTE format('ALTER TABLE %s ALTER CONSTRAINT %I DEFERRABLE INITIALLY IMMEDIATE',
+                       fk.table_name, fk.conname);
+    END LOOP;
+END $$;
+
+COMMIT;
@@ -0,0 +1,39 @@
+-- ============================================================================
+-- Create BJCP Brewery
+-- Migration: 052_create_bjcp_brewery.sql
+--
+-- Breweries of the BJCP commercial examples, stored once and referenced from
+-- BJCP_CommercialExample. populate_bjcp_data.py splits every example into
+-- brewery and beer with its brewery gazetteer; BreweryName on the example is
+-- kept as the brewery's display name for existing readers
+-- ============================================================================
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS "BJCP_Brewery" (
+    "BreweryId" uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    "BreweryKey" varchar(100) NOT NULL UNIQUE, -- normalized name the gazetteer matches, e.g. 'samuel smith'
+    "BreweryName" varchar(100) NOT NULL,
+    "SortOrder" int,
+    "Created" timestamptz DEFAULT CURRENT_TIMESTAMP
+);
+
+ALTER TABLE "BJCP_CommercialExample" ADD COLUMN IF NOT EXISTS "BreweryId" uuid;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'FK_BJCP_CommercialExample_Brewery') THEN
+        -- Deferrable like the other catalog foreign keys (migration 051), for bulk loads
+        ALTER TABLE "BJCP_CommercialExample" ADD CONSTRAINT "FK_BJCP_CommercialExample_Brewery"
+            FOREIGN KEY ("BreweryId") REFERENCES "BJCP_Brewery"("BreweryId") ON DELETE SET NULL
+            DEFERRABLE INITIALLY IMMEDIATE;
+    END IF;
+END $$;
+
+-- "Find styles by brewery" reads the style ids straight from the index
+CREATE INDEX IF NOT EXISTS "IX_BJCP_CommercialExample_BreweryId"
+    ON "BJCP_CommercialExample"("BreweryId", "StyleId");
+
+GRANT SELECT, INSERT, UPDATE, DELETE ON "BJCP_Brewery" TO fermentum_app;
+
+COMMIT;
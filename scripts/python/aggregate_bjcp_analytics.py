@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Incrementally materialize BJCP_StylePopularity and BJCP_StyleAnalytics.
+Each period (monthly, quarterly, yearly) and the style analytics snapshot keep
+a watermark in BJCP_AggregationWatermark: the latest Recipe, brew session or
+recipe ingredient Updated value already aggregated. A run only re-aggregates
+the styles and periods touched since then, with set-based SQL, and upserts the
+results, so its cost follows new activity rather than total history.
+
+Updated defaults to the start time of the writing transaction, so a recipe
+saved by a transaction that started before a run and committed after it
+carries an Updated older than that run's watermark. Each run therefore
+re-reads an overlap before its watermark; the upserts make that idempotent.
+
+Only the current style and dates of a changed row are known, so a recipe moved
+to another style leaves its old style's rows stale until the next --full run.
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import time
+
+import psycopg2
+
+# Period name -> (date_trunc unit, period length)
+PERIODS = {
+    'monthly': ('month', '1 month'),
+    'quarterly': ('quarter', '3 months'),
+    'yearly': ('year', '1 year')
+}
+ANALYTICS = 'analytics'
+
+# Activity re-read before each watermark, to catch transactions that committed after the last run
+DEFAULT_OVERLAP = datetime.timedelta(minutes=15)
+
+# Activity change, in percent, beyond which a trend counts as increasing or decreasing
+TREND_THRESHOLD = 5.0
+# TrendPercentage is decimal(5,2)
+TREND_LIMIT = 999.99
+
+# Most-used ingredients kept per style in the Common* columns
+COMMON_INGREDIENT_COUNT = 10
+
+# Analytics column -> (junction table, ingredient table, ingredient id column)
+INGREDIENT_SOURCES = {
+    'CommonGrains': ('RecipeGrain', 'Grain', 'GrainId'),
+    'CommonHops': ('RecipeHop', 'Hop', 'HopId'),
+    'CommonYeasts': ('RecipeYeast', 'Yeast', 'YeastId'),
+    'CommonAdditives': ('RecipeAdditive', 'Additive', 'AdditiveId')
+}
+
+# Analytics column -> (Recipe column, decimal places)
+AVERAGE_COLUMNS = {
+    'AvgOG': ('EstimatedOG', 3),
+    'AvgFG': ('EstimatedFG', 3),
+    'AvgABV': ('EstimatedABV', 2),
+    'AvgIBU': ('EstimatedIBU', 1),
+    'AvgSRM': ('EstimatedSRM', 1),
+    'AvgEfficiency': ('Efficiency', 2),
+    'AvgBatchSize': ('BatchSize', 3),
+    'AvgCostPerBatch': ('EstimatedCostPerBatch', 2),
+    'AvgCostPerGallon': ('EstimatedCostPerGallon', 2),
+    'AvgCostPer12oz': ('EstimatedCostPer12oz', 2)
+}
+
+def updated_window(alias, since):
+    """SQL condition selecting rows of alias updated inside the (since, until] window."""
+    if since is None:
+        return f'{alias}."Updated" <= %(until)s OR {alias}."Updated" IS NULL'
+    return f'{alias}."Updated" > %(since)s AND {alias}."Updated" <= %(until)s'
+
+def latest_activity(cur, tables):
+    """The newest Updated value across tables, read from their Updated indexes."""
+    cur.execute('SELECT GREATEST(' + ', '.join(f'(SELECT max("Updated") FROM "{table}")' for table in tables) + ')')
+    return cur.fetchone()[0]
+
+def read_watermark(cur, period):
+    cur.execute('SELECT "Watermark" FROM "BJCP_AggregationWatermark" WHERE "Period" = %s', (period,))
+    row = cur.fetchone()
+    return row[0] if row else None
+
+def write_watermark(cur, period, watermark, style_count):
+    cur.execute('''
+        INSERT INTO "BJCP_AggregationWatermark" ("Period", "Watermark", "StylesAggregated")
+        VALUES (%s, %s, %s)
+        ON CONFLICT ("Period") DO UPDATE SET
+            "Watermark" = EXCLUDED."Watermark",
+            "StylesAggregated" = EXCLUDED."StylesAggregated",
+            "Updated" = CURRENT_TIMESTAMP
+    ''', (period, watermark, style_count))
+
+def aggregate_popularity(cur, period, since, until):
+    """Re-aggregate BJCP_StylePopularity for the style periods touched in (since, until].
+
+    Returns the number of (style, period date) pairs refreshed.
+    """
+    unit, length = PERIODS[period]
+    params = {'period': period, 'since': since, 'until': until, 'length': length,
+              'threshold': TREND_THRESHOLD, 'limit': TREND_LIMIT}
+
+    # Style periods whose recipes or brew sessions changed
+    cur.execute(f'''
+        CREATE TEMP TABLE touched_periods ON COMMIT DROP AS
+        SELECT "StyleId", date_trunc('{unit}', "Created")::date AS "PeriodDate"
+        FROM "Recipe" r
+        WHERE r."StyleId" IS NOT NULL AND r."Created" IS NOT NULL AND ({updated_window('r', since)})
+        UNION
+        SELECT r."StyleId", date_trunc('{unit}', s."BrewDate")::date
+        FROM "RecipeBrewSession" s
+        JOIN "Recipe" r ON r."RecipeId" = s."RecipeId"
+        WHERE r."StyleId" IS NOT NULL AND ({updated_window('s', since)})
+    ''', params)
+    touched = cur.rowcount
+    if not touched:
+        return 0
+    cur.execute('ALTER TABLE touched_periods ADD PRIMARY KEY ("StyleId", "PeriodDate")')
+    cur.execute('ANALYZE touched_periods')
+
+    # Recount only the touched pairs; styles without activity left in a period lose their row
+    cur.execute('''
+        CREATE TEMP TABLE period_counts ON COMMIT DROP AS
+        WITH activity AS (
+            SELECT t."StyleId", t."PeriodDate", r."TenantId", 1 AS "Recipes", 0 AS "Sessions"
+            FROM touched_periods t
+            JOIN "Recipe" r ON r."StyleId" = t."StyleId"
+             AND r."Created" >= t."PeriodDate" AND r."Created" < t."PeriodDate" + %(length)s::interval
+            UNION ALL
+            SELECT t."StyleId", t."PeriodDate", s."TenantId", 0, 1
+            FROM touched_periods t
+            JOIN "Recipe" r ON r."StyleId" = t."StyleId"
+            JOIN "RecipeBrewSession" s ON s."RecipeId" = r."RecipeId"
+             AND s."BrewDate" >= t."PeriodDate" AND s."BrewDate" < t."PeriodDate" + %(length)s::interval
+        )
+        SELECT t."StyleId", t."PeriodDate",
+               COALESCE(sum(a."Recipes"), 0)::int AS "RecipeCount",
+               COALESCE(sum(a."Sessions"), 0)::int AS "BrewSessionCount",
+               count(DISTINCT a."TenantId")::int AS "TenantCount"
+        FROM touched_periods t
+        LEFT JOIN activity a ON a."StyleId" = t."StyleId" AND a."PeriodDate" = t."PeriodDate"
+        GROUP BY t."StyleId", t."PeriodDate"
+    ''', params)
+
+    cur.execute('''
+        DELETE FROM "BJCP_StylePopularity" p
+        USING period_counts c
+        WHERE p."StyleId" = c."StyleId" AND p."Period" = %(period)s AND p."PeriodDate" = c."PeriodDate"
+          AND c."RecipeCount" + c."BrewSessionCount" = 0
+    ''', params)
+    cur.execute('''
+        INSERT INTO "BJCP_StylePopularity" ("StyleId", "Period", "PeriodDate", "RecipeCount", "BrewSessionCount", "TenantCount")
+        SELECT "StyleId", %(period)s, "PeriodDate", "RecipeCount", "BrewSessionCount", "TenantCount"
+        FROM period_counts
+        WHERE "RecipeCount" + "BrewSessionCount" > 0
+        ON CONFLICT ("StyleId", "Period", "PeriodDate") DO UPDATE SET
+            "RecipeCount" = EXCLUDED."RecipeCount",
+            "BrewSessionCount" = EXCLUDED."BrewSessionCount",
+            "TenantCount" = EXCLUDED."TenantCount"
+    ''', params)
+
+    # A touched period changes its own trend and the trend of the period after it
+    cur.execute('''
+        WITH trend_periods AS (
+            SELECT "StyleId", "PeriodDate" FROM touched_periods
+            UNION
+            SELECT "StyleId", ("PeriodDate" + %(length)s::interval)::date FROM touched_periods
+        ),
+        trends AS (
+            SELECT p."PopularityId",
+                   p."RecipeCount" + p."BrewSessionCount" AS "Current",
+                   previous."RecipeCount" + previous."BrewSessionCount" AS "Previous"
+            FROM trend_periods t
+            JOIN "BJCP_StylePopularity" p
+              ON p."StyleId" = t."StyleId" AND p."Period" = %(period)s AND p."PeriodDate" = t."PeriodDate"
+            LEFT JOIN "BJCP_StylePopularity" previous
+              ON previous."StyleId" = p."StyleId" AND previous."Period" = p."Period"
+             AND previous."PeriodDate" = (p."PeriodDate" - %(length)s::interval)::date
+        ),
+        changes AS (
+            SELECT "PopularityId",
+                   LEAST(round(100.0 * ("Current" - "Previous") / "Previous", 2), %(limit)s) AS "Change"
+            FROM trends
+            WHERE "Previous" > 0
+            UNION ALL
+            SELECT "PopularityId", NULL
+            FROM trends
+            WHERE "Previous" IS NULL
+        )
+        UPDATE "BJCP_StylePopularity" p SET
+            "TrendPercentage" = c."Change",
+            "TrendDirection" = CASE
+                WHEN c."Change" IS NULL OR c."Change" > %(threshold)s THEN 'increasing'
+                WHEN c."Change" < -%(threshold)s THEN 'decreasing'
+                ELSE 'stable'
+            END
+        FROM changes c
+        WHERE p."PopularityId" = c."PopularityId"
+    ''', params)
+
+    # Ranks are relative to every style in the period, so rerank whole touched periods
+    cur.execute('''
+        WITH ranked AS (
+            SELECT "PopularityId",
+                   rank() OVER (PARTITION BY "PeriodDate"
+                                ORDER BY "RecipeCount" + "BrewSessionCount" DESC, "TenantCount" DESC) AS "Rank"
+            FROM "BJCP_StylePopularity"
+            WHERE "Period" = %(period)s
+              AND "PeriodDate" IN (SELECT DISTINCT "PeriodDate" FROM touched_periods)
+        )
+        UPDATE "BJCP_StylePopularity" p SET "Rank" = r."Rank"
+        FROM ranked r
+        WHERE p."PopularityId" = r."PopularityId" AND p."Rank" IS DISTINCT FROM r."Rank"
+    ''', params)
+    return touched
+
+def ingredient_usage_sql(column, junction_table, ingredient_table, id_column):
+    """CTE body building a [{"name", "usage_percent"}] array per touched style."""
+    return f'''
+        SELECT "StyleId", jsonb_agg(
+                   jsonb_build_object('name', "Name", 'usage_percent', round(100.0 * "Recipes" / "Sampled", 1))
+                   ORDER BY "Recipes" DESC, "Name"
+               ) AS "{column}"
+        FROM (
+            SELECT r."StyleId", i."Name", count(DISTINCT r."RecipeId") AS "Recipes", s."Sampled",
+                   row_number() OVER (PARTITION BY r."StyleId"
+                                      ORDER BY count(DISTINCT r."RecipeId") DESC, i."Name") AS "Position"
+            FROM sampled s
+            JOIN "Recipe" r ON r."StyleId" = s."StyleId"
+            JOIN "{junction_table}" ri ON ri."RecipeId" = r."RecipeId"
+            JOIN "{ingredient_table}" i ON i."{id_column}" = ri."{id_column}"
+            GROUP BY r."StyleId", i."Name", s."Sampled"
+        ) usage
+        WHERE "Position" <= {COMMON_INGREDIENT_COUNT}
+        GROUP BY "StyleId"'''
+
+def aggregate_analytics(cur, since, until):
+    """Write today's BJCP_StyleAnalytics row for every style whose recipes changed in (since, until].
+
+    Returns the number of styles refreshed.
+    """
+    params = {'since': since, 'until': until}
+    sources = [f'''
+        SELECT r."StyleId" FROM "Recipe" r
+        WHERE r."StyleId" IS NOT NULL AND ({updated_window('r', since)})''']
+    sources += [f'''
+        SELECT r."StyleId" FROM "{junction_table}" ri
+        JOIN "Recipe" r ON r."RecipeId" = ri."RecipeId"
+        WHERE r."StyleId" IS NOT NULL AND ({updated_window('ri', since)})'''
+                for junction_table, _, _ in INGREDIENT_SOURCES.values()]
+    cur.execute('CREATE TEMP TABLE touched_styles ON COMMIT DROP AS' + '\nUNION'.join(sources), params)
+    touched = cur.rowcount
+    if not touched:
+        return 0
+    cur.execute('ANALYZE touched_styles')
+
+    averages = ',\n'.join(f'round(avg(r."{source}"), {places}) AS "{column}"'
+                          for column, (source, places) in AVERAGE_COLUMNS.items())
+    usage = ',\n'.join(f'"{column}" AS ({ingredient_usage_sql(column, *source)})'
+                       for column, source in INGREDIENT_SOURCES.items())
+    columns = list(AVERAGE_COLUMNS) + list(INGREDIENT_SOURCES)
+    column_list = ', '.join(f'"{column}"' for column in columns)
+    ingredient_values = ', '.join(f'''COALESCE("{column}"."{column}", '[]'::jsonb)''' for column in INGREDIENT_SOURCES)
+    ingredient_joins = '\n'.join(f'LEFT JOIN "{column}" ON "{column}"."StyleId" = s."StyleId"'
+                                 for column in INGREDIENT_SOURCES)
+    assignments = ',\n'.join(f'"{column}" = EXCLUDED."{column}"' for column in ['RecipesSampled'] + columns)
+
+    cur.execute(f'''
+        WITH sampled AS (
+            SELECT r."StyleId", count(*) AS "Sampled", {averages}
+            FROM touched_styles t
+            JOIN "Recipe" r ON r."StyleId" = t."StyleId"
+            GROUP BY r."StyleId"
+        ),
+        {usage}
+        INSERT INTO "BJCP_StyleAnalytics" ("StyleId", "AnalysisDate", "RecipesSampled", {column_list})
+        SELECT s."StyleId", CURRENT_DATE, s."Sampled",
+               {', '.join(f's."{column}"' for column in AVERAGE_COLUMNS)}, {ingredient_values}
+        FROM sampled s
+        {ingredient_joins}
+        ON CONFLICT ("StyleId", "AnalysisDate") DO UPDATE SET
+        {assignments}
+    ''', params)
+    return touched
+
+def aggregate(db_config, periods, full=False, overlap=DEFAULT_OVERLAP):
+    """Bring each period's popularity rows (and the analytics snapshot) up to date.
+
+    Every period is aggregated in its own transaction together with its new
+    watermark, so an interrupted run resumes where it stopped. Activity
+    updated up to overlap before the watermark is aggregated again, so rows
+    whose transaction committed after the last run are not missed. With
+    full, the watermark is ignored and the period is rebuilt from all activity.
+    """
+    conn = psycopg2.connect(**db_config)
+    cur = conn.cursor()
+    started = time.perf_counter()
+
+    try:
+        for period in periods:
+            period_started = time.perf_counter()
+            if period == ANALYTICS:
+                tables = ['Recipe'] + [source[0] for source in INGREDIENT_SOURCES.values()]
+            else:
+                tables = ['Recipe', 'RecipeBrewSession']
+
+            watermark = None if full else read_watermark(cur, period)
+            until = latest_activity(cur, tables)
+            if until is None:
+                print(f"⏭️  {period}: no activity")
+                conn.rollback()
+                continue
+            since = None
+            if watermark is not None:
+                since = watermark - overlap
+                until = max(until, watermark)
+
+            if period == ANALYTICS:
+                style_count = aggregate_analytics(cur, since, until)
+                label = "styles"
+            else:
+                if full:
+                    cur.execute('DELETE FROM "BJCP_StylePopularity" WHERE "Period" = %s', (period,))
+                style_count = aggregate_popularity(cur, period, since, until)
+                label = "style periods"
+            write_watermark(cur, period, until, style_count)
+            conn.commit()
+            print(f"📈 {period}: {style_count} {label} re-aggregated up to {until} "
+                  f"in {time.perf_counter() - period_started:.2f}s")
+
+        print(f"\n✅ Aggregation finished in {time.perf_counter() - started:.2f}s")
+
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error aggregating style analytics: {e}")
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+if __name__ == "__main__":
+    choices = list(PERIODS) + [ANALYTICS]
+    parser = argparse.ArgumentParser(
+        description="Incrementally rebuild BJCP_StylePopularity and BJCP_StyleAnalytics from recipe activity")
+    parser.add_argument('--period', action='append', choices=choices,
+                        help="aggregate only this period; repeatable (default: all periods and analytics)")
+    parser.add_argument('--full', action='store_true',
+                        help="ignore watermarks and rebuild from all activity (run after a full BJCP reload)")
+    parser.add_argument('--overlap', type=float, default=DEFAULT_OVERLAP.total_seconds() / 60, metavar='MINUTES',
+                        help="re-read activity updated this long before each watermark, to catch transactions "
+                             "that committed after the last run (default: 15)")
+    args = parser.parse_args()
+
+    # Database configuration
+    db_config = {
+        'host': os.environ.get('DB_HOST', 'localhost'),
+        'database': os.environ.get('DB_NAME', 'fermentum'),
+        'user': os.environ.get('DB_USER', 'fermentum'),
+        'password': os.environ.get('DB_PASSWORD', 'dev_password_123'),
+        'port': int(os.environ.get('DB_PORT', 5432))
+    }
+
+    try:
+        aggregate(db_config, args.period or choices, args.full, datetime.timedelta(minutes=args.overlap))
+        print("🎉 Style analytics aggregation completed successfully!")
+    except Exception as e:
+        print(f"💥 Error during aggregation: {e}")
+        sys.exit(1)
@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Benchmark how the BJCP import pipeline scales with the size of the style guide.
+A generator writes synthetic BeerJSON corpora of any size, built from the real
+styles in bjcp2.json so text lengths, tags, commercial examples and comparison
+texts stay realistic. For each size the parse, validate, transform, SQL
+generation and load stages are timed. Loads go to a throwaway SQLite database
+through the same write path populate_bjcp_data.py uses, or to a scratch
+Postgres database. Results are compared with a stored baseline: row counts
+must match, and a stage more than the tolerance slower is reported as a
+regression. Stage times are compared relative to a fixed calibration
+workload timed with each size, so a busier or slower machine than the one
+that recorded the baseline is not mistaken for a regression.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import random
+import resource
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import psycopg2
+
+from bjcp_cache import CatalogCache
+from bjcp_records import RANGE_SOURCES, iter_records
+from generate_bjcp_migration import generate_migration_sql
+from populate_bjcp_data import (
+    BEER_STYLE_COLUMNS, BREWERY_COLUMNS, CATEGORY_COLUMNS, CHILD_TABLES, CLEAR_TABLES, COMPARISON_COLUMNS,
+    DEFAULT_BATCH_SIZE, TAG_COLUMNS, TRANSFORM_INPUTS, TRANSFORM_VERSION, BatchWriter, Vocabulary,
+    category_sort_key, chunked, iter_entries, populate_database, quote_columns, stable_id, validate_catalog,
+    write_catalog
+)
+
+BASELINE_FORMAT = 2
+DEFAULT_SIZES = (1000, 10000)
+DEFAULT_TOLERANCE = 0.25
+# Runs per size; each stage keeps its fastest time, which is far steadier than a single run
+DEFAULT_REPEAT = 3
+# Stages faster than this in the baseline are reported but never count as a regression
+MIN_GATED_SECONDS = 0.1
+
+STAGES = ('parse', 'validate', 'transform', 'sql', 'load')
+
+# Growth exponent above which a stage is flagged: 1.0 is linear, 2.0 quadratic
+SUPERLINEAR_EXPONENT = 1.3
+
+# Syllables for the made-up word that keeps every synthetic style name unique
+NAME_SYLLABLES = ('ka', 'lo', 'mer', 'vin', 'tas', 'dor', 'ril', 'bey', 'sun', 'hal', 'gar', 'pel',
+                  'zen', 'fro', 'wik', 'nor', 'the', 'bal', 'cor', 'dun', 'ems', 'fal', 'gil', 'hop')
+
+COMPARISON_PHRASES = (
+    'Stronger and maltier than {}.', 'Less alcohol than a {}.', 'Hoppier than {}.',
+    'Darker and richer than a {}.', 'Paler and drier than {}.', 'Similar to {}, but sweeter.',
+    'Can be confused with {}.', 'A variant of {} with more hop character.'
+)
+
+# Scratch tables for SQLite loads, keyed by table: (columns, primary key)
+SQLITE_TABLES = {
+    "BJCP_BeerCategory": (CATEGORY_COLUMNS, ["CategoryId"]),
+    "BJCP_StyleTag": (TAG_COLUMNS, ["TagId"]),
+    "BJCP_Brewery": (BREWERY_COLUMNS, ["BreweryId"]),
+    "BeerStyle": (BEER_STYLE_COLUMNS, ["StyleId"]),
+    **{table: (([id_column] if id_column else []) + columns, [id_column] if id_column else columns)
+       for table, id_column, columns, _ in CHILD_TABLES},
+    "BJCP_StyleComparison": (["ComparisonId"] + COMPARISON_COLUMNS, ["ComparisonId"])
+}
+
+def made_up_word(index):
+    """A pronounceable word unique to index, e.g. 'Kalomer'."""
+    syllables = []
+    for _ in range(3):
+        index, digit = divmod(index, len(NAME_SYLLABLES))
+        syllables.append(NAME_SYLLABLES[digit])
+    while index:
+        index, digit = divmod(index - 1, len(NAME_SYLLABLES))
+        syllables.append(NAME_SYLLABLES[digit])
+    return ''.join(syllables).capitalize()
+
+def jitter_range(source, rng):
+    """Copy a BeerJSON min/max range with both bounds moved by up to 5%."""
+    if not source:
+        return source
+    jittered = json.loads(json.dumps(source))
+    for side in ('minimum', 'maximum'):
+        bound = jittered.get(side) or {}
+        if isinstance(bound.get('value'), (int, float)):
+            bound['value'] = round(bound['value'] * rng.uniform(0.95, 1.05), 3)
+    minimum = (jittered.get('minimum') or {}).get('value')
+    maximum = (jittered.get('maximum') or {}).get('value')
+    if isinstance(minimum, float) and isinstance(maximum, float) and minimum > maximum:
+        jittered['minimum']['value'], jittered['maximum']['value'] = maximum, minimum
+    return jittered
+
+def generate_corpus(path, size, seed=0, template_path=None):
+    """Write a BeerJSON file of size synthetic styles, streamed to disk.
+
+    Every style copies the text fields of a random real style and appends a
+    sentence from another, keeps its tags with one swapped for a random tag,
+    jitters its vital statistics and gets a comparison text naming two to
+    four other synthetic styles. Three styles share each category.
+    """
+    with open(template_path or default_template_path(), 'r', encoding='utf-8') as f:
+        templates = json.load(f)['beerjson']['styles']
+    rng = random.Random(seed)
+    tag_pool = sorted({tag.strip() for style in templates for tag in (style.get('tags') or '').split(',')
+                       if tag.strip()})
+    names = [f"{made_up_word(i)} {templates[i % len(templates)]['name']}" for i in range(size)]
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{"beerjson": {"version": 2.01, "styles": [\n')
+        for i in range(size):
+            template = templates[i % len(templates)]
+            other = rng.choice(templates)
+            category_number = str(i // 3 + 1)
+            style = {
+                "name": names[i],
+                "category": f"{made_up_word(size + i // 3)} {template.get('category') or 'Specialty'}",
+                "category_id": category_number,
+                "style_id": f"{category_number}{'ABC'[i % 3]}",
+                "category_description": template.get('category_description')
+            }
+            for field in ('overall_impression', 'aroma', 'appearance', 'flavor', 'mouthfeel',
+                          'comments', 'history', 'ingredients'):
+                text = template.get(field) or ''
+                extra = (other.get(field) or '').split('. ')[0]
+                style[field] = f"{text} {extra}".strip() if extra else text
+            style["style_comparison"] = ' '.join(
+                rng.choice(COMPARISON_PHRASES).format(names[rng.randrange(size)])
+                for _ in range(rng.randint(2, 4)))
+            tags = [tag.strip() for tag in (template.get('tags') or '').split(',') if tag.strip()]
+            if tags:
+                tags[rng.randrange(len(tags))] = rng.choice(tag_pool)
+            style["tags"] = ', '.join(dict.fromkeys(tags))
+            style["examples"] = template.get('examples')
+            for source in RANGE_SOURCES.values():
+                if template.get(source):
+                    style[source] = jitter_range(template[source], rng)
+            f.write(('' if i == 0 else ',\n') + json.dumps(style, ensure_ascii=False))
+        f.write('\n]}}\n')
+
+def default_template_path():
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(script_dir, "..", "..", "database", "bjcp2.json")
+
+def sqlite_value(value):
+    """Bind Decimals as floats and arrays as JSON text, the way the SQLite stand-in stores them."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (list, tuple)):
+        return json.dumps(list(value), default=str)
+    return value
+
+class SqliteWriter(BatchWriter):
+    """The populate_bjcp_data writer interface on a throwaway SQLite database."""
+
+    def insert(self, table, columns, rows):
+        rows = [tuple(sqlite_value(value) for value in row) for row in rows]
+        if not rows:
+            return 0
+        started = time.perf_counter()
+        self.cur.executemany(f'INSERT INTO "{table}" ({quote_columns(columns)}) '
+                             f'VALUES ({", ".join("?" * len(columns))})', rows)
+        self._record(table, len(rows), 1, time.perf_counter() - started)
+        return len(rows)
+
+    def update(self, table, key_column, columns, rows, touch_column=None):
+        rows = [tuple(sqlite_value(value) for value in row[1:]) + (row[0],) for row in rows]
+        if not rows:
+            return 0
+        started = time.perf_counter()
+        assignments = ', '.join(f'"{column}" = ?' for column in columns)
+        self.cur.executemany(f'UPDATE "{table}" SET {assignments} WHERE "{key_column}" = ?', rows)
+        self._record(table, len(rows), 1, time.perf_counter() - started)
+        return len(rows)
+
+    def delete(self, table, key_column, keys):
+        keys = [(key,) for key in keys]
+        if not keys:
+            return 0
+        started = time.perf_counter()
+        self.cur.executemany(f'DELETE FROM "{table}" WHERE "{key_column}" = ?', keys)
+        self._record(table, len(keys), 1, time.perf_counter() - started)
+        return len(keys)
+
+def load_sqlite(entries, path, batch_size):
+    """Write the entries into a new SQLite database at path; returns row counts per table."""
+    conn = sqlite3.connect(path)
+    cur = conn.cursor()
+    cur.execute('PRAGMA journal_mode = OFF')
+    cur.execute('PRAGMA synchronous = OFF')
+    for table, (columns, key) in SQLITE_TABLES.items():
+        cur.execute(f'CREATE TABLE "{table}" ({quote_columns(columns)}, PRIMARY KEY ({quote_columns(key)}))')
+    writer = SqliteWriter(cur, batch_size)
+    categories = Vocabulary(lambda key: stable_id('category', key), sort_key=category_sort_key)
+    tags = Vocabulary(lambda key: stable_id('tag', key))
+    breweries = Vocabulary(lambda key: stable_id('brewery', key))
+    write_catalog(writer, chunked(entries, batch_size), categories, tags, breweries,
+                  lambda entry: stable_id('style', entry['number']), stable_ids=True)
+    conn.commit()
+    counts = {table: cur.execute(f'SELECT count(*) FROM "{table}"').fetchone()[0] for table in SQLITE_TABLES}
+    conn.close()
+    return counts
+
+def reset_postgres(dsn):
+    """Empty the BJCP tables and BeerStyle of the scratch database, in the order the seed migration clears them.
+
+    Fails rather than cascading if anything else (e.g. a recipe) still references a style.
+    """
+    conn = psycopg2.connect(dsn)
+    try:
+        with conn.cursor() as cur:
+            for table in CLEAR_TABLES[:-2] + ["BeerStyle"] + CLEAR_TABLES[-2:]:
+                cur.execute(f'DELETE FROM "{table}"')
+        conn.commit()
+    finally:
+        conn.close()
+
+def load_postgres(json_file_path, entries, dsn, batch_size, loader):
+    """Full load into the scratch Postgres database at dsn; returns row counts per table."""
+    populate_database(json_file_path, {'dsn': dsn}, batch_size, loader, chunks=chunked(entries, batch_size))
+    conn = psycopg2.connect(dsn)
+    try:
+        with conn.cursor() as cur:
+            counts = {}
+            for table in SQLITE_TABLES:
+                cur.execute(f'SELECT count(*) FROM "{table}"')
+                counts[table] = cur.fetchone()[0]
+            return counts
+    finally:
+        conn.close()
+
+def calibrate(repeat=3):
+    """Best wall time of a fixed parse-and-sort workload, the unit stage times are compared in.
+
+    It uses none of the pipeline's code, so a slower pipeline cannot hide in a slower calibration.
+    """
+    text = json.dumps([{'number': f'{i % 34}{chr(65 + i % 7)}', 'name': f'Style {i}', 'abv': i / 7}
+                       for i in range(100000)])
+    best = math.inf
+    for _ in range(repeat):
+        started = time.perf_counter()
+        sorted(json.loads(text), key=lambda style: (style['number'], style['name']))
+        best = min(best, time.perf_counter() - started)
+    return round(best, 5)
+
+def timed(stages, name, function, *args, **kwargs):
+    """Run function, keeping the fastest of its wall times in stages[name], and return its result."""
+    started = time.perf_counter()
+    result = function(*args, **kwargs)
+    stages[name] = min(stages.get(name, math.inf), round(time.perf_counter() - started, 4))
+    return result
+
+def benchmark_size(size, work_dir, seed, batch_size, dsn=None, loader='insert', repeat=DEFAULT_REPEAT):
+    """Generate a corpus of size styles and time every pipeline stage on it.
+
+    The stages run repeat times and each keeps its fastest time.
+    """
+    corpus = os.path.join(work_dir, f'corpus-{size}.json')
+    started = time.perf_counter()
+    generate_corpus(corpus, size, seed)
+    print(f"🧪 {size} styles: generated {os.path.getsize(corpus) // 1024} KiB corpus "
+          f"in {time.perf_counter() - started:.2f}s")
+
+    stages = {}
+    calibration = calibrate()
+    cache = CatalogCache(corpus, TRANSFORM_VERSION, os.path.join(work_dir, 'cache'), TRANSFORM_INPUTS)
+    # The benchmark reports its own progress; the pipeline's is discarded
+    with contextlib.redirect_stdout(io.StringIO()):
+        for run in range(repeat):
+            timed(stages, 'parse', lambda: sum(1 for _ in iter_records(corpus)))
+            report = timed(stages, 'validate', validate_catalog, corpus, batch_size)
+            # Entries are cached as they are transformed, so later stages skip the transform
+            styles = timed(stages, 'transform',
+                           lambda: sum(1 for _ in cache.write(report, iter_entries(corpus, batch_size))))
+            sql_path = os.path.join(work_dir, f'seed-{size}.sql')
+            timed(stages, 'sql', generate_migration_sql, corpus, sql_path, 'insert', batch_size, cache.read()[1])
+            if dsn:
+                reset_postgres(dsn)
+                rows = timed(stages, 'load', load_postgres, corpus, cache.read()[1], dsn, batch_size, loader)
+            else:
+                rows = timed(stages, 'load', load_sqlite, cache.read()[1],
+                             os.path.join(work_dir, f'load-{size}-{run}.sqlite'), batch_size)
+
+    print("   " + ", ".join(f"{stage} {stages[stage]:.2f}s" for stage in STAGES)
+          + f" ({styles} styles, {os.path.getsize(sql_path) // 1024} KiB of SQL)")
+    return {'stages': stages, 'rows': rows, 'calibration': min(calibration, calibrate())}
+
+def growth_exponents(results):
+    """Per stage, the exponent k in time ~ styles^k between each pair of consecutive sizes."""
+    sizes = sorted(results, key=int)
+    exponents = {}
+    for smaller, larger in zip(sizes, sizes[1:]):
+        ratio = math.log(int(larger) / int(smaller))
+        for stage in STAGES:
+            before = results[smaller]['stages'][stage]
+            after = results[larger]['stages'][stage]
+            if before > 0 and after > 0:
+                exponents.setdefault(stage, []).append((smaller, larger, math.log(after / before) / ratio))
+    return exponents
+
+def compare_with_baseline(results, calibration, baseline, tolerance):
+    """Print how each size compares with the baseline; returns the number of problems found.
+
+    Baseline times are scaled by the ratio of the two runs' calibration
+    times (the fastest of each run) before the tolerance is applied. A run none of whose sizes is in
+    the baseline counts as one problem, since nothing was compared.
+    """
+    problems = 0
+    speed = calibration / baseline['calibration']
+    print(f"   calibration {calibration * 1000:.1f} ms vs {baseline['calibration'] * 1000:.1f} ms, "
+          f"so times are compared with {speed:.2f}x the baseline")
+    for size, result in sorted(results.items(), key=lambda item: int(item[0])):
+        previous = baseline['sizes'].get(size)
+        if previous is None:
+            print(f"   {size} styles: not in the baseline")
+            continue
+        if previous['rows'] != result['rows']:
+            problems += 1
+            changed = [table for table in result['rows'] if previous['rows'].get(table) != result['rows'][table]]
+            print(f"   ❌ {size} styles: row counts differ from the baseline in {', '.join(changed)}")
+        for stage in STAGES:
+            before = previous['stages'].get(stage)
+            after = result['stages'][stage]
+            if not before:
+                continue
+            change = after / (before * speed) - 1
+            if change > tolerance and before >= MIN_GATED_SECONDS:
+                problems += 1
+                print(f"   ❌ {size} styles, {stage}: {after:.2f}s vs {before:.2f}s ({change:+.0%})")
+            else:
+                print(f"   ✅ {size} styles, {stage}: {after:.2f}s vs {before:.2f}s ({change:+.0%})")
+    if not any(size in baseline['sizes'] for size in results):
+        problems += 1
+        print(f"   ❌ none of the sizes is in the baseline ({', '.join(sorted(baseline['sizes'], key=int))})")
+    return problems
+
+if __name__ == "__main__":
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    default_baseline = os.path.join(script_dir, "bjcp_benchmark_baseline.json")
+
+    parser = argparse.ArgumentParser(description="Benchmark the BJCP import pipeline on synthetic style corpora")
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help="comma-separated corpus sizes in styles (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=0,
+                        help="random seed for the corpora; the baseline only compares runs with the same seed")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"styles per chunk and rows per statement (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument('--dsn',
+                        help="load into this scratch Postgres database instead of SQLite; "
+                             "its BJCP tables are cleared")
+    parser.add_argument('--loader', choices=('insert', 'copy'), default='insert',
+                        help="Postgres loader used with --dsn")
+    parser.add_argument('--baseline', default=default_baseline,
+                        help="baseline JSON file (default: scripts/python/bjcp_benchmark_baseline.json)")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="store this run as the new baseline instead of comparing with it")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help=f"runs per size; each stage keeps its fastest time (default: {DEFAULT_REPEAT})")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f"slowdown reported as a regression, as a fraction (default: {DEFAULT_TOLERANCE})")
+    parser.add_argument('--work-dir',
+                        help="keep corpora, SQL and databases here instead of a temporary directory")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    backend = 'postgres' if args.dsn else 'sqlite'
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix='bjcp-benchmark-')
+    os.makedirs(work_dir, exist_ok=True)
+
+    results = {}
+    recorded = datetime.now(timezone.utc).isoformat()
+    try:
+        for size in sizes:
+            results[str(size)] = benchmark_size(size, work_dir, args.seed, args.batch_size, args.dsn, args.loader,
+                                                args.repeat)
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    exponents = growth_exponents(results)
+    if exponents:
+        print("\n📈 Growth per stage (time ~ styles^k; 1.0 is linear):")
+    for stage, steps in exponents.items():
+        flagged = any(exponent > SUPERLINEAR_EXPONENT for _, _, exponent in steps)
+        print(f"   {'⚠️ ' if flagged else '  '} {stage}: "
+              + ", ".join(f"{smaller}→{larger} k={exponent:.2f}" for smaller, larger, exponent in steps))
+
+    run = {
+        'format': BASELINE_FORMAT,
+        'seed': args.seed,
+        'batch_size': args.batch_size,
+        'backend': backend,
+        'repeat': args.repeat,
+        'recorded': recorded,
+        'calibration': min(result['calibration'] for result in results.values()),
+        # ru_maxrss is in kilobytes on Linux
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'sizes': results
+    }
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(run, f, indent=2)
+            f.write('\n')
+        print(f"\n💾 Saved baseline to {args.baseline}")
+        sys.exit(0)
+
+    if not os.path.exists(args.baseline):
+        print(f"\n❌ No baseline at {args.baseline}; run with --save-baseline to record one")
+        sys.exit(1)
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    recorded_with = (baseline.get('format'), baseline.get('seed'), baseline.get('backend'))
+    if recorded_with != (BASELINE_FORMAT, args.seed, backend):
+        print(f"\n❌ Baseline was recorded with seed {baseline.get('seed')} on {baseline.get('backend')}, "
+              f"not seed {args.seed} on {backend}")
+        sys.exit(1)
+
+    print(f"\n📏 Compared with the baseline from {baseline['recorded']} (tolerance {args.tolerance:.0%}):")
+    problems = compare_with_baseline(results, run['calibration'], baseline, args.tolerance)
+    if problems:
+        print(f"💥 {problems} regressions or mismatches")
+        sys.exit(1)
+    print("🎉 No regressions")
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Brewery gazetteer for splitting BJCP commercial examples into brewery and beer.
+Brewery names are kept in a trie of normalized words. An example is split at
+the longest brewery name it starts with, so "Sierra Nevada Pale Ale" is the
+beer "Pale Ale" by "Sierra Nevada". The trie holds the names in
+bjcp_breweries.json: the curated breweries and the ones learned from a
+catalog by learn_breweries(), where a run of leading words that several
+different examples share becomes a brewery. Learned names are written back
+to the file and never dropped, so how one example is split does not depend
+on the other examples of the catalog being loaded. Each brewery is interned
+once, as a Brewery that examples reference by its key. An example that
+starts with no known brewery keeps its whole text as the beer name.
+Learning and splitting are linear in the number of words.
+"""
+
+import json
+import os
+import re
+from collections import Counter
+
+DEFAULT_BREWERIES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bjcp_breweries.json")
+
+# Different examples that must share a run of leading words before it is learned as a brewery
+MIN_EXAMPLES = 2
+
+POSSESSIVE = re.compile(r"'s$")
+PUNCTUATION = ".,;:!?\"'()"
+
+def normalize_word(word):
+    """Casefold a word and drop its possessive and surrounding punctuation ("Smith’s" -> 'smith')."""
+    word = POSSESSIVE.sub('', word.casefold().replace('’', "'"))
+    return word.strip(PUNCTUATION) or word
+
+def brewery_key(name):
+    """The key a brewery name is matched and stored by, e.g. "Bell's" -> 'bell'."""
+    return ' '.join(normalize_word(word) for word in name.split())
+
+class Brewery:
+    """One interned brewery: its key and the name it is displayed with."""
+
+    __slots__ = ('key', 'name')
+
+    def __init__(self, key, name):
+        self.key = key
+        self.name = name
+
+    def __repr__(self):
+        return f"Brewery({self.name!r})"
+
+class ObservedWord:
+    """A node of the trie of observed examples, counting the examples that pass through it."""
+
+    __slots__ = ('count', 'ends', 'children', 'spellings')
+
+    def __init__(self):
+        self.count = 0
+        self.ends = 0
+        self.children = {}
+        self.spellings = Counter()
+
+class BreweryGazetteer:
+    """Known breweries in a trie of normalized words, matched by longest prefix."""
+
+    def __init__(self, names=(), aliases=None, lead_words=(), min_examples=MIN_EXAMPLES):
+        """aliases maps other spellings to names; lead words are never a brewery on their own."""
+        # word -> child node; a node's None entry is the Brewery whose name ends there
+        self.root = {}
+        self.breweries = {}
+        self.lead_words = frozenset(normalize_word(word) for word in lead_words)
+        self.min_examples = min_examples
+        self.observed = ObservedWord()
+        self.seen = set()
+        for name in names:
+            self.add(name)
+        for alias, name in (aliases or {}).items():
+            self.add(alias, alias_of=name)
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_BREWERIES_PATH):
+        """Load the known and learned breweries, aliases and lead words from a JSON file."""
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        return cls(config['breweries'] + config.get('learned', []), config.get('aliases'),
+                   config.get('lead_words', ()), config.get('min_examples', MIN_EXAMPLES))
+
+    def __len__(self):
+        return len(self.breweries)
+
+    def add(self, name, alias_of=None):
+        """Intern a brewery name and return its Brewery.
+
+        A name whose key is known returns the known Brewery. With alias_of,
+        name becomes another spelling of that brewery.
+        """
+        words = name.split()
+        key = ' '.join(normalize_word(word) for word in words)
+        node = self.root
+        for word in key.split(' '):
+            node = node.setdefault(word, {})
+        if None not in node:
+            if alias_of:
+                node[None] = self.add(alias_of)
+            else:
+                node[None] = self.breweries[key] = Brewery(key, ' '.join(words))
+        return node[None]
+
+    def observe(self, examples):
+        """Count the words of examples not seen before, for learn()."""
+        for example in examples:
+            words = example.split()
+            key = tuple(normalize_word(word) for word in words)
+            if not key or key in self.seen:
+                continue
+            self.seen.add(key)
+            node = self.observed
+            for word, spelling in zip(key, words):
+                child = node.children.get(word)
+                if child is None:
+                    child = node.children[word] = ObservedWord()
+                child.count += 1
+                child.spellings[spelling] += 1
+                node = child
+            node.ends += 1
+
+    def learn(self):
+        """Add the breweries the observed examples share and return the new Brewery list.
+
+        A first word shared by min_examples examples is extended while every
+        one of them continues with the same next word, and the run of words
+        becomes a brewery. A run made of lead words only ("The", "New") is no
+        brewery itself, so the words after it are tried instead. The
+        extension stops at a known brewery, and runs that are, or start, a
+        known brewery name are left to it. Each brewery is spelled the way
+        most of its examples spell it.
+        """
+        learned = []
+        pending = [([word], [node], self.root.get(word)) for word, node in self.observed.children.items()]
+        while pending:
+            words, nodes, known = pending.pop()
+            node = nodes[-1]
+            if node.count < self.min_examples:
+                continue
+            while not node.ends and len(node.children) == 1 and not (known and None in known):
+                (word, node), = node.children.items()
+                words.append(word)
+                nodes.append(node)
+                known = known.get(word) if known else None
+            if all(word in self.lead_words for word in words):
+                pending.extend((words + [word], nodes + [child], known.get(word) if known else None)
+                               for word, child in node.children.items())
+            elif known is None:
+                learned.append(self.add(' '.join(node.spellings.most_common(1)[0][0] for node in nodes)))
+        self.seen.clear()
+        self.observed = ObservedWord()
+        return learned
+
+    def split(self, example):
+        """Split a commercial example into (beer_name, Brewery or None) at its longest known brewery.
+
+        An example that is only a brewery name keeps it as the beer name too.
+        """
+        words = example.split()
+        node = self.root
+        brewery = None
+        length = 0
+        for i, word in enumerate(words):
+            node = node.get(normalize_word(word))
+            if node is None:
+                break
+            if None in node:
+                brewery, length = node[None], i + 1
+        if brewery is None:
+            return example, None
+        return ' '.join(words[length:]) or example, brewery
+
+def learn_breweries(examples, path=DEFAULT_BREWERIES_PATH):
+    """Learn breweries from commercial examples and add them to the 'learned' list of a gazetteer file.
+
+    Names learned earlier are kept even when no example starts with them
+    any more. The file is rewritten one name per line, so new names diff
+    cleanly. Returns the Brewery list that is new to the file.
+    """
+    gazetteer = BreweryGazetteer.from_file(path)
+    gazetteer.observe(examples)
+    learned = gazetteer.learn()
+    if learned:
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        config['learned'] = sorted(config.get('learned', []) + [brewery.name for brewery in learned],
+                                   key=str.casefold)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(config, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+    return learned
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Bulk-load settings for full BJCP reloads.
+A bulk load makes three changes inside its transaction. It defers the
+deferrable foreign keys (migration 051), so they are checked in one batch
+after the rows are in instead of after every row. It drops the secondary
+indexes of the tables it writes and rebuilds them after the load. Postgres
+cannot build an index on a table with pending deferred checks, so the checks
+are forced just before the rebuild. The rebuild uses Postgres's parallel
+index build workers and a larger maintenance_work_mem. After the commit,
+ANALYZE refreshes the planner statistics. Primary keys, unique indexes and indexes
+backing constraints are kept. The same steps are available as SQL text for
+generated migrations.
+"""
+
+import textwrap
+import time
+
+# Session settings for the index rebuild; parallel workers only apply to btree builds
+BULK_MAINTENANCE_WORK_MEM = '256MB'
+BULK_PARALLEL_WORKERS = 4
+
+def secondary_indexes_query(tables):
+    """SQL listing (name, definition) of the droppable indexes on tables in the current schema."""
+    names = ', '.join("'" + table.replace("'", "''") + "'" for table in tables)
+    return f"""
+        SELECT i.indexrelid::regclass::text AS name, pg_get_indexdef(i.indexrelid) AS definition
+        FROM pg_index i
+        JOIN pg_class t ON t.oid = i.indrelid
+        WHERE t.relnamespace = current_schema()::regnamespace
+          AND t.relname IN ({names})
+          AND NOT i.indisprimary
+          AND NOT i.indisunique
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)
+        ORDER BY 1
+    """
+
+def session_settings_sql():
+    """Statements that defer constraints and size the index rebuild, for the current transaction."""
+    return [
+        "SET CONSTRAINTS ALL DEFERRED",
+        f"SET LOCAL maintenance_work_mem = '{BULK_MAINTENANCE_WORK_MEM}'",
+        f"SET LOCAL max_parallel_maintenance_workers = {BULK_PARALLEL_WORKERS}"
+    ]
+
+class BulkLoad:
+    """Drop, rebuild and analyze around a load that runs on cur's connection."""
+
+    def __init__(self, cur, tables):
+        self.cur = cur
+        self.tables = tables
+        self.indexes = []
+
+    def begin(self):
+        """Apply the bulk session settings; call inside the load's transaction."""
+        for statement in session_settings_sql():
+            self.cur.execute(statement)
+
+    def drop_indexes(self):
+        """Drop the secondary indexes, remembering their definitions."""
+        self.cur.execute(secondary_indexes_query(self.tables))
+        self.indexes = self.cur.fetchall()
+        for name, _ in self.indexes:
+            self.cur.execute(f'DROP INDEX {name}')
+        print(f"  Dropped {len(self.indexes)} secondary indexes until the load is done")
+        return len(self.indexes)
+
+    def rebuild_indexes(self):
+        """Run the deferred foreign key checks, then recreate every dropped index from its saved definition."""
+        started = time.perf_counter()
+        self.cur.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        print(f"  Checked deferred foreign keys in {time.perf_counter() - started:.2f}s")
+        started = time.perf_counter()
+        for _, definition in self.indexes:
+            self.cur.execute(definition)
+        print(f"  Rebuilt {len(self.indexes)} indexes in {time.perf_counter() - started:.2f}s")
+
+    def analyze(self):
+        """Refresh planner statistics for every loaded table."""
+        for table in self.tables:
+            self.cur.execute(f'ANALYZE "{table}"')
+        print(f"  Analyzed {len(self.tables)} tables")
+
+def bulk_prologue_sql(tables):
+    """Migration SQL that applies the bulk settings and drops the secondary indexes of tables."""
+    settings = ''.join(f"{statement};\n" for statement in session_settings_sql())
+    return f"""-- Bulk load: foreign keys are checked and secondary indexes rebuilt once the data is in
+{settings}CREATE TEMP TABLE bjcp_bulk_indexes ON COMMIT DROP AS
+{textwrap.dedent(secondary_indexes_query(tables)).strip()};
+DO $$
+DECLARE
+    dropped record;
+BEGIN
+    FOR dropped IN SELECT name FROM bjcp_bulk_indexes LOOP
+        EXECUTE 'DROP INDEX ' || dropped.name;
+    END LOOP;
+END $$;
+
+"""
+
+def bulk_epilogue_sql():
+    """Migration SQL that rebuilds the indexes bulk_prologue_sql() dropped."""
+    return """-- Run the deferred foreign key checks (CREATE INDEX refuses tables with pending ones),
+-- then rebuild the secondary indexes dropped for the bulk load
+SET CONSTRAINTS ALL IMMEDIATE;
+DO $$
+DECLARE
+    dropped record;
+BEGIN
+    FOR dropped IN SELECT definition FROM bjcp_bulk_indexes LOOP
+        EXECUTE dropped.definition;
+    END LOOP;
+END $$;
+
+"""
+
+def analyze_sql(tables):
+    """ANALYZE statements for tables, run after COMMIT."""
+    return ''.join(f'ANALYZE "{table}";\n' for table in tables)
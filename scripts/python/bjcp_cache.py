@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+On-disk cache of transformed BJCP catalog entries.
+Entries are keyed by the SHA-256 of the input file and of the data files the
+transform reads (such as the brewery gazetteer), and by the transformer
+version, so editing any of them invalidates the cache and a repeat load or migration generation from an unchanged file
+skips parsing, normalization and keyword scoring and goes straight to the
+write stage. Each cache file is a header (format, key and validation report)
+followed by pickled chunks of entries, read back one chunk at a time.
+"""
+
+import glob
+import hashlib
+import os
+import pickle
+
+CACHE_FORMAT = 1
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.bjcp_cache')
+
+# Entries pickled together; reading a chunk costs one pickle.load call
+CACHE_CHUNK_SIZE = 500
+
+# Cache files kept per directory, most recently used first
+MAX_CACHE_FILES = 8
+
+def file_digest(path):
+    """SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def source_digest(source_path, inputs=()):
+    """SHA-256 hex digest of a catalog file together with the data files in inputs."""
+    digest = hashlib.sha256(file_digest(source_path).encode('ascii'))
+    for path in inputs:
+        digest.update(file_digest(path).encode('ascii'))
+    return digest.hexdigest()
+
+class CatalogCache:
+    """Transformed entries of one input file, for one transformer version and set of data files."""
+
+    def __init__(self, source_path, version, cache_dir=DEFAULT_CACHE_DIR, inputs=()):
+        """inputs are the data files the transform reads besides source_path."""
+        self.cache_dir = cache_dir
+        self.key = f'{source_digest(source_path, inputs)[:32]}-v{version}'
+        self.path = os.path.join(cache_dir, f'{self.key}.bin')
+
+    def read(self):
+        """Return (report, entries) from the cache file, or None when there is no usable one.
+
+        entries is a generator that unpickles one chunk at a time.
+        """
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return None
+        try:
+            header = pickle.load(f)
+        except Exception:
+            f.close()
+            return None
+        if header.get('format') != CACHE_FORMAT or header.get('key') != self.key:
+            f.close()
+            return None
+        os.utime(self.path)
+        return header['report'], self._iter_entries(f)
+
+    def _iter_entries(self, f):
+        with f:
+            while True:
+                try:
+                    chunk = pickle.load(f)
+                except EOFError:
+                    return
+                yield from chunk
+
+    def write(self, report, entries):
+        """Yield entries while pickling them into the cache.
+
+        The cache file only appears once every entry has been consumed, so an
+        interrupted load never leaves a partial cache behind.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        partial = f'{self.path}.{os.getpid()}.partial'
+        complete = False
+        try:
+            with open(partial, 'wb') as f:
+                pickle.dump({'format': CACHE_FORMAT, 'key': self.key, 'report': report},
+                            f, pickle.HIGHEST_PROTOCOL)
+                chunk = []
+                for entry in entries:
+                    chunk.append(entry)
+                    if len(chunk) >= CACHE_CHUNK_SIZE:
+                        pickle.dump(chunk, f, pickle.HIGHEST_PROTOCOL)
+                        yield from chunk
+                        chunk = []
+                if chunk:
+                    pickle.dump(chunk, f, pickle.HIGHEST_PROTOCOL)
+                    yield from chunk
+            os.replace(partial, self.path)
+            complete = True
+            print(f"📦 Cached transformed catalog as {os.path.basename(self.path)}")
+            self.prune()
+        finally:
+            if not complete and os.path.exists(partial):
+                os.remove(partial)
+
+    def prune(self, keep=MAX_CACHE_FILES):
+        """Remove all but the keep most recently used cache files."""
+        paths = sorted(glob.glob(os.path.join(self.cache_dir, '*.bin')), key=os.path.getmtime, reverse=True)
+        for path in paths[keep:]:
+            os.remove(path)
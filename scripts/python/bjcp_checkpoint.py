@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Progress ledger for checkpointed BJCP loads.
+A checkpointed load runs as a series of phases. Each phase runs in its own
+savepoint and, once it completes, is recorded in BJCP_LoadProgress (migration
+050) in the same transaction as its writes. The phases are the clear, every
+chunk of styles, the sort orders and the comparisons. When a phase fails,
+only it is rolled back. A rerun of the same load asks the ledger which phases
+are done and skips them.
+"""
+
+from contextlib import contextmanager
+
+import psycopg2
+
+from bjcp_cache import source_digest
+
+SAVEPOINT = 'bjcp_load_phase'
+
+def load_key(json_file_path, transform_version, chunk_size, inputs=()):
+    """Identify a load by its catalog file, transformer version and chunk size.
+
+    inputs are the data files the transform reads besides the catalog. Chunk
+    indexes only mean the same styles when all of them match.
+    """
+    return f'{source_digest(json_file_path, inputs)[:32]}-v{transform_version}-c{chunk_size}'
+
+class LoadLedger:
+    """The completed phases of one load, read from and recorded in BJCP_LoadProgress."""
+
+    def __init__(self, cur, key):
+        self.cur = cur
+        self.key = key
+        cur.execute('SELECT "SourceKey", "Phase", "ChunkIndex" FROM "BJCP_LoadProgress"')
+        rows = cur.fetchall()
+        self.done = {(phase, chunk) for source, phase, chunk in rows if source == key}
+        # Progress of an unfinished load of another catalog no longer describes the tables
+        self.discarded = len({source for source, _, _ in rows if source != key})
+        if self.discarded:
+            cur.execute('DELETE FROM "BJCP_LoadProgress" WHERE "SourceKey" <> %s', (key,))
+
+    def completed(self, phase, chunk=0):
+        return (phase, chunk) in self.done
+
+    @contextmanager
+    def phase(self, phase, chunk=0, styles=0):
+        """Run the enclosed writes in a savepoint and record the phase once they succeed.
+
+        On an error the savepoint is rolled back, leaving earlier phases of
+        the transaction intact, and the error is re-raised.
+        """
+        self.cur.execute(f'SAVEPOINT {SAVEPOINT}')
+        try:
+            yield
+            self.cur.execute(
+                'INSERT INTO "BJCP_LoadProgress" ("SourceKey", "Phase", "ChunkIndex", "StylesLoaded") '
+                'VALUES (%s, %s, %s, %s)',
+                (self.key, phase, chunk, styles)
+            )
+        except Exception:
+            try:
+                self.cur.execute(f'ROLLBACK TO SAVEPOINT {SAVEPOINT}')
+            except psycopg2.Error:
+                # The connection is gone; the caller's rollback discards the transaction
+                pass
+            raise
+        self.cur.execute(f'RELEASE SAVEPOINT {SAVEPOINT}')
+        self.done.add((phase, chunk))
+
+    def finish(self):
+        """Forget this load's progress once every phase is done, so the next load starts afresh."""
+        self.cur.execute('DELETE FROM "BJCP_LoadProgress" WHERE "SourceKey" = %s', (self.key,))
+        self.done.clear()
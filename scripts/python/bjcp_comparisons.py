@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Resolve the styles referenced in BJCP style comparison text.
+Every style name and BJCP number (e.g. "American IPA", "21A"), together with
+the phrases that describe how two styles relate ("stronger", "similar to"),
+is compiled into a single Aho-Corasick automaton. Each comparison text is then
+scanned in one linear pass, however many styles are loaded.
+"""
+
+import re
+
+# Phrases that describe how the primary style relates to the style it mentions:
+# (phrase, Relationship, ComparisonType). Generic phrases only apply when no
+# specific one precedes the mention.
+RELATIONSHIP_CUES = [
+    ('stronger', 'stronger', 'difference'),
+    ('more alcohol', 'stronger', 'difference'),
+    ('higher alcohol', 'stronger', 'difference'),
+    ('bigger', 'stronger', 'difference'),
+    ('weaker', 'weaker', 'difference'),
+    ('not as strong', 'weaker', 'difference'),
+    ('less alcohol', 'weaker', 'difference'),
+    ('lower alcohol', 'weaker', 'difference'),
+    ('lower-alcohol', 'weaker', 'difference'),
+    ('smaller', 'weaker', 'difference'),
+    ('darker', 'darker', 'difference'),
+    ('paler', 'paler', 'difference'),
+    ('lighter', 'lighter', 'difference'),
+    ('hoppier', 'hoppier', 'difference'),
+    ('more hop', 'hoppier', 'difference'),
+    ('more bitter', 'hoppier', 'difference'),
+    ('less hop', 'less hoppy', 'difference'),
+    ('less bitter', 'less hoppy', 'difference'),
+    ('maltier', 'maltier', 'difference'),
+    ('more malt', 'maltier', 'difference'),
+    ('less malt', 'less malty', 'difference'),
+    ('sweeter', 'sweeter', 'difference'),
+    ('drier', 'drier', 'difference'),
+    ('richer', 'richer', 'difference'),
+    ('similar', 'similar', 'similarity'),
+    ('like', 'similar', 'similarity'),
+    ('confused with', 'similar', 'similarity'),
+    ('midway between', 'similar', 'similarity'),
+    ('version of', 'variant', 'progression'),
+    ('variant of', 'variant', 'progression'),
+    ('based on', 'variant', 'progression'),
+    ('derived from', 'variant', 'progression'),
+    ('descended from', 'variant', 'progression')
+]
+GENERIC_CUES = [
+    ('than', 'different', 'difference'),
+    ('unlike', 'different', 'difference')
+]
+DEFAULT_RELATIONSHIP = ('similar', 'similarity')
+
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+|\n+')
+
+class Automaton:
+    """Aho-Corasick automaton mapping lowercase patterns to payloads."""
+
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.outputs = [[]]
+
+    def add(self, pattern, payload):
+        """Register pattern; must be called before build()."""
+        pattern = pattern.lower()
+        state = 0
+        for char in pattern:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.outputs.append([])
+            state = next_state
+        self.outputs[state].append((len(pattern), payload))
+
+    def build(self):
+        """Compute failure links breadth-first so scanning never backtracks."""
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.outputs[next_state] = self.outputs[next_state] + self.outputs[self.fail[next_state]]
+        return self
+
+    def iter_matches(self, text):
+        """Yield (start, end, payload) for every pattern occurrence in text."""
+        state = 0
+        for i, char in enumerate(text):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for length, payload in self.outputs[state]:
+                yield i + 1 - length, i + 1, payload
+
+def lower_preserving_length(text):
+    """Lowercase text without changing character offsets."""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return ''.join(char if len(char.lower()) != 1 else char.lower() for char in text)
+
+def is_word(text, start, end):
+    """True when text[start:end] is a whole word, allowing a plural 's'.
+
+    A capital right after a lowercase letter also starts a word, since the
+    guide sometimes drops the space before a style name ("aDunkles Bock").
+    """
+    if start > 0 and text[start - 1].isalnum() and not (text[start - 1].islower() and text[start].isupper()):
+        return False
+    if end < len(text) and text[end] in 'sS' and not text[end - 1].isdigit():
+        end += 1
+    return end >= len(text) or not text[end].isalnum()
+
+class ComparisonResolver:
+    """Find the styles a comparison text mentions and how it relates to them."""
+
+    def __init__(self, styles):
+        """styles: iterable of (style_id, bjcp_number, style_name)."""
+        self.automaton = Automaton()
+        # A name shared by several styles resolves to the first one registered
+        patterns = {}
+        for style_id, number, name in styles:
+            for pattern in (number, name):
+                if pattern and pattern.lower() not in patterns:
+                    patterns[pattern.lower()] = style_id
+        for pattern, style_id in patterns.items():
+            self.automaton.add(pattern, ('style', style_id))
+        for phrase, relationship, comparison_type in RELATIONSHIP_CUES:
+            self.automaton.add(phrase, ('cue', relationship, comparison_type))
+        for phrase, relationship, comparison_type in GENERIC_CUES:
+            self.automaton.add(phrase, ('generic', relationship, comparison_type))
+        self.automaton.build()
+
+    def matches(self, sentence):
+        """Leftmost-longest whole-word matches in sentence, ordered by position."""
+        lowered = lower_preserving_length(sentence)
+        found = sorted(
+            ((start, -end, payload) for start, end, payload in self.automaton.iter_matches(lowered)
+             if is_word(sentence, start, end)),
+            key=lambda match: match[:2]
+        )
+        selected = []
+        covered = 0
+        for start, negative_end, payload in found:
+            if start >= covered:
+                selected.append(payload)
+                covered = -negative_end
+        return selected
+
+    def resolve(self, style_id, text):
+        """Return (ComparedStyleId, ComparisonText, Relationship, ComparisonType) rows for one style.
+
+        A mention takes its relationship from the first specific cue since the
+        previous mention in its sentence, then from the previous mention it is
+        listed with, then from a generic cue such as "than".
+        """
+        rows = []
+        seen = {style_id}
+        for sentence in SENTENCE_END.split(text or ''):
+            specific = generic = previous = None
+            for payload in self.matches(sentence):
+                kind = payload[0]
+                if kind == 'cue':
+                    specific = specific or payload[1:]
+                elif kind == 'generic':
+                    generic = generic or payload[1:]
+                else:
+                    relationship = specific or previous or generic or DEFAULT_RELATIONSHIP
+                    compared_id = payload[1]
+                    if compared_id not in seen:
+                        seen.add(compared_id)
+                        rows.append((compared_id, sentence.strip()) + relationship)
+                    previous = relationship
+                    specific = generic = None
+        return rows
+
+def resolve_comparisons(styles):
+    """Resolve every style's comparison text against the whole catalog.
+
+    styles: list of (style_id, bjcp_number, style_name, comparison_text).
+    Returns (PrimaryStyleId, ComparedStyleId, ComparisonText, Relationship,
+    ComparisonType) rows, one per referenced pair.
+    """
+    resolver = ComparisonResolver((style_id, number, name) for style_id, number, name, _ in styles)
+    return [
+        (style_id,) + row
+        for style_id, _, _, text in styles
+        for row in resolver.resolve(style_id, text)
+    ]
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Diff two versions of the BJCP style guide into the writes that turn one into the other.
+Styles are matched by BJCP number. The old catalog is reduced to digests:
+one per style entry, one per BeerStyle column and one per child row. The new
+catalog then streams past those digests once. Unchanged styles are skipped on
+their entry digest. Changed styles get an UPDATE of only the columns whose
+digest differs, plus inserts, updates and deletes for the child rows that
+differ. Rows are addressed by the uuid5 ids the full seed migration uses.
+"""
+
+import hashlib
+
+from populate_bjcp_data import (
+    BEER_STYLE_COLUMNS, CATEGORY_REFERENCES, CHILD_TABLES, COMPARISON_COLUMNS, STYLE_REFERENCES, Vocabulary,
+    category_sort_key, child_rows, comparison_rows, comparison_source, content_hash, stable_id, style_row,
+    write_sort_orders, write_vocabulary
+)
+
+def value_digest(value):
+    """A short digest of a column value or a whole row."""
+    return hashlib.blake2b(repr(value).encode('utf-8'), digest_size=8).digest()
+
+def catalog_vocabularies(existing_categories=None, existing_tags=None, existing_breweries=None):
+    """Category, tag and brewery vocabularies with the stable ids of the seed migration."""
+    categories = Vocabulary(lambda key: stable_id('category', key), existing_categories, category_sort_key)
+    tags = Vocabulary(lambda key: stable_id('tag', key), existing_tags)
+    breweries = Vocabulary(lambda key: stable_id('brewery', key), existing_breweries)
+    return categories, tags, breweries
+
+class RowCollector:
+    """Writer that keeps the vocabulary rows write_vocabulary() would insert, keyed by table."""
+
+    def __init__(self):
+        self.rows = {}
+
+    def insert(self, table, columns, rows):
+        rows = list(rows)
+        self.rows.setdefault(table, []).extend(rows)
+        return len(rows)
+
+    def update(self, table, key_column, columns, rows, touch_column=None):
+        return 0
+
+class StyleDigest:
+    """What the diff remembers about one style of the old catalog."""
+
+    __slots__ = ('content', 'columns', 'children', 'mappings')
+
+    def __init__(self, entry, row, children):
+        self.content = content_hash(entry)
+        self.columns = tuple(value_digest(value) for value in row)
+        self.children = {table: tuple(value_digest(child) for child in children[table])
+                         for table, id_column, _, _ in CHILD_TABLES if id_column}
+        # Tag mappings have no id of their own, so their (StyleId, TagId) keys are kept as they are
+        self.mappings = frozenset(children["BJCP_StyleTagMapping"])
+
+class CatalogState:
+    """Digests of every style of one catalog version, with its vocabularies and comparisons."""
+
+    def __init__(self, chunks):
+        collector = RowCollector()
+        categories, tags, breweries = catalog_vocabularies()
+        self.styles = {}
+        sources = []
+
+        for chunk in chunks:
+            write_vocabulary(collector, chunk, categories, tags, breweries)
+            for entry in chunk:
+                style_id = stable_id('style', entry['number'])
+                row = style_row(entry, style_id, categories.ids.get(entry['category_number']))
+                self.styles[entry['number']] = StyleDigest(
+                    entry, row, child_rows(entry, style_id, tags.ids, breweries.ids)
+                )
+                sources.append(comparison_source(entry, style_id))
+
+        # Vocabulary.existing rows: (id, key, *values, SortOrder)
+        self.categories = self._existing(collector.rows.get("BJCP_BeerCategory", []), categories)
+        self.tags = self._existing(collector.rows.get("BJCP_StyleTag", []), tags)
+        self.breweries = self._existing(collector.rows.get("BJCP_Brewery", []), breweries)
+        self.comparisons = {row[0]: row for row in comparison_rows(sources, stable_ids=True)}
+
+    @staticmethod
+    def _existing(rows, vocabulary):
+        sort_orders = dict(vocabulary.sort_orders())
+        return {row[1]: row[:-1] + (sort_orders[row[0]],) for row in rows}
+
+class DeltaSummary:
+    """Counts of what a delta writes."""
+
+    def __init__(self):
+        self.added = self.updated = self.removed = self.unchanged = 0
+        self.columns = 0
+        # StyleIds deleted unless recipes or competition entries still reference them
+        self.removed_style_ids = []
+        self.categories = self.tags = self.breweries = None
+        self.removed_categories = self.removed_tags = self.removed_breweries = 0
+        self.comparisons_written = self.comparisons_removed = 0
+
+    @property
+    def changed(self):
+        return bool(self.added or self.updated or self.removed
+                    or self.categories.added or self.categories.updated or self.removed_categories
+                    or self.tags.added or self.tags.updated or self.removed_tags
+                    or self.breweries.added or self.breweries.updated or self.removed_breweries
+                    or self.comparisons_written or self.comparisons_removed
+                    or self.categories.sort_orders() or self.tags.sort_orders() or self.breweries.sort_orders())
+
+    def describe(self):
+        return (f"{self.added} added, {self.updated} updated ({self.columns} BeerStyle columns), "
+                f"{self.removed} removed, {self.unchanged} unchanged")
+
+    def print_summary(self):
+        print(f"📊 Delta summary:")
+        print(f"   - categories: {self.categories.added} added, {self.categories.updated} updated, "
+              f"{self.removed_categories} removed")
+        print(f"   - tags: {self.tags.added} added, {self.tags.updated} updated, {self.removed_tags} removed")
+        print(f"   - breweries: {self.breweries.added} added, {self.breweries.updated} updated, "
+              f"{self.removed_breweries} removed")
+        print(f"   - beer styles: {self.describe()}")
+        print(f"   - style comparisons: {self.comparisons_written} written, {self.comparisons_removed} removed")
+
+def style_changes(number, current, row, children):
+    """Compare a changed style with its old digests.
+
+    Returns the changed BeerStyle columns with their values, and per child
+    table the rows to insert, update and delete.
+    """
+    changed = [(column, value) for column, value, digest in zip(BEER_STYLE_COLUMNS, row, current.columns)
+               if value_digest(value) != digest]
+
+    writes = {}
+    for table, id_column, _, _ in CHILD_TABLES:
+        rows = children[table]
+        if id_column is None:
+            wanted = dict.fromkeys(rows)
+            writes[table] = ([key for key in wanted if key not in current.mappings], [],
+                             [key for key in current.mappings if key not in wanted])
+            continue
+        old = current.children[table]
+        inserts = []
+        updates = []
+        for i, child in enumerate(rows):
+            child_id = stable_id(table, number, str(i))
+            if i >= len(old):
+                inserts.append((child_id,) + child)
+            elif value_digest(child) != old[i]:
+                updates.append((child_id,) + child)
+        deletes = [stable_id(table, number, str(i)) for i in range(len(rows), len(old))]
+        writes[table] = (inserts, updates, deletes)
+    return changed, writes
+
+def write_delta(writer, old, chunks):
+    """Write the changes from CatalogState old to the catalog entries in chunks and return a DeltaSummary.
+
+    writer needs insert, update and delete (e.g. a generate_bjcp_migration.SqlFileWriter).
+    """
+    categories, tags, breweries = catalog_vocabularies(old.categories, old.tags, old.breweries)
+    summary = DeltaSummary()
+    summary.categories, summary.tags, summary.breweries = categories, tags, breweries
+    numbers = set()
+    comparison_sources = []
+
+    for chunk in chunks:
+        write_vocabulary(writer, chunk, categories, tags, breweries)
+
+        new_styles = []
+        updates = {}
+        child_writes = {table: ([], [], []) for table, _, _, _ in CHILD_TABLES}
+        for entry in chunk:
+            number = entry['number']
+            numbers.add(number)
+            style_id = stable_id('style', number)
+            comparison_sources.append(comparison_source(entry, style_id))
+
+            current = old.styles.get(number)
+            if current is None:
+                new_styles.append((style_id, entry))
+                continue
+            if current.content == content_hash(entry):
+                summary.unchanged += 1
+                continue
+
+            row = style_row(entry, style_id, categories.ids.get(entry['category_number']))
+            changed, writes = style_changes(number, current, row,
+                                            child_rows(entry, style_id, tags.ids, breweries.ids))
+            if changed:
+                columns = tuple(column for column, _ in changed)
+                updates.setdefault(columns, []).append((style_id,) + tuple(value for _, value in changed))
+                summary.columns += len(changed)
+            for table, (inserts, row_updates, deletes) in writes.items():
+                child_writes[table][0].extend(inserts)
+                child_writes[table][1].extend(row_updates)
+                child_writes[table][2].extend(deletes)
+            summary.updated += 1
+
+        # Styles with the same changed columns share one UPDATE shape
+        for columns, rows in updates.items():
+            writer.update("BeerStyle", "StyleId", list(columns), rows, touch_column="Updated")
+        writer.insert(
+            "BeerStyle", BEER_STYLE_COLUMNS,
+            [style_row(entry, style_id, categories.ids.get(entry['category_number']))
+             for style_id, entry in new_styles]
+        )
+
+        for table, id_column, columns, _ in CHILD_TABLES:
+            inserts, row_updates, deletes = child_writes[table]
+            for style_id, entry in new_styles:
+                for i, child in enumerate(child_rows(entry, style_id, tags.ids, breweries.ids)[table]):
+                    inserts.append(child if id_column is None
+                                   else (stable_id(table, entry['number'], str(i)),) + child)
+            # Deletes go first so re-added tag mappings do not collide with the rows they replace
+            writer.delete(table, id_column or columns, deletes)
+            writer.update(table, id_column, columns, row_updates)
+            writer.insert(table, ([id_column] if id_column else []) + columns, inserts)
+        summary.added += len(new_styles)
+
+    # Children and comparisons cascade from BeerStyle; styles recipes or competition entries use are kept
+    removed = [stable_id('style', number) for number in old.styles if number not in numbers]
+    writer.delete("BeerStyle", "StyleId", removed, unless_referenced_by=STYLE_REFERENCES)
+    summary.removed = len(removed)
+    summary.removed_style_ids = removed
+
+    write_sort_orders(writer, categories, tags, breweries)
+
+    # Comparisons depend on every style's name, so they are re-resolved and diffed as a whole
+    desired = {row[0]: row for row in comparison_rows(comparison_sources, stable_ids=True)}
+    stale = [key for key, row in old.comparisons.items()
+             if desired.get(key) != row and row[1] not in removed and row[2] not in removed]
+    writer.delete("BJCP_StyleComparison", "ComparisonId", stale)
+    summary.comparisons_removed = len(stale)
+    summary.comparisons_written = writer.insert(
+        "BJCP_StyleComparison", ["ComparisonId"] + COMPARISON_COLUMNS,
+        [row for key, row in desired.items() if old.comparisons.get(key) != row]
+    )
+
+    # Tags cascade out of their mappings and the examples that named a stale brewery were rewritten above;
+    # categories only go once no style uses them, in case the database has drifted from the old guide
+    stale_tags = tags.stale_ids()
+    writer.delete("BJCP_StyleTag", "TagId", stale_tags)
+    summary.removed_tags = len(stale_tags)
+    stale_breweries = breweries.stale_ids()
+    writer.delete("BJCP_Brewery", "BreweryId", stale_breweries)
+    summary.removed_breweries = len(stale_breweries)
+    stale_categories = categories.stale_ids()
+    writer.delete("BJCP_BeerCategory", "CategoryId", stale_categories, unless_referenced_by=CATEGORY_REFERENCES)
+    summary.removed_categories = len(stale_categories)
+    return summary
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+In-memory indexed queries over the BJCP style catalog.
+Built from the catalog entries populate_bjcp_data.py produces: a hash lookup
+by BJCP number, sorted interval indexes on the OG/FG/ABV/IBU/SRM ranges and
+inverted indexes on tags, category, characteristic keywords and the breweries
+of the commercial examples. A query
+starts from its most selective constraint and checks the others only against
+those candidates, so multi-constraint queries never scan the whole catalog.
+Run as a script to benchmark the indexes against a linear scan, on the real
+guide or on synthetic guides of several sizes. The real guide's 110 styles are
+too few for the indexes to pay off much; the gain grows with the catalog.
+"""
+
+import argparse
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from bjcp_breweries import brewery_key
+from bjcp_cache import DEFAULT_CACHE_DIR
+from bjcp_normalize import RANGE_COLUMNS
+from bjcp_records import RANGE_FIELDS
+from populate_bjcp_data import open_catalog
+
+EMPTY = np.empty(0, dtype=np.int32)
+
+class IndexedStyle:
+    """A style as returned by StyleIndex queries."""
+
+    __slots__ = ('number', 'name', 'category', 'category_number', 'tags', 'keywords', 'breweries', 'ranges')
+
+    def __init__(self, entry):
+        style = entry['style']
+        self.number = entry['number']
+        self.name = style['StyleName']
+        self.category = style['Category']
+        self.category_number = entry['category_number']
+        self.tags = frozenset(entry['tags'])
+        self.keywords = frozenset(keyword for _, _, keywords in entry['characteristics'] for keyword in keywords)
+        self.breweries = frozenset(key for _, _, _, key in entry['examples'] if key)
+        self.ranges = {field: tuple(None if style[column] is None else float(style[column])
+                                    for column in RANGE_COLUMNS[field])
+                       for field in RANGE_FIELDS}
+
+    def allows(self, field, value):
+        """True when value lies inside this style's range for field; missing bounds never match."""
+        minimum, maximum = self.ranges[field]
+        return minimum is not None and maximum is not None and minimum <= value <= maximum
+
+    def __repr__(self):
+        return f"IndexedStyle({self.number!r}, {self.name!r})"
+
+class RangeIndex:
+    """Styles sorted by the minimum and by the maximum of one vital statistic."""
+
+    def __init__(self, bounds):
+        # Missing bounds are NaN, which never compare true and sort last
+        self.minimums = bounds[:, 0]
+        self.maximums = bounds[:, 1]
+        self.by_minimum = np.argsort(self.minimums, kind='stable').astype(np.int32)
+        self.by_maximum = np.argsort(self.maximums, kind='stable').astype(np.int32)
+        self.sorted_minimums = self.minimums[self.by_minimum]
+        self.sorted_maximums = self.maximums[self.by_maximum]
+        # NaN maximums sort after every value, so the >= side ends at the known ones
+        self.known_maximums = int(np.count_nonzero(~np.isnan(self.maximums)))
+
+    def candidates(self, value):
+        """The smaller of: styles whose minimum is <= value, styles whose maximum is >= value."""
+        below = int(np.searchsorted(self.sorted_minimums, value, side='right'))
+        above = int(np.searchsorted(self.sorted_maximums, value, side='left'))
+        if below <= self.known_maximums - above:
+            return self.by_minimum[:below]
+        return self.by_maximum[above:self.known_maximums]
+
+    def filter(self, ids, value):
+        """The ids whose range contains value."""
+        return ids[(self.minimums[ids] <= value) & (self.maximums[ids] >= value)]
+
+class StyleIndex:
+    """Hash, interval and inverted indexes over a list of catalog entries."""
+
+    def __init__(self, entries):
+        self.styles = [IndexedStyle(entry) for entry in entries]
+        self.by_number = {style.number: i for i, style in enumerate(self.styles)}
+
+        bounds = np.full((len(self.styles), len(RANGE_FIELDS), 2), np.nan)
+        for i, style in enumerate(self.styles):
+            for j, field in enumerate(RANGE_FIELDS):
+                bounds[i, j] = [np.nan if bound is None else bound for bound in style.ranges[field]]
+        self.ranges = {field: RangeIndex(bounds[:, j]) for j, field in enumerate(RANGE_FIELDS)}
+
+        self.tags = self._postings((i, tag) for i, style in enumerate(self.styles) for tag in style.tags)
+        self.categories = self._postings((i, style.category_number) for i, style in enumerate(self.styles))
+        self.keywords = self._postings((i, keyword) for i, style in enumerate(self.styles)
+                                       for keyword in style.keywords)
+        self.breweries = self._postings((i, key) for i, style in enumerate(self.styles) for key in style.breweries)
+
+    @classmethod
+    def from_catalog(cls, json_file_path, cache_dir=DEFAULT_CACHE_DIR):
+        """Build the index from a BeerJSON file, through the transformed-entry cache."""
+        _, entries = open_catalog(json_file_path, cache_dir=cache_dir)
+        return cls(entries)
+
+    @staticmethod
+    def _postings(pairs):
+        """Inverted index: key -> sorted array of style positions."""
+        postings = {}
+        for i, key in pairs:
+            postings.setdefault(key, []).append(i)
+        return {key: np.unique(np.array(ids, dtype=np.int32)) for key, ids in postings.items()}
+
+    def __len__(self):
+        return len(self.styles)
+
+    def get(self, number):
+        """The style with this BJCP number, or None."""
+        i = self.by_number.get(number)
+        return None if i is None else self.styles[i]
+
+    def query(self, tags=(), category=None, keywords=(), brewery=None, **values):
+        """Styles matching every constraint, in catalog order.
+
+        values are vital statistics (og, fg, abv, ibu, srm) that must fall
+        inside the style's range; every tag and keyword must be present, and
+        brewery must have a commercial example of the style.
+        """
+        unknown = set(values) - set(RANGE_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown vital statistics: {', '.join(sorted(unknown))}")
+
+        postings = [self.tags.get(tag, EMPTY) for tag in tags]
+        postings += [self.keywords.get(keyword.lower(), EMPTY) for keyword in keywords]
+        if category is not None:
+            postings.append(self.categories.get(category, EMPTY))
+        if brewery is not None:
+            postings.append(self.breweries.get(brewery_key(brewery), EMPTY))
+        ranges = [(self.ranges[field], value) for field, value in values.items()]
+
+        # Start from the shortest candidate list and narrow it with every other constraint
+        candidates = postings + [index.candidates(value) for index, value in ranges]
+        if not candidates:
+            return list(self.styles)
+        ids = min(candidates, key=len)
+        for other in postings:
+            if not len(ids):
+                break
+            if other is not ids:
+                ids = ids[np.isin(ids, other, assume_unique=True)]
+        for index, value in ranges:
+            ids = index.filter(ids, value)
+        return [self.styles[i] for i in np.sort(ids)]
+
+    def scan(self, tags=(), category=None, keywords=(), brewery=None, **values):
+        """The same query as query(), answered by checking every style; the benchmark baseline."""
+        keywords = [keyword.lower() for keyword in keywords]
+        brewery = None if brewery is None else brewery_key(brewery)
+        return [style for style in self.styles
+                if (category is None or style.category_number == category)
+                and (brewery is None or brewery in style.breweries)
+                and all(tag in style.tags for tag in tags)
+                and all(keyword in style.keywords for keyword in keywords)
+                and all(style.allows(field, value) for field, value in values.items())]
+
+def sample_queries(index, count, seed=0):
+    """Queries built around random styles, so most of them have matches."""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        style = rng.choice(index.styles)
+        query = {}
+        for field in rng.sample(RANGE_FIELDS, rng.randint(1, 3)):
+            minimum, maximum = style.ranges[field]
+            if minimum is not None and maximum is not None:
+                query[field] = rng.uniform(minimum, maximum)
+        if style.tags and rng.random() < 0.5:
+            query['tags'] = (rng.choice(sorted(style.tags)),)
+        if rng.random() < 0.3:
+            query['category'] = style.category_number
+        if style.breweries and rng.random() < 0.2:
+            query['brewery'] = rng.choice(sorted(style.breweries))
+        queries.append(query)
+    return queries
+
+def benchmark(index, queries):
+    """Time query() against scan() over the same queries and check they agree.
+
+    Returns the seconds per query of each method and the number of queries whose results differ.
+    """
+    timings = {}
+    results = {}
+    for method in ('scan', 'query'):
+        run = getattr(index, method)
+        started = time.perf_counter()
+        results[method] = [run(**query) for query in queries]
+        timings[method] = (time.perf_counter() - started) / len(queries)
+
+    mismatches = sum(1 for a, b in zip(results['scan'], results['query']) if a != b)
+    matches = sum(len(result) for result in results['query']) / len(queries)
+    print(f"📏 {len(queries)} queries over {len(index)} styles, {matches:.1f} matches per query on average")
+    print(f"   - linear scan: {timings['scan'] * 1e6:9.1f} µs/query")
+    print(f"   - indexed:     {timings['query'] * 1e6:9.1f} µs/query ({timings['scan'] / timings['query']:.1f}x)")
+    if mismatches:
+        print(f"   ❌ {mismatches} queries returned different styles")
+    return timings, mismatches
+
+def benchmark_sizes(sizes, query_count, seed=0):
+    """Benchmark synthetic guides of each size and print how both methods scale with the style count.
+
+    Returns the total number of mismatching queries.
+    """
+    # Only needed here: the generator imports every loader module
+    from benchmark_bjcp_pipeline import generate_corpus
+
+    work_dir = tempfile.mkdtemp(prefix='bjcp-index-')
+    results = {}
+    try:
+        for size in sizes:
+            corpus = os.path.join(work_dir, f'corpus-{size}.json')
+            generate_corpus(corpus, size, seed)
+            started = time.perf_counter()
+            index = StyleIndex.from_catalog(corpus, cache_dir=None)
+            print(f"\n🗂️  Indexed {len(index)} synthetic styles in {time.perf_counter() - started:.2f}s")
+            results[size] = benchmark(index, sample_queries(index, query_count, seed))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print("\n📈 Time per query ~ styles^k (1.0 grows like the catalog):")
+    for smaller, larger in zip(sizes, sizes[1:]):
+        ratio = math.log(larger / smaller)
+        before, after = results[smaller][0], results[larger][0]
+        print(f"   {smaller}→{larger}: linear scan k={math.log(after['scan'] / before['scan']) / ratio:.2f}, "
+              f"indexed k={math.log(after['query'] / before['query']) / ratio:.2f}")
+    return sum(mismatches for _, mismatches in results.values())
+
+if __name__ == "__main__":
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    default_json = os.path.join(script_dir, "..", "..", "database", "bjcp2.json")
+
+    parser = argparse.ArgumentParser(description="Benchmark indexed BJCP style queries against a linear scan")
+    parser.add_argument('--json', default=default_json,
+                        help="BeerJSON file to index (default: database/bjcp2.json)")
+    parser.add_argument('--queries', type=int, default=2000,
+                        help="random multi-constraint queries to run (default: 2000)")
+    parser.add_argument('--seed', type=int, default=0,
+                        help="random seed for the queries and synthetic guides")
+    parser.add_argument('--sizes', metavar='N,N,...',
+                        help="benchmark synthetic guides of these sizes, generated like benchmark_bjcp_pipeline.py, "
+                             "instead of --json, and report how query time scales")
+    args = parser.parse_args()
+
+    if args.sizes:
+        sizes = sorted(int(size) for size in args.sizes.split(','))
+        sys.exit(1 if benchmark_sizes(sizes, args.queries, args.seed) else 0)
+
+    started = time.perf_counter()
+    index = StyleIndex.from_catalog(args.json)
+    print(f"🗂️  Indexed {len(index)} styles in {time.perf_counter() - started:.2f}s")
+    _, mismatches = benchmark(index, sample_queries(index, args.queries, args.seed))
+    sys.exit(1 if mismatches else 0)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Incremental reader for BeerJSON style guides.
+Yields the elements of a JSON array (beerjson.styles by default) one at a time,
+reading the file in fixed-size chunks so memory use stays flat no matter how
+large the style guide is.
+"""
+
+import json
+
+CHUNK_SIZE = 1 << 16
+WHITESPACE = ' \t\n\r'
+DELIMITERS = ',]}' + WHITESPACE
+
+_decoder = json.JSONDecoder()
+
+class _ChunkReader:
+    """Buffered cursor over a text file that decodes one JSON value at a time."""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """Append the next chunk to the unread part of the buffer; return False at end of file."""
+        data = self.f.read(self.chunk_size)
+        if not data:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                raise ValueError("Unexpected end of JSON input")
+
+    def expect(self, char):
+        """Consume char, which must be the next non-whitespace character."""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' but found '{found}'")
+        self.pos += 1
+
+    def value(self):
+        """Decode and consume the next complete JSON value."""
+        if self.peek() not in '{["':
+            # Numbers and literals have no closing bracket, so read on until a delimiter follows them
+            while not any(char in DELIMITERS for char in self.buffer[self.pos:]) and self.fill():
+                pass
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.fill()
+
+    def skip(self):
+        """Consume the next JSON value without building it in memory."""
+        if self.peek() not in '{[':
+            self.value()
+            return
+        depth = 0
+        in_string = False
+        escaped = False
+        while True:
+            if self.pos >= len(self.buffer) and not self.fill():
+                raise ValueError("Unexpected end of JSON input")
+            char = self.buffer[self.pos]
+            self.pos += 1
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == '\\':
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char in '{[':
+                depth += 1
+            elif char in '}]':
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def find_key(self, key):
+        """Consume an object up to the value of key, skipping every other member."""
+        self.expect('{')
+        if self.peek() == '}':
+            raise KeyError(key)
+        while True:
+            name = self.value()
+            self.expect(':')
+            if name == key:
+                return
+            self.skip()
+            if self.peek() == '}':
+                raise KeyError(key)
+            self.expect(',')
+
+def iter_json_array(json_file_path, keys=('beerjson', 'styles'), chunk_size=CHUNK_SIZE):
+    """Yield the elements of the array found by following keys from the document root.
+
+    Pass keys=() when the document itself is the array.
+    """
+    with open(json_file_path, 'r', encoding='utf-8') as f:
+        reader = _ChunkReader(f, chunk_size)
+        for key in keys:
+            reader.find_key(key)
+
+        reader.expect('[')
+        if reader.peek() == ']':
+            return
+        while True:
+            yield reader.value()
+            separator = reader.peek()
+            reader.pos += 1
+            if separator == ']':
+                return
+            if separator != ',':
+                raise ValueError(f"Expected ',' or ']' but found '{separator}'")
+
+def iter_styles(json_file_path, chunk_size=CHUNK_SIZE):
+    """Yield BeerJSON styles from beerjson.styles one at a time."""
+    return iter_json_array(json_file_path, ('beerjson', 'styles'), chunk_size)
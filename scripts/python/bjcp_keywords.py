@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Corpus-level keyword extraction for BJCP style characteristics.
+Every aroma/appearance/flavor/mouthfeel text is a document. Document
+frequencies are counted over a whole style guide and pinned in
+bjcp_keyword_model.json; keywords are then the top TF-IDF terms of each text,
+scored a batch of texts at a time with NumPy so common words ("with", "from",
+"moderate") sink and distinctive ones surface. Because loads score against the
+pinned model rather than the guide being loaded, a style's keywords depend
+only on its own text, and editing one style never changes another's.
+"""
+
+import json
+import math
+import os
+import re
+from collections import Counter
+
+import numpy as np
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bjcp_keyword_model.json")
+
+KEYWORD_COUNT = 10
+
+TOKEN_PATTERN = re.compile(r"[^\W\d_]+(?:[-'][^\W\d_]+)*")
+
+STOPWORDS = frozenset("""
+    a about above after again against all also although am an and any are as at be because been
+    before being below between both but by can could did do does doing down during each either
+    else especially even ever few for from further generally had has have having here how however
+    if in into is it its itself just many may might more most much must no nor not of off often
+    on once only or other otherwise our out over own perhaps quite rather same should since so
+    some such than that the their them then there these they this those though through thus to
+    too typically under until up upon usually very was way were what when where whether which
+    while who whom why will with within without would yet
+
+    allow allowable allowed allowing amount amounts appropriate close depending desirable despite
+    detect enough example examples fault faults found like maybe never notes optional perceived
+    present rarely relatively seldom slightly something sometimes using versions virtually
+""".split())
+
+def tokenize(text):
+    """Lowercase text and split it into words, dropping stopwords and one- or two-letter tokens."""
+    return [token for token in TOKEN_PATTERN.findall(text.lower())
+            if len(token) > 2 and token not in STOPWORDS]
+
+class KeywordModel:
+    """Inverse document frequencies for a corpus of characteristic texts."""
+
+    def __init__(self, document_frequencies, document_count):
+        self.document_frequencies = dict(document_frequencies)
+        self.document_count = document_count
+        # Smoothed idf; terms never seen while indexing score as if they occurred in one document
+        self.unseen_idf = math.log((1 + document_count) / 2) + 1
+        self.idf = {term: math.log((1 + document_count) / (1 + frequency)) + 1
+                    for term, frequency in document_frequencies.items()}
+
+    @classmethod
+    def from_texts(cls, texts):
+        """Count document frequencies in one streaming pass over texts."""
+        frequencies = Counter()
+        document_count = 0
+        for text in texts:
+            frequencies.update(set(tokenize(text)))
+            document_count += 1
+        return cls(frequencies, document_count)
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_MODEL_PATH):
+        """Load a model pinned with save()."""
+        with open(path, 'r', encoding='utf-8') as f:
+            model = json.load(f)
+        return cls(model['document_frequencies'], model['document_count'])
+
+    def save(self, path=DEFAULT_MODEL_PATH):
+        """Pin the document frequencies in a JSON file, one term per line so refreshes diff cleanly."""
+        model = {
+            'description': "Document frequencies of the terms of BJCP characteristic texts, pinned so that "
+                           "keyword scores do not shift when other styles change. Rebuild with "
+                           "populate_bjcp_data.py --refresh-keyword-model.",
+            'document_count': self.document_count,
+            'document_frequencies': dict(sorted(self.document_frequencies.items()))
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(model, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+
+    def top_terms(self, texts, count=KEYWORD_COUNT):
+        """Return the count highest-scoring terms of every text, best first.
+
+        Scores are (1 + log tf) * idf. Ties keep the order in which terms
+        first appear in the text, so results are deterministic.
+        """
+        local_ids = {}
+        terms = []
+        document_index = []
+        term_index = []
+        for document, text in enumerate(texts):
+            for token in tokenize(text):
+                term_id = local_ids.get(token)
+                if term_id is None:
+                    term_id = local_ids[token] = len(terms)
+                    terms.append(token)
+                document_index.append(document)
+                term_index.append(term_id)
+
+        results = [[] for _ in range(len(texts))]
+        if not terms:
+            return results
+
+        idf = np.array([self.idf.get(term, self.unseen_idf) for term in terms])
+        pair_keys = np.array(document_index, dtype=np.int64) * len(terms) + np.array(term_index, dtype=np.int64)
+        keys, first_seen, frequencies = np.unique(pair_keys, return_index=True, return_counts=True)
+        pair_documents = keys // len(terms)
+        pair_terms = keys % len(terms)
+        scores = (1 + np.log(frequencies)) * idf[pair_terms]
+
+        # Sort by document, then score descending, then first appearance; keep each document's first count
+        order = np.lexsort((first_seen, -scores, pair_documents))
+        sorted_documents = pair_documents[order]
+        rank = np.arange(len(order)) - np.searchsorted(sorted_documents, sorted_documents)
+        keep = order[rank < count]
+
+        for document, term_id in zip(pair_documents[keep].tolist(), pair_terms[keep].tolist()):
+            results[document].append(terms[term_id])
+        return results
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Machine-readable run metrics for the BJCP scripts.
+A RunMetrics object records wall and CPU time per phase, rows, statements
+and write time per table, every statement sent through its counting cursor
+(by SQL verb), peak RSS, and optionally the tracemalloc peak per phase and a
+cProfile capture. finish() writes it all as one JSON document, so runs can
+be compared across releases.
+"""
+
+import cProfile
+import io
+import json
+import pstats
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+
+import psycopg2
+import psycopg2.extensions
+
+METRICS_FORMAT = 1
+
+# --metrics path that writes the JSON document to stdout
+STDOUT_PATH = '-'
+
+# Functions listed in the JSON document when profiling, by cumulative time
+PROFILE_TOP = 25
+
+def statement_verb(sql):
+    """The leading SQL keyword of a statement, e.g. INSERT or COPY."""
+    if isinstance(sql, bytes):
+        sql = sql.decode('utf-8', 'replace')
+    words = str(sql).split(None, 1)
+    return words[0].upper() if words else ''
+
+def counting_cursor(metrics):
+    """A psycopg2 cursor class that counts every statement it sends in metrics."""
+
+    class CountingCursor(psycopg2.extensions.cursor):
+        def execute(self, query, vars=None):
+            metrics.count_statement(query)
+            return super().execute(query, vars)
+
+        def executemany(self, query, vars_list):
+            vars_list = list(vars_list)
+            metrics.count_statement(query, len(vars_list))
+            return super().executemany(query, vars_list)
+
+        def copy_expert(self, sql, file, size=8192):
+            metrics.count_statement(sql)
+            return super().copy_expert(sql, file, size)
+
+    return CountingCursor
+
+def progress_to_stderr(path):
+    """Print progress to stderr when the metrics document goes to stdout, so stdout is only JSON."""
+    if path == STDOUT_PATH:
+        sys.stdout = sys.stderr
+
+class NullMetrics:
+    """Stand-in used when a run is not instrumented; every hook does nothing."""
+
+    def connect(self, db_config):
+        return psycopg2.connect(**db_config)
+
+    def count_statement(self, sql, count=1):
+        pass
+
+    def phase(self, name):
+        return nullcontext()
+
+    def timed(self, name, iterable):
+        return iterable
+
+    def add_phase(self, name, wall_seconds):
+        pass
+
+    def record_tables(self, stats):
+        pass
+
+NO_METRICS = NullMetrics()
+
+class RunMetrics:
+    """Timings, counts and memory figures for one script run."""
+
+    def __init__(self, script, trace_memory=False, profile_path=None, **options):
+        self.script = script
+        self.options = options
+        self.trace_memory = trace_memory
+        self.profile_path = profile_path
+        self.lock = threading.Lock()
+        self.phases = {}
+        self.tables = {}
+        self.statements = Counter()
+        self.open_phases = []
+        self.peak_traced = 0
+        self.started_at = datetime.now(timezone.utc)
+        self.started = time.perf_counter()
+        self.started_cpu = time.process_time()
+        self.cursor_factory = counting_cursor(self)
+
+        if trace_memory:
+            tracemalloc.start()
+        self.profiler = cProfile.Profile() if profile_path else None
+        if self.profiler:
+            self.profiler.enable()
+
+    def connect(self, db_config):
+        """Open a connection whose cursors count their statements here."""
+        return psycopg2.connect(**db_config, cursor_factory=self.cursor_factory)
+
+    def count_statement(self, sql, count=1):
+        with self.lock:
+            self.statements[statement_verb(sql)] += count
+
+    def _phase(self, name):
+        return self.phases.setdefault(name, {'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0})
+
+    @contextmanager
+    def phase(self, name):
+        """Time the enclosed block as phase name; repeated phases accumulate.
+
+        CPU time is for the whole process, so it includes a pipelined writer
+        thread working at the same time.
+        """
+        with self.lock:
+            phase = self._phase(name)
+            self._fold_peak()
+            self.open_phases.append(phase)
+        started = time.perf_counter()
+        started_cpu = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - started
+            cpu = time.process_time() - started_cpu
+            with self.lock:
+                self._fold_peak()
+                # Phase records compare by value, so the open one is found by identity
+                del self.open_phases[next(i for i, open_phase in enumerate(self.open_phases)
+                                          if open_phase is phase)]
+                phase['calls'] += 1
+                phase['wall_seconds'] += wall
+                phase['cpu_seconds'] += cpu
+
+    def _fold_peak(self):
+        """Credit the tracemalloc peak since the last reset to every open phase, then reset it.
+
+        Resetting at each phase boundary gives inner phases their own peak
+        without losing it for the phases around them.
+        """
+        if not self.trace_memory:
+            return
+        peak = tracemalloc.get_traced_memory()[1]
+        self.peak_traced = max(self.peak_traced, peak)
+        for phase in self.open_phases:
+            phase['peak_traced_bytes'] = max(phase.get('peak_traced_bytes', 0), peak)
+        tracemalloc.reset_peak()
+
+    def timed(self, name, iterable):
+        """Yield from iterable, timing only the work of producing each item as phase name."""
+        iterator = iter(iterable)
+        while True:
+            with self.phase(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def add_phase(self, name, wall_seconds):
+        """Record a phase timed elsewhere, e.g. a whole target load on another thread."""
+        with self.lock:
+            phase = self._phase(name)
+            phase['calls'] += 1
+            phase['wall_seconds'] += wall_seconds
+
+    def record_tables(self, stats):
+        """Add a writer's per-table stats, given as table -> (rows, statements, seconds)."""
+        with self.lock:
+            for table, (rows, statements, seconds) in stats.items():
+                totals = self.tables.setdefault(table, {'rows': 0, 'statements': 0, 'seconds': 0.0})
+                totals['rows'] += rows
+                totals['statements'] += statements
+                totals['seconds'] += seconds
+
+    def _profile_summary(self):
+        self.profiler.disable()
+        self.profiler.dump_stats(self.profile_path)
+        stats = pstats.Stats(self.profiler, stream=io.StringIO())
+        rows = []
+        for (filename, line, function), (_, calls, total, cumulative, _) in stats.stats.items():
+            rows.append({
+                'function': f"{filename}:{line}({function})",
+                'calls': calls,
+                'total_seconds': round(total, 6),
+                'cumulative_seconds': round(cumulative, 6)
+            })
+        rows.sort(key=lambda row: row['cumulative_seconds'], reverse=True)
+        return {'path': self.profile_path, 'top': rows[:PROFILE_TOP]}
+
+    def as_dict(self, **results):
+        """The metrics document; results are added as extra top-level fields."""
+        document = {
+            'format': METRICS_FORMAT,
+            'script': self.script,
+            'started': self.started_at.isoformat(),
+            'options': self.options,
+            'wall_seconds': round(time.perf_counter() - self.started, 6),
+            'cpu_seconds': round(time.process_time() - self.started_cpu, 6),
+            # ru_maxrss is in kilobytes on Linux
+            'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            'phases': {name: {key: round(value, 6) if isinstance(value, float) else value
+                              for key, value in phase.items()}
+                       for name, phase in self.phases.items()},
+            'tables': {table: dict(totals, seconds=round(totals['seconds'], 6))
+                       for table, totals in self.tables.items()},
+            'statements': dict(self.statements),
+            'statements_total': sum(self.statements.values())
+        }
+        if self.trace_memory:
+            with self.lock:
+                self._fold_peak()
+            document['peak_traced_bytes'] = self.peak_traced
+        if self.profiler:
+            document['profile'] = self._profile_summary()
+        document.update(results)
+        return document
+
+    def finish(self, path, **results):
+        """Write the metrics document as JSON to path, or to stdout when path is '-'.
+
+        With no path only the profile, if any, is written. Writing to stdout
+        expects progress_to_stderr() to have moved everything else off it.
+        """
+        document = self.as_dict(**results)
+        if self.trace_memory:
+            tracemalloc.stop()
+        if self.profiler:
+            print(f"📈 Wrote cProfile stats to {self.profile_path}")
+        if path is None:
+            return document
+        text = json.dumps(document, indent=2, default=str)
+        if path == STDOUT_PATH:
+            sys.__stdout__.write(text + '\n')
+            sys.__stdout__.flush()
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text + '\n')
+            print(f"📈 Wrote run metrics to {path}")
+        return document
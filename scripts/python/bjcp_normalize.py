@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Columnar normalization and validation of BJCP vital statistics.
+The OG/FG/ABV/IBU/SRM ranges of a batch of StyleRecords are converted to
+BeerStyle column values in one NumPy pass, and every inverted range, gravity
+in integer form, out-of-range or missing value is collected in a
+ValidationReport before any SQL is written.
+"""
+
+from collections import Counter, defaultdict
+from decimal import Decimal
+from functools import lru_cache
+from itertools import islice
+
+import numpy as np
+
+from bjcp_records import RANGE_FIELDS
+
+NORMALIZE_CHUNK_SIZE = 500
+
+# BeerStyle (min, max) columns for each vital statistic
+RANGE_COLUMNS = {
+    'og': ('OGMin', 'OGMax'),
+    'fg': ('FGMin', 'FGMax'),
+    'abv': ('ABVMin', 'ABVMax'),
+    'ibu': ('IBUMin', 'IBUMax'),
+    'srm': ('SRMMin', 'SRMMax')
+}
+
+# Decimal places kept per statistic; None marks INTEGER columns
+DECIMAL_PLACES = {'og': 3, 'fg': 3, 'abv': 2, 'ibu': None, 'srm': None}
+
+# Largest value each column can store: DECIMAL(5,3), DECIMAL(4,2) and INTEGER
+COLUMN_LIMITS = {'og': 99.999, 'fg': 99.999, 'abv': 99.99, 'ibu': 2 ** 31 - 1, 'srm': 2 ** 31 - 1}
+
+GRAVITY_FIELDS = ('og', 'fg')
+
+# Gravities above this are in integer form (1055 = 1.055)
+GRAVITY_INTEGER_THRESHOLD = 2.0
+
+@lru_cache(maxsize=None)
+def quantized(units, places):
+    """Return units * 10**-places as a Decimal, shared between every style with the same value."""
+    return Decimal(units).scaleb(-places)
+
+class ValidationReport:
+    """Range problems found while normalizing, grouped by kind."""
+
+    KINDS = {
+        'inverted': 'minimum above maximum',
+        'gravity_units': 'gravity in integer form, divided by 1000',
+        'out_of_range': 'outside the column range, stored as NULL',
+        'missing': 'missing value, stored as NULL'
+    }
+
+    # Kinds that mean the source data is wrong, rather than incomplete or auto-corrected
+    ERROR_KINDS = ('inverted', 'out_of_range')
+
+    def __init__(self):
+        self.issues = []
+        self.style_count = 0
+
+    def add(self, number, column, kind, value=None):
+        self.issues.append((number, column, kind, value))
+
+    def counts(self):
+        return Counter(kind for _, _, kind, _ in self.issues)
+
+    def has_errors(self):
+        """True when an inverted or out-of-range value was found."""
+        return any(kind in self.ERROR_KINDS for _, _, kind, _ in self.issues)
+
+    def print_summary(self, limit=10):
+        """Print issue counts per kind, with up to limit examples of each."""
+        counts = self.counts()
+        print(f"🔎 Validated ranges for {self.style_count} styles")
+        if not counts:
+            print("   ✅ No range issues found")
+            return
+
+        by_kind = defaultdict(list)
+        for number, column, kind, value in self.issues:
+            by_kind[kind].append((number, column, value))
+
+        for kind, description in self.KINDS.items():
+            if kind not in counts:
+                continue
+            print(f"   ⚠️  {counts[kind]} {description}")
+            if kind == 'missing':
+                per_column = Counter(column for _, column, _ in by_kind[kind])
+                print("      " + ", ".join(f"{column}: {count}" for column, count in sorted(per_column.items())))
+                continue
+            for number, column, value in by_kind[kind][:limit]:
+                print(f"      {number} {column}: {value}")
+            if counts[kind] > limit:
+                print(f"      ... and {counts[kind] - limit} more")
+
+def normalize_ranges(records, report=None):
+    """Convert the ranges of a batch of StyleRecords into BeerStyle column values.
+
+    Returns one {column: value} dict per record, holding Decimals for DECIMAL
+    columns, ints for INTEGER columns and None for missing or unusable values.
+    """
+    count = len(records)
+    if not count:
+        return []
+    if report is not None:
+        report.style_count += count
+
+    values = np.frombuffer(b''.join(record.ranges.tobytes() for record in records),
+                           dtype=np.float64).reshape(count, 2 * len(RANGE_FIELDS)).copy()
+    numbers = [record.number for record in records]
+    rows = [{} for _ in range(count)]
+
+    for i, field in enumerate(RANGE_FIELDS):
+        bounds = values[:, 2 * i:2 * i + 2]
+        columns = RANGE_COLUMNS[field]
+
+        if field in GRAVITY_FIELDS:
+            integer_form = bounds > GRAVITY_INTEGER_THRESHOLD
+            if report is not None:
+                for row, side in np.argwhere(integer_form):
+                    report.add(numbers[row], columns[side], 'gravity_units', float(bounds[row, side]))
+            bounds[integer_form] /= 1000.0
+
+        missing = np.isnan(bounds)
+        out_of_range = (bounds < 0) | (bounds > COLUMN_LIMITS[field])
+        inverted = bounds[:, 0] > bounds[:, 1]
+        if report is not None:
+            for row, side in np.argwhere(missing):
+                report.add(numbers[row], columns[side], 'missing')
+            for row, side in np.argwhere(out_of_range):
+                report.add(numbers[row], columns[side], 'out_of_range', float(bounds[row, side]))
+            for row in np.flatnonzero(inverted):
+                report.add(numbers[row], f"{columns[0]}/{columns[1]}", 'inverted',
+                           f"{bounds[row, 0]:g} > {bounds[row, 1]:g}")
+
+        places = DECIMAL_PLACES[field]
+        scaled = np.trunc(bounds) if places is None else np.rint(bounds * 10 ** places)
+        scaled[missing | out_of_range] = np.nan
+
+        for side, column in enumerate(columns):
+            for row, units in enumerate(scaled[:, side].tolist()):
+                if units != units:  # NaN
+                    rows[row][column] = None
+                elif places is None:
+                    rows[row][column] = int(units)
+                else:
+                    rows[row][column] = quantized(int(units), places)
+
+    return rows
+
+def iter_normalized(records, report=None, chunk_size=NORMALIZE_CHUNK_SIZE):
+    """Yield (record, range columns) pairs, normalizing records chunk_size at a time."""
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        yield from zip(chunk, normalize_ranges(chunk, report))
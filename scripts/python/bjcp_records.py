@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Compact style records shared by the BJCP scripts.
+Each BeerJSON style is parsed exactly once into a StyleRecord. Text fields are
+plain slots, tags and commercial examples are split once, and the five vital
+statistic ranges are held in a single typed array instead of nested dicts.
+"""
+
+import math
+from array import array
+
+from bjcp_json_stream import iter_styles
+
+# Vital statistics in the order they are stored in StyleRecord.ranges
+RANGE_FIELDS = ('og', 'fg', 'abv', 'ibu', 'srm')
+RANGE_SOURCES = {
+    'og': 'original_gravity',
+    'fg': 'final_gravity',
+    'abv': 'alcohol_by_volume',
+    'ibu': 'international_bitterness_units',
+    'srm': 'color'
+}
+RANGE_INDEX = {field: i for i, field in enumerate(RANGE_FIELDS)}
+
+MISSING = float('nan')
+
+def parse_number(value):
+    """Convert a BeerJSON numeric value to float, using NaN for missing or malformed values."""
+    if value is None or value == '':
+        return MISSING
+    try:
+        return float(str(value).strip())
+    except (ValueError, TypeError):
+        return MISSING
+
+def split_list(text):
+    """Split a comma-separated BeerJSON field into stripped, non-empty items."""
+    if not text:
+        return ()
+    return tuple(item.strip() for item in text.split(',') if item.strip())
+
+class StyleRecord:
+    """One style guide entry, normalized from its BeerJSON form."""
+
+    __slots__ = (
+        'number', 'name', 'category', 'category_number', 'category_description',
+        'overall_impression', 'aroma', 'appearance', 'flavor', 'mouthfeel',
+        'comments', 'history', 'ingredients', 'style_comparison', 'examples',
+        'tags', 'commercial_examples', 'ranges'
+    )
+
+    TEXT_SOURCES = {
+        'number': 'style_id',
+        'name': 'name',
+        'category': 'category',
+        'category_number': 'category_id',
+        'category_description': 'category_description',
+        'overall_impression': 'overall_impression',
+        'aroma': 'aroma',
+        'appearance': 'appearance',
+        'flavor': 'flavor',
+        'mouthfeel': 'mouthfeel',
+        'comments': 'comments',
+        'history': 'history',
+        'ingredients': 'ingredients',
+        'style_comparison': 'style_comparison',
+        'examples': 'examples'
+    }
+
+    @classmethod
+    def from_beerjson(cls, style):
+        """Parse a BeerJSON style dict into a record."""
+        record = cls()
+        for slot, key in cls.TEXT_SOURCES.items():
+            setattr(record, slot, style.get(key))
+        record.tags = split_list(style.get('tags'))
+        record.commercial_examples = split_list(style.get('examples'))
+
+        ranges = array('d')
+        for field in RANGE_FIELDS:
+            source = style.get(RANGE_SOURCES[field]) or {}
+            ranges.append(parse_number((source.get('minimum') or {}).get('value')))
+            ranges.append(parse_number((source.get('maximum') or {}).get('value')))
+        record.ranges = ranges
+        return record
+
+    def range(self, field):
+        """Return (minimum, maximum) for a vital statistic, with None for missing bounds."""
+        i = RANGE_INDEX[field] * 2
+        return tuple(None if math.isnan(value) else value for value in self.ranges[i:i + 2])
+
+    def __repr__(self):
+        return f"StyleRecord({self.number!r}, {self.name!r})"
+
+def iter_records(json_file_path):
+    """Stream StyleRecords from the beerjson.styles array of a BeerJSON file."""
+    for style in iter_styles(json_file_path):
+        yield StyleRecord.from_beerjson(style)
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Shadow copies of a set of tables, built in a side schema and swapped in atomically.
+The shadow tables are loaded while the live ones keep serving reads and writes.
+Keys, indexes, foreign keys, triggers and grants are copied from the live
+tables once the data is in. Row counts and every foreign key are checked
+before the swap. The swap itself runs in one short transaction: it drops the
+live tables, moves the shadow tables into the live schema and re-points the
+foreign keys of other tables at them.
+"""
+
+import re
+import time
+
+import psycopg2
+import psycopg2.errors
+
+SHADOW_SCHEMA = 'bjcp_shadow'
+
+# The swap waits at most this long for each lock, then backs off and retries,
+# so it never queues ahead of the API's readers for long
+SWAP_LOCK_TIMEOUT = '2s'
+SWAP_ATTEMPTS = 5
+
+TABLE_REFERENCE = re.compile(r' ON (ONLY )?\S+ ')
+
+def retarget(definition, table):
+    """Point a CREATE INDEX / CREATE TRIGGER definition at another table."""
+    return TABLE_REFERENCE.sub(lambda match: f' ON {match.group(1) or ""}{table} ', definition, count=1)
+
+class ShadowTables:
+    """Build shadow copies of tables (given in load order) and swap them in for the live ones."""
+
+    def __init__(self, cur, tables, schema=SHADOW_SCHEMA):
+        self.cur = cur
+        self.tables = tables
+        self.schema = schema
+        cur.execute('SELECT current_schema()')
+        self.live_schema = cur.fetchone()[0]
+        self.definitions = {}
+        self.references = []
+
+    def live(self, table):
+        return f'"{self.live_schema}"."{table}"'
+
+    def shadow(self, table):
+        return f'"{self.schema}"."{table}"'
+
+    def create(self):
+        """Create empty shadow tables and make unqualified table names resolve to them.
+
+        Definitions are read before search_path changes, so the names in them
+        resolve to the shadow tables when they are replayed.
+        """
+        cur = self.cur
+        for table in self.tables:
+            self.definitions[table] = self._read_definitions(table)
+        self.references = self._read_references()
+
+        cur.execute(f'DROP SCHEMA IF EXISTS "{self.schema}" CASCADE')
+        cur.execute(f'CREATE SCHEMA "{self.schema}"')
+        for table in self.tables:
+            # Indexes and foreign keys are added after the load, which is faster than maintaining them
+            cur.execute(f'''
+                CREATE TABLE {self.shadow(table)} (LIKE {self.live(table)}
+                    INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING GENERATED
+                    INCLUDING IDENTITY INCLUDING STORAGE INCLUDING COMMENTS)
+            ''')
+        cur.execute(f'SET search_path TO "{self.schema}", "{self.live_schema}"')
+
+    def _read_definitions(self, table):
+        cur = self.cur
+        live = self.live(table)
+        cur.execute('''
+            SELECT conname, pg_get_constraintdef(oid), contype = 'f'
+            FROM pg_constraint
+            WHERE conrelid = %s::regclass AND contype IN ('p', 'u', 'x', 'f')
+            ORDER BY contype = 'f', conname
+        ''', (live,))
+        constraints = cur.fetchall()
+
+        # Indexes that do not back a primary key, unique or exclusion constraint
+        cur.execute('''
+            SELECT pg_get_indexdef(i.indexrelid)
+            FROM pg_index i
+            WHERE i.indrelid = %s::regclass
+              AND NOT EXISTS (SELECT 1 FROM pg_constraint c
+                              WHERE c.conindid = i.indexrelid AND c.conrelid = i.indrelid
+                                AND c.contype IN ('p', 'u', 'x'))
+            ORDER BY 1
+        ''', (live,))
+        indexes = [row[0] for row in cur.fetchall()]
+
+        cur.execute('''
+            SELECT pg_get_triggerdef(oid) FROM pg_trigger
+            WHERE tgrelid = %s::regclass AND NOT tgisinternal
+            ORDER BY tgname
+        ''', (live,))
+        triggers = [row[0] for row in cur.fetchall()]
+
+        cur.execute('''
+            SELECT CASE WHEN a.grantee = 0 THEN 'PUBLIC' ELSE quote_ident(pg_get_userbyid(a.grantee)) END,
+                   a.privilege_type, a.is_grantable
+            FROM pg_class c, aclexplode(c.relacl) a
+            WHERE c.oid = %s::regclass AND a.grantee <> c.relowner
+        ''', (live,))
+        grants = cur.fetchall()
+
+        return {
+            'keys': [(name, definition) for name, definition, foreign in constraints if not foreign],
+            'foreign_keys': [(name, definition) for name, definition, foreign in constraints if foreign],
+            'indexes': indexes,
+            'triggers': triggers,
+            'grants': grants
+        }
+
+    def _read_references(self):
+        """Foreign keys of other tables that point at one of the live tables."""
+        self.cur.execute('''
+            SELECT format('%%I.%%I', n.nspname, r.relname), c.conname, pg_get_constraintdef(c.oid),
+                   t.relname,
+                   ARRAY(SELECT a.attname FROM unnest(c.conkey) WITH ORDINALITY k(attnum, position)
+                         JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = k.attnum
+                         ORDER BY k.position),
+                   ARRAY(SELECT a.attname FROM unnest(c.confkey) WITH ORDINALITY k(attnum, position)
+                         JOIN pg_attribute a ON a.attrelid = c.confrelid AND a.attnum = k.attnum
+                         ORDER BY k.position)
+            FROM pg_constraint c
+            JOIN pg_class r ON r.oid = c.conrelid
+            JOIN pg_namespace n ON n.oid = r.relnamespace
+            JOIN pg_class t ON t.oid = c.confrelid
+            WHERE c.contype = 'f'
+              AND c.confrelid = ANY(%(tables)s::regclass[])
+              AND NOT c.conrelid = ANY(%(tables)s::regclass[])
+            ORDER BY 1, 2
+        ''', {'tables': [self.live(table) for table in self.tables]})
+        return self.cur.fetchall()
+
+    def finish(self, expected_counts):
+        """Add keys, indexes, foreign keys, triggers and grants to the shadow tables and check them.
+
+        Adding the foreign keys validates every reference between shadow
+        tables. Raises ValueError when a shadow table's row count differs from
+        expected_counts or when another table references a missing row.
+        """
+        cur = self.cur
+        for table in self.tables:
+            definitions = self.definitions[table]
+            for name, definition in definitions['keys']:
+                cur.execute(f'ALTER TABLE {self.shadow(table)} ADD CONSTRAINT "{name}" {definition}')
+            for definition in definitions['indexes']:
+                cur.execute(retarget(definition, self.shadow(table)))
+        for table in self.tables:
+            for name, definition in self.definitions[table]['foreign_keys']:
+                cur.execute(f'ALTER TABLE {self.shadow(table)} ADD CONSTRAINT "{name}" {definition}')
+        for table in self.tables:
+            definitions = self.definitions[table]
+            for definition in definitions['triggers']:
+                cur.execute(retarget(definition, self.shadow(table)))
+            for grantee, privilege, grantable in definitions['grants']:
+                cur.execute(f'GRANT {privilege} ON {self.shadow(table)} TO {grantee}'
+                            + (' WITH GRANT OPTION' if grantable else ''))
+            cur.execute(f'ANALYZE {self.shadow(table)}')
+
+        print("🔍 Shadow table row counts (live -> shadow):")
+        mismatches = []
+        for table in self.tables:
+            cur.execute(f'SELECT (SELECT count(*) FROM {self.live(table)}), (SELECT count(*) FROM {self.shadow(table)})')
+            live_count, shadow_count = cur.fetchone()
+            print(f"   - {table}: {live_count} -> {shadow_count}")
+            if table in expected_counts and expected_counts[table] != shadow_count:
+                mismatches.append(f"{table} has {shadow_count} rows, expected {expected_counts[table]}")
+        if mismatches:
+            raise ValueError("Shadow row counts do not match the load: " + "; ".join(mismatches))
+
+        orphans = []
+        for table, name, _, referenced, columns, referenced_columns in self.references:
+            cur.execute(self._orphan_query(table, columns, referenced, referenced_columns))
+            count = cur.fetchone()[0]
+            if count:
+                orphans.append(f"{count} {table} rows ({name})")
+        if orphans:
+            raise ValueError("Rows would lose the styles they reference: " + "; ".join(orphans))
+
+    def _orphan_query(self, table, columns, referenced, referenced_columns):
+        present = ' AND '.join(f'r."{column}" IS NOT NULL' for column in columns)
+        matches = ' AND '.join(f's."{key}" = r."{column}"' for column, key in zip(columns, referenced_columns))
+        return (f'SELECT count(*) FROM {table} r WHERE {present} '
+                f'AND NOT EXISTS (SELECT 1 FROM {self.shadow(referenced)} s WHERE {matches})')
+
+    def swap(self, conn, before_swap=None):
+        """Replace the live tables with the shadow tables in one short transaction.
+
+        before_swap(cur) runs once the live tables are locked, to copy over
+        rows written to them while the shadow tables were loading. Foreign keys
+        from other tables are re-added NOT VALID inside the swap and validated
+        afterwards, which does not block reads or writes.
+        """
+        cur = self.cur
+        live_tables = ', '.join(self.live(table) for table in self.tables)
+        referencing_tables = sorted({table for table, *_ in self.references})
+
+        for attempt in range(1, SWAP_ATTEMPTS + 1):
+            started = time.perf_counter()
+            try:
+                cur.execute(f"SET LOCAL lock_timeout = '{SWAP_LOCK_TIMEOUT}'")
+                cur.execute(f'LOCK TABLE {", ".join([self.live(table) for table in self.tables] + referencing_tables)} '
+                            'IN ACCESS EXCLUSIVE MODE')
+                if before_swap:
+                    before_swap(cur)
+                for table, name, _, _, _, _ in self.references:
+                    cur.execute(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"')
+                cur.execute(f'DROP TABLE {live_tables}')
+                for table in self.tables:
+                    cur.execute(f'ALTER TABLE {self.shadow(table)} SET SCHEMA "{self.live_schema}"')
+                cur.execute('RESET search_path')
+                for table, name, definition, _, _, _ in self.references:
+                    cur.execute(f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition} NOT VALID')
+                conn.commit()
+                print(f"🔀 Swapped in {len(self.tables)} tables in {time.perf_counter() - started:.3f}s")
+                break
+            except psycopg2.errors.LockNotAvailable:
+                conn.rollback()
+                if attempt == SWAP_ATTEMPTS:
+                    raise
+                print(f"  ⏳ Live tables busy, retrying swap ({attempt}/{SWAP_ATTEMPTS})...")
+                time.sleep(attempt)
+
+        for table, name, _, _, _, _ in self.references:
+            cur.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT "{name}"')
+            conn.commit()
+        cur.execute(f'DROP SCHEMA IF EXISTS "{self.schema}"')
+        conn.commit()
+
+    def drop(self):
+        """Discard the shadow tables after a failed load."""
+        self.cur.execute(f'DROP SCHEMA IF EXISTS "{self.schema}" CASCADE')
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Read-only SQLite snapshot of the BJCP reference data.
+Styles with their ranges, categories, tags, characteristics, commercial
+examples and their breweries, judging criteria and comparisons are exported from Postgres into a
+single indexed file after each load. Services open it read-only with
+memory-mapped I/O and serve lookups without a database round-trip; the OS
+page cache shares the mapped pages between worker processes.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from decimal import Decimal
+
+import psycopg2
+
+from bjcp_breweries import brewery_key
+
+SNAPSHOT_FORMAT = 2
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                     "..", "..", "database", "bjcp_catalog.sqlite")
+
+# (table, snapshot columns, Postgres query returning them in a stable order)
+SNAPSHOT_TABLES = [
+    ("BJCP_BeerCategory", '''
+        "CategoryId" TEXT PRIMARY KEY, "CategoryNumber" TEXT NOT NULL, "CategoryName" TEXT NOT NULL,
+        "Description" TEXT, "SortOrder" INTEGER
+     ''', '''
+        SELECT "CategoryId", "CategoryNumber", "CategoryName", "Description", "SortOrder"
+        FROM "BJCP_BeerCategory" ORDER BY "CategoryId"
+     '''),
+    ("BeerStyle", '''
+        "StyleId" TEXT PRIMARY KEY, "BJCPNumber" TEXT, "StyleName" TEXT NOT NULL, "Category" TEXT,
+        "CategoryId" TEXT, "Description" TEXT,
+        "ABVMin" REAL, "ABVMax" REAL, "IBUMin" INTEGER, "IBUMax" INTEGER, "SRMMin" INTEGER, "SRMMax" INTEGER,
+        "OGMin" REAL, "OGMax" REAL, "FGMin" REAL, "FGMax" REAL,
+        "Appearance" TEXT, "Aroma" TEXT, "Flavor" TEXT, "Mouthfeel" TEXT, "Comments" TEXT, "History" TEXT,
+        "CharacteristicIngredients" TEXT, "StyleComparison" TEXT, "CommercialExamples" TEXT
+     ''', '''
+        SELECT "StyleId", "BJCPNumber", "StyleName", "Category", "CategoryId", "Description",
+               "ABVMin", "ABVMax", "IBUMin", "IBUMax", "SRMMin", "SRMMax",
+               "OGMin", "OGMax", "FGMin", "FGMax",
+               "Appearance", "Aroma", "Flavor", "Mouthfeel", "Comments", "History",
+               "CharacteristicIngredients", "StyleComparison", "CommercialExamples"
+        FROM "BeerStyle" ORDER BY "StyleId"
+     '''),
+    ("BJCP_StyleTag", '''
+        "TagId" TEXT PRIMARY KEY, "TagName" TEXT NOT NULL, "Category" TEXT, "SortOrder" INTEGER
+     ''', '''
+        SELECT "TagId", "TagName", "Category", "SortOrder" FROM "BJCP_StyleTag" ORDER BY "TagId"
+     '''),
+    ("BJCP_StyleTagMapping", '''
+        "StyleId" TEXT NOT NULL, "TagId" TEXT NOT NULL, PRIMARY KEY ("StyleId", "TagId")
+     ''', '''
+        SELECT "StyleId", "TagId" FROM "BJCP_StyleTagMapping" ORDER BY "StyleId", "TagId"
+     '''),
+    ("BJCP_StyleCharacteristics", '''
+        "CharacteristicId" TEXT PRIMARY KEY, "StyleId" TEXT NOT NULL, "CharacteristicType" TEXT NOT NULL,
+        "Description" TEXT, "Keywords" TEXT
+     ''', '''
+        SELECT "CharacteristicId", "StyleId", "CharacteristicType", "Description", "Keywords"
+        FROM "BJCP_StyleCharacteristics" ORDER BY "CharacteristicId"
+     '''),
+    ("BJCP_Brewery", '''
+        "BreweryId" TEXT PRIMARY KEY, "BreweryKey" TEXT NOT NULL, "BreweryName" TEXT NOT NULL, "SortOrder" INTEGER
+     ''', '''
+        SELECT "BreweryId", "BreweryKey", "BreweryName", "SortOrder" FROM "BJCP_Brewery" ORDER BY "BreweryId"
+     '''),
+    ("BJCP_CommercialExample", '''
+        "ExampleId" TEXT PRIMARY KEY, "StyleId" TEXT NOT NULL, "BeerName" TEXT NOT NULL,
+        "BreweryName" TEXT, "Availability" TEXT, "BreweryId" TEXT
+     ''', '''
+        SELECT "ExampleId", "StyleId", "BeerName", "BreweryName", "Availability", "BreweryId"
+        FROM "BJCP_CommercialExample" ORDER BY "ExampleId"
+     '''),
+    ("BJCP_StyleJudging", '''
+        "JudgingId" TEXT PRIMARY KEY, "StyleId" TEXT NOT NULL, "JudgingCriteria" TEXT,
+        "CommonFaults" TEXT, "ScoringWeights" TEXT
+     ''', '''
+        SELECT "JudgingId", "StyleId", "JudgingCriteria", "CommonFaults", "ScoringWeights"
+        FROM "BJCP_StyleJudging" ORDER BY "JudgingId"
+     '''),
+    ("BJCP_StyleComparison", '''
+        "ComparisonId" TEXT PRIMARY KEY, "PrimaryStyleId" TEXT NOT NULL, "ComparedStyleId" TEXT NOT NULL,
+        "ComparisonText" TEXT, "Relationship" TEXT, "ComparisonType" TEXT
+     ''', '''
+        SELECT "ComparisonId", "PrimaryStyleId", "ComparedStyleId", "ComparisonText",
+               "Relationship", "ComparisonType"
+        FROM "BJCP_StyleComparison" ORDER BY "ComparisonId"
+     ''')
+]
+
+# Built after the rows are in; lookups by number, name, tag, brewery, range and style
+SNAPSHOT_INDEXES = [
+    'CREATE INDEX "IX_BeerStyle_BJCPNumber" ON "BeerStyle"("BJCPNumber")',
+    'CREATE INDEX "IX_BeerStyle_StyleName" ON "BeerStyle"("StyleName" COLLATE NOCASE)',
+    'CREATE INDEX "IX_BeerStyle_CategoryId" ON "BeerStyle"("CategoryId")',
+    'CREATE INDEX "IX_BeerStyle_ABV" ON "BeerStyle"("ABVMin", "ABVMax")',
+    'CREATE INDEX "IX_BeerStyle_IBU" ON "BeerStyle"("IBUMin", "IBUMax")',
+    'CREATE INDEX "IX_BeerStyle_SRM" ON "BeerStyle"("SRMMin", "SRMMax")',
+    'CREATE INDEX "IX_BeerStyle_OG" ON "BeerStyle"("OGMin", "OGMax")',
+    'CREATE UNIQUE INDEX "IX_BJCP_BeerCategory_CategoryNumber" ON "BJCP_BeerCategory"("CategoryNumber")',
+    'CREATE UNIQUE INDEX "IX_BJCP_StyleTag_TagName" ON "BJCP_StyleTag"("TagName")',
+    'CREATE INDEX "IX_BJCP_StyleTagMapping_TagId" ON "BJCP_StyleTagMapping"("TagId")',
+    'CREATE INDEX "IX_BJCP_StyleCharacteristics_StyleId" ON "BJCP_StyleCharacteristics"("StyleId")',
+    'CREATE UNIQUE INDEX "IX_BJCP_Brewery_BreweryKey" ON "BJCP_Brewery"("BreweryKey")',
+    'CREATE INDEX "IX_BJCP_CommercialExample_StyleId" ON "BJCP_CommercialExample"("StyleId")',
+    'CREATE INDEX "IX_BJCP_CommercialExample_BreweryId" ON "BJCP_CommercialExample"("BreweryId", "StyleId")',
+    'CREATE INDEX "IX_BJCP_StyleJudging_StyleId" ON "BJCP_StyleJudging"("StyleId")',
+    'CREATE INDEX "IX_BJCP_StyleComparison_PrimaryStyleId" ON "BJCP_StyleComparison"("PrimaryStyleId")'
+]
+
+# Vital statistics accepted by StyleSnapshot.styles_in_range, and their columns
+RANGE_COLUMNS = {'abv': 'ABV', 'ibu': 'IBU', 'srm': 'SRM', 'og': 'OG', 'fg': 'FG'}
+
+def snapshot_value(value):
+    """Convert a Postgres value to one SQLite stores: numerics as floats, arrays and jsonb as JSON text."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, sort_keys=True)
+    return value
+
+def write_snapshot(path, fetch_rows):
+    """Write a snapshot file at path and return (version, row counts per table).
+
+    fetch_rows(table, query) yields batches of rows for each SNAPSHOT_TABLES
+    entry, in the order its query returns them. The version is a hash of the
+    exported rows, however they are batched, so the same rows always give the
+    same version. The file is built next to path and renamed over it;
+    processes that have the old file open keep reading it until they reopen.
+    """
+    path = os.path.abspath(path)
+    partial = f'{path}.{os.getpid()}.partial'
+    if os.path.exists(partial):
+        os.remove(partial)
+
+    snapshot = sqlite3.connect(partial)
+    try:
+        snapshot.execute('PRAGMA journal_mode = OFF')
+        snapshot.execute('PRAGMA synchronous = OFF')
+        digest = hashlib.sha256()
+        counts = {}
+        for table, columns, query in SNAPSHOT_TABLES:
+            snapshot.execute(f'CREATE TABLE "{table}" ({columns})')
+            counts[table] = 0
+            for rows in fetch_rows(table, query):
+                rows = [tuple(snapshot_value(value) for value in row) for row in rows]
+                if not rows:
+                    continue
+                for row in rows:
+                    digest.update(repr(row).encode('utf-8'))
+                placeholders = ', '.join('?' * len(rows[0]))
+                snapshot.executemany(f'INSERT INTO "{table}" VALUES ({placeholders})', rows)
+                counts[table] += len(rows)
+
+        for statement in SNAPSHOT_INDEXES:
+            snapshot.execute(statement)
+        version = digest.hexdigest()[:16]
+        snapshot.execute('CREATE TABLE "SnapshotInfo" ("Key" TEXT PRIMARY KEY, "Value" TEXT)')
+        snapshot.executemany('INSERT INTO "SnapshotInfo" VALUES (?, ?)', [
+            ('format', str(SNAPSHOT_FORMAT)),
+            ('version', version),
+            ('created', time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())),
+            ('counts', json.dumps(counts))
+        ])
+        snapshot.commit()
+        snapshot.execute('ANALYZE')
+        snapshot.execute('VACUUM')
+        snapshot.close()
+        os.replace(partial, path)
+    except Exception:
+        snapshot.close()
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    return version, counts
+
+def export_snapshot(db_config, path=DEFAULT_SNAPSHOT_PATH):
+    """Write the BJCP reference tables to a SQLite snapshot at path and return its version.
+
+    The tables are read in one repeatable-read transaction, so the snapshot
+    is consistent even while a load runs.
+    """
+    started = time.perf_counter()
+    path = os.path.abspath(path)
+
+    conn = psycopg2.connect(**db_config)
+    conn.set_session(isolation_level='REPEATABLE READ', readonly=True)
+    cur = conn.cursor()
+
+    def fetch_rows(table, query):
+        cur.execute(query)
+        while True:
+            rows = cur.fetchmany(5000)
+            if not rows:
+                break
+            yield rows
+
+    try:
+        version, counts = write_snapshot(path, fetch_rows)
+        conn.rollback()
+    finally:
+        cur.close()
+        conn.close()
+
+    print(f"🗂️  Exported BJCP snapshot {version} to {path} in {time.perf_counter() - started:.2f}s "
+          f"({counts['BeerStyle']} styles, {os.path.getsize(path) // 1024} KiB)")
+    return version
+
+class StyleSnapshot:
+    """Read-only lookups against a snapshot file written by export_snapshot()."""
+
+    def __init__(self, path=DEFAULT_SNAPSHOT_PATH):
+        path = os.path.abspath(path)
+        # immutable=1 skips file locking; the exporter replaces the file rather than changing it
+        self.conn = sqlite3.connect(f'file:{path}?mode=ro&immutable=1', uri=True, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute(f'PRAGMA mmap_size = {os.path.getsize(path)}')
+        info = dict(self.conn.execute('SELECT "Key", "Value" FROM "SnapshotInfo"').fetchall())
+        if int(info['format']) != SNAPSHOT_FORMAT:
+            self.conn.close()
+            raise ValueError(f"{path} is snapshot format {info['format']}, expected {SNAPSHOT_FORMAT}")
+        self.version = info['version']
+        self.created = info['created']
+
+    def close(self):
+        self.conn.close()
+
+    def _rows(self, sql, params=()):
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def style(self, bjcp_number):
+        """The style with this BJCP number (e.g. '21A'), or None."""
+        rows = self._rows('SELECT * FROM "BeerStyle" WHERE "BJCPNumber" = ?', (bjcp_number,))
+        return rows[0] if rows else None
+
+    def find_styles(self, name):
+        """Styles whose name contains name, ignoring case."""
+        return self._rows('SELECT * FROM "BeerStyle" WHERE "StyleName" LIKE ? ORDER BY "BJCPNumber"',
+                          (f'%{name}%',))
+
+    def styles_in_category(self, category_number):
+        return self._rows('''
+            SELECT s.* FROM "BeerStyle" s JOIN "BJCP_BeerCategory" c ON c."CategoryId" = s."CategoryId"
+            WHERE c."CategoryNumber" = ? ORDER BY s."BJCPNumber"
+        ''', (category_number,))
+
+    def styles_in_range(self, **values):
+        """Styles whose ranges contain every given value, e.g. styles_in_range(abv=5.2, ibu=40)."""
+        conditions, params = [], []
+        for field, value in values.items():
+            column = RANGE_COLUMNS[field]
+            conditions.append(f'"{column}Min" <= ? AND "{column}Max" >= ?')
+            params += [value, value]
+        where = ' AND '.join(conditions) or '1'
+        return self._rows(f'SELECT * FROM "BeerStyle" WHERE {where} ORDER BY "BJCPNumber"', params)
+
+    def styles_with_tag(self, tag_name):
+        return self._rows('''
+            SELECT s.* FROM "BeerStyle" s
+            JOIN "BJCP_StyleTagMapping" m ON m."StyleId" = s."StyleId"
+            JOIN "BJCP_StyleTag" t ON t."TagId" = m."TagId"
+            WHERE t."TagName" = ? ORDER BY s."BJCPNumber"
+        ''', (tag_name,))
+
+    def styles_by_brewery(self, brewery_name):
+        """Styles with a commercial example from this brewery, matched like the gazetteer matches names."""
+        return self._rows('''
+            SELECT s.* FROM "BeerStyle" s
+            WHERE s."StyleId" IN (SELECT e."StyleId" FROM "BJCP_CommercialExample" e
+                                  JOIN "BJCP_Brewery" b ON b."BreweryId" = e."BreweryId"
+                                  WHERE b."BreweryKey" = ?)
+            ORDER BY s."BJCPNumber"
+        ''', (brewery_key(brewery_name),))
+
+    def tags(self, style_id):
+        return self._rows('''
+            SELECT t."TagName", t."Category" FROM "BJCP_StyleTagMapping" m
+            JOIN "BJCP_StyleTag" t ON t."TagId" = m."TagId"
+            WHERE m."StyleId" = ? ORDER BY t."SortOrder"
+        ''', (style_id,))
+
+    def characteristics(self, style_id):
+        rows = self._rows('''
+            SELECT "CharacteristicType", "Description", "Keywords" FROM "BJCP_StyleCharacteristics"
+            WHERE "StyleId" = ? ORDER BY "CharacteristicType"
+        ''', (style_id,))
+        for row in rows:
+            row['Keywords'] = json.loads(row['Keywords']) if row['Keywords'] else []
+        return rows
+
+    def examples(self, style_id):
+        return self._rows('''
+            SELECT "BeerName", "BreweryName", "Availability" FROM "BJCP_CommercialExample"
+            WHERE "StyleId" = ? ORDER BY "BeerName"
+        ''', (style_id,))
+
+    def comparisons(self, style_id):
+        """Styles this style's comparison text mentions, with the relationship found."""
+        return self._rows('''
+            SELECT s."BJCPNumber", s."StyleName", c."Relationship", c."ComparisonType"
+            FROM "BJCP_StyleComparison" c JOIN "BeerStyle" s ON s."StyleId" = c."ComparedStyleId"
+            WHERE c."PrimaryStyleId" = ? ORDER BY s."BJCPNumber"
+        ''', (style_id,))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the BJCP reference tables to a read-only SQLite snapshot")
+    parser.add_argument('--output', default=DEFAULT_SNAPSHOT_PATH,
+                        help="snapshot file to write (default: database/bjcp_catalog.sqlite)")
+    parser.add_argument('--lookup', metavar='BJCP_NUMBER',
+                        help="print one style from an existing snapshot instead of exporting")
+    args = parser.parse_args()
+
+    if args.lookup:
+        snapshot = StyleSnapshot(args.output)
+        style = snapshot.style(args.lookup)
+        if style is None:
+            print(f"❌ No style {args.lookup} in snapshot {snapshot.version}")
+            sys.exit(1)
+        print(f"🗂️  Snapshot {snapshot.version} ({snapshot.created})")
+        print(f"{style['BJCPNumber']} {style['StyleName']}: ABV {style['ABVMin']}-{style['ABVMax']}, "
+              f"IBU {style['IBUMin']}-{style['IBUMax']}, SRM {style['SRMMin']}-{style['SRMMax']}")
+        print(f"   Tags: {', '.join(tag['TagName'] for tag in snapshot.tags(style['StyleId']))}")
+        for comparison in snapshot.comparisons(style['StyleId']):
+            print(f"   {comparison['Relationship']}: {comparison['BJCPNumber']} {comparison['StyleName']}")
+        sys.exit(0)
+
+    # Database configuration
+    db_config = {
+        'host': os.environ.get('DB_HOST', 'localhost'),
+        'database': os.environ.get('DB_NAME', 'fermentum'),
+        'user': os.environ.get('DB_USER', 'fermentum'),
+        'password': os.environ.get('DB_PASSWORD', 'dev_password_123'),
+        'port': int(os.environ.get('DB_PORT', 5432))
+    }
+
+    try:
+        export_snapshot(db_config, args.output)
+        print("🎉 BJCP snapshot export completed successfully!")
+    except Exception as e:
+        print(f"💥 Error exporting snapshot: {e}")
+        sys.exit(1)
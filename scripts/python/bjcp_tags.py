@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Rule-driven classification of BJCP style tags into BJCP_StyleTag categories.
+The rules live in bjcp_tag_rules.json. All of their terms are compiled into a
+single regular expression, every tag is classified once and memoized, and a
+tag may belong to several categories.
+"""
+
+import json
+import os
+import re
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bjcp_tag_rules.json")
+
+CAMEL_CASE_BOUNDARY = re.compile(r'(?<=[a-z])(?=[A-Z])')
+WORD = re.compile(r'[a-z0-9]+')
+
+def normalize_tag(tag):
+    """Lowercase a tag and separate its words with single spaces ('pale-ale-family' -> 'pale ale family')."""
+    return ' '.join(WORD.findall(CAMEL_CASE_BOUNDARY.sub(' ', tag).lower()))
+
+class TagClassifier:
+    """Assign categories to tags from an ordered rule table."""
+
+    def __init__(self, rules, fallback='other'):
+        """rules: [{"category": ..., "terms": [...]}, ...] in priority order."""
+        self.fallback = fallback
+        self.priority = {}
+        self.term_categories = {}
+        for rule in rules:
+            category = rule['category']
+            self.priority.setdefault(category, len(self.priority))
+            for term in rule['terms']:
+                self.term_categories.setdefault(normalize_tag(term), set()).add(category)
+
+        # Longest terms first, so the alternation prefers 'very high' over 'high'
+        terms = sorted(self.term_categories, key=lambda term: (-len(term), term))
+        self.pattern = re.compile(r'\b(?:' + '|'.join(re.escape(term) for term in terms) + r')\b')
+        self.cache = {}
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_RULES_PATH):
+        """Load a classifier from a JSON rule file."""
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        return cls(config['rules'], config.get('fallback', 'other'))
+
+    def labels(self, tag):
+        """Every category tag belongs to, in rule priority order."""
+        labels = self.cache.get(tag)
+        if labels is None:
+            categories = set()
+            for match in self.pattern.finditer(normalize_tag(tag)):
+                categories.update(self.term_categories[match.group()])
+            labels = tuple(sorted(categories, key=self.priority.get)) or (self.fallback,)
+            self.cache[tag] = labels
+        return labels
+
+    def categorize(self, tag):
+        """The highest-priority category, as stored in BJCP_StyleTag.Category."""
+        return self.labels(tag)[0]
+
+_default_classifier = None
+
+def categorize_tag(tag_name):
+    """Categorize a tag with the default rule file."""
+    global _default_classifier
+    if _default_classifier is None:
+        _default_classifier = TagClassifier.from_file()
+    return _default_classifier.categorize(tag_name)
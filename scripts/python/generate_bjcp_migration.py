@@ -1,174 +1,377 @@
 #!/usr/bin/env python3
 """
-Generate a complete SQL migration script to populate the BeerStyle table
-with all BJCP 2021 beer style data from the JSON file.
+Generate a complete SQL migration script that seeds BeerStyle and every
+BJCP_* table from migration 039 with the BJCP 2021 style data in bjcp2.json.
+Rows are written as chunked multi-row INSERTs or as COPY data blocks and are
+streamed straight to the output file. With --diff-from, only the changes from
+an older version of the style guide are written instead.
 """
 
-import json
+import argparse
 import sys
 import os
-from decimal import Decimal, InvalidOperation
+import time
+from datetime import date
+from decimal import Decimal
 
-def safe_decimal(value, max_digits=5, decimal_places=3):
-    """Safely convert a string value to decimal with proper formatting."""
-    if not value or value == '-':
-        return 'NULL'
-
-    try:
-        # Remove any extra whitespace and convert to float first
-        float_val = float(str(value).strip())
-        # Format to the specified decimal places
-        decimal_val = Decimal(str(float_val)).quantize(Decimal('0.' + '0' * decimal_places))
-        return str(decimal_val)
-    except (ValueError, InvalidOperation, TypeError):
-        return 'NULL'
-
-def safe_int(value):
-    """Safely convert a string value to integer."""
-    if not value or value == '-':
-        return 'NULL'
-
-    try:
-        return str(int(float(str(value).strip())))
-    except (ValueError, TypeError):
-        return 'NULL'
+from bjcp_bulk import analyze_sql, bulk_epilogue_sql, bulk_prologue_sql
+from bjcp_cache import DEFAULT_CACHE_DIR
+from bjcp_diff import CatalogState, write_delta
+from bjcp_metrics import NO_METRICS, RunMetrics, progress_to_stderr
+from populate_bjcp_data import (
+    BEER_STYLE_COLUMNS, CLEAR_TABLES, DEFAULT_BATCH_SIZE, SHADOW_TABLES, Vocabulary, category_sort_key,
+    chunked, comparison_source, copy_text_value, iter_entries, open_catalog, quote_columns, reference_guards,
+    stable_id, style_row, write_children, write_comparisons, write_sort_orders, write_vocabulary
+)
 
 def escape_sql_string(value):
     """Escape a string value for SQL insertion."""
-    if not value:
-        return 'NULL'
-
     # Replace single quotes with double single quotes for SQL escaping
     escaped = str(value).replace("'", "''")
     return f"'{escaped}'"
 
-def generate_migration_sql(json_file_path, output_file_path):
-    """Generate the complete SQL migration script."""
-
-    # Read the BJCP JSON data
-    with open(json_file_path, 'r', encoding='utf-8') as f:
-        beer_styles = json.load(f)
-
-    print(f"Found {len(beer_styles)} beer styles in the JSON file")
-
-    # Start building the SQL script
-    sql_lines = [
-        "-- Migration: Populate BeerStyle table with complete BJCP 2021 guidelines data",
-        "-- Date: 2025-01-27",
-        f"-- Description: Imports all {len(beer_styles)} BJCP beer styles with complete characteristics and ranges",
-        "-- Generated from: bjcp-data.json",
-        "",
-        "BEGIN;",
-        "",
-        "-- Clear any existing BeerStyle data to avoid conflicts",
-        'DELETE FROM "BeerStyle";',
-        "",
-        "-- Insert all BJCP beer styles",
-        ""
-    ]
-
-    # Process each beer style
-    for i, style in enumerate(beer_styles):
-        # Extract and convert values with proper type handling
-        bjcp_number = escape_sql_string(style.get('number', ''))
-        style_name = escape_sql_string(style.get('name', ''))
-        category = escape_sql_string(style.get('category', ''))
-        description = escape_sql_string(style.get('overallimpression', ''))
-
-        # Ranges - convert to proper decimal format
-        abv_min = safe_decimal(style.get('abvmin'), 4, 2)
-        abv_max = safe_decimal(style.get('abvmax'), 4, 2)
-        ibu_min = safe_int(style.get('ibumin'))
-        ibu_max = safe_int(style.get('ibumax'))
-        srm_min = safe_int(style.get('srmmin'))
-        srm_max = safe_int(style.get('srmmax'))
-        og_min = safe_decimal(style.get('ogmin'), 5, 3)
-        og_max = safe_decimal(style.get('ogmax'), 5, 3)
-        fg_min = safe_decimal(style.get('fgmin'), 5, 3)
-        fg_max = safe_decimal(style.get('fgmax'), 5, 3)
-
-        # Characteristics
-        appearance = escape_sql_string(style.get('appearance', ''))
-        aroma = escape_sql_string(style.get('aroma', ''))
-        flavor = escape_sql_string(style.get('flavor', ''))
-        mouthfeel = escape_sql_string(style.get('mouthfeel', ''))
-        comments = escape_sql_string(style.get('comments', ''))
-        history = escape_sql_string(style.get('history', ''))
-        characteristic_ingredients = escape_sql_string(style.get('characteristicingredients', ''))
-        style_comparison = escape_sql_string(style.get('stylecomparison', ''))
-        commercial_examples = escape_sql_string(style.get('commercialexamples', ''))
-
-        # Build the INSERT statement
-        insert_sql = f"""INSERT INTO "BeerStyle" (
-    "StyleId", "BJCPNumber", "StyleName", "Category", "Description",
-    "ABVMin", "ABVMax", "IBUMin", "IBUMax", "SRMMin", "SRMMax",
-    "OGMin", "OGMax", "FGMin", "FGMax",
-    "Appearance", "Aroma", "Flavor", "Mouthfeel", "Comments",
-    "History", "CharacteristicIngredients", "StyleComparison", "CommercialExamples",
-    "Created", "Updated"
-) VALUES (
-    gen_random_uuid(),
-    {bjcp_number},
-    {style_name},
-    {category},
-    {description},
-    {abv_min}, {abv_max}, {ibu_min}, {ibu_max}, {srm_min}, {srm_max},
-    {og_min}, {og_max}, {fg_min}, {fg_max},
-    {appearance},
-    {aroma},
-    {flavor},
-    {mouthfeel},
-    {comments},
-    {history},
-    {characteristic_ingredients},
-    {style_comparison},
-    {commercial_examples},
-    CURRENT_TIMESTAMP,
-    CURRENT_TIMESTAMP
-);"""
-
-        sql_lines.append(insert_sql)
-        sql_lines.append("")
-
-        # Progress indicator
-        if (i + 1) % 10 == 0:
-            print(f"Processed {i + 1}/{len(beer_styles)} styles...")
-
-    # Add indexes and completion
-    sql_lines.extend([
-        "-- Create indexes for optimal query performance",
-        'CREATE INDEX IF NOT EXISTS "IX_BeerStyle_BJCPNumber" ON "BeerStyle"("BJCPNumber");',
-        'CREATE INDEX IF NOT EXISTS "IX_BeerStyle_Category" ON "BeerStyle"("Category");',
-        'CREATE INDEX IF NOT EXISTS "IX_BeerStyle_StyleName" ON "BeerStyle"("StyleName");',
-        "",
-        "COMMIT;",
-        "",
-        f"-- Migration completed: {len(beer_styles)} BJCP beer styles imported successfully"
-    ])
-
-    # Write the migration file
+def sql_literal(value):
+    """Format a row value as a SQL literal."""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, (int, float, Decimal)):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return "'{}'::text[]"
+        return 'ARRAY[' + ', '.join(sql_literal(item) for item in value) + ']::text[]'
+    return escape_sql_string(value)
+
+class SqlFileWriter:
+    """Write rows to a migration file as multi-row INSERT statements of batch_size rows.
+
+    Mirrors the insert/update interface and per-table stats of
+    populate_bjcp_data.BatchWriter, so the same vocabulary and child-table
+    helpers drive both the loader and the generated migration.
+    """
+
+    def __init__(self, f, batch_size=DEFAULT_BATCH_SIZE):
+        self.f = f
+        self.batch_size = batch_size
+        self.counts = {}
+        self.stats = {}
+
+    def insert(self, table, columns, rows):
+        """Write rows as INSERT statements of up to batch_size rows each."""
+        rows = list(rows)
+        if not rows:
+            return 0
+        started = time.perf_counter()
+        column_list = quote_columns(columns)
+        statements = 0
+        for batch in chunked(rows, self.batch_size):
+            self.f.write(f'INSERT INTO "{table}" ({column_list}) VALUES\n')
+            self.f.write(',\n'.join(
+                '    (' + ', '.join(sql_literal(value) for value in row) + ')' for row in batch
+            ))
+            self.f.write(';\n\n')
+            statements += 1
+        self._count(table, len(rows), statements, time.perf_counter() - started)
+        return len(rows)
+
+    def update(self, table, key_column, columns, rows, touch_column=None):
+        """Write one UPDATE statement per row given as (key, *values)."""
+        rows = list(rows)
+        if not rows:
+            return 0
+        started = time.perf_counter()
+        for row in rows:
+            assignments = [f'"{column}" = {sql_literal(value)}' for column, value in zip(columns, row[1:])]
+            if touch_column:
+                assignments.append(f'"{touch_column}" = CURRENT_TIMESTAMP')
+            self.f.write(f'UPDATE "{table}" SET {", ".join(assignments)} '
+                         f'WHERE "{key_column}" = {sql_literal(row[0])};\n')
+        self.f.write('\n')
+        self._record(table, len(rows), len(rows), time.perf_counter() - started)
+        return len(rows)
+
+    def delete(self, table, key_column, keys, unless_referenced_by=None):
+        """Write DELETE statements for up to batch_size keys each.
+
+        key_column may be a list of columns, with each key a tuple of their
+        values. unless_referenced_by lists (table, column) pairs whose rows
+        keep the keys they still reference, so the migration neither fails on
+        their foreign key nor orphans them.
+        """
+        keys = list(keys)
+        if not keys:
+            return 0
+        started = time.perf_counter()
+        if isinstance(key_column, str):
+            target = f'"{key_column}"'
+            literals = [sql_literal(key) for key in keys]
+        else:
+            target = f'({quote_columns(key_column)})'
+            literals = ['(' + ', '.join(sql_literal(value) for value in key) + ')' for key in keys]
+        guard = ''.join(f'\n  AND {condition}'
+                        for condition in reference_guards(table, key_column, unless_referenced_by))
+        statements = 0
+        for batch in chunked(literals, self.batch_size):
+            self.f.write(f'DELETE FROM "{table}" WHERE {target} IN ({", ".join(batch)}){guard};\n')
+            statements += 1
+        self.f.write('\n')
+        self._record(table, len(keys), statements, time.perf_counter() - started)
+        return len(keys)
+
+    def _count(self, table, row_count, statements, elapsed):
+        self.counts[table] = self.counts.get(table, 0) + row_count
+        self._record(table, row_count, statements, elapsed)
+
+    def _record(self, table, row_count, statements, elapsed):
+        total_rows, total_statements, total_elapsed = self.stats.get(table, (0, 0, 0.0))
+        self.stats[table] = (total_rows + row_count, total_statements + statements, total_elapsed + elapsed)
+
+class CopyFileWriter(SqlFileWriter):
+    """Write rows as COPY ... FROM stdin data blocks, which psql applies much faster than INSERTs."""
+
+    def insert(self, table, columns, rows):
+        """Write rows as one COPY data block."""
+        rows = list(rows)
+        if not rows:
+            return 0
+        started = time.perf_counter()
+        self.f.write(f'COPY "{table}" ({quote_columns(columns)}) FROM stdin;\n')
+        for row in rows:
+            self.f.write('\t'.join(copy_text_value(value) for value in row))
+            self.f.write('\n')
+        self.f.write('\\.\n\n')
+        self._count(table, len(rows), 1, time.perf_counter() - started)
+        return len(rows)
+
+FORMATS = {
+    'insert': SqlFileWriter,
+    'copy': CopyFileWriter
+}
+
+def generate_migration_sql(json_file_path, output_file_path, output_format='insert',
+                           batch_size=DEFAULT_BATCH_SIZE, entries=None, metrics=NO_METRICS, bulk=False):
+    """Generate the complete SQL migration script, streaming it to output_file_path.
+
+    entries (e.g. from open_catalog()) replaces parsing the JSON file.
+    metrics (a RunMetrics) times the transform and records rows per table.
+    With bulk, the migration defers foreign keys to COMMIT, drops and
+    rebuilds the secondary indexes around the data and ends with ANALYZE.
+    """
+    if entries is None:
+        entries = iter_entries(json_file_path, batch_size)
+
+    # Deterministic ids keep regenerated migrations diffable and match populate_bjcp_data.py --sync
+    categories = Vocabulary(lambda key: stable_id('category', key), sort_key=category_sort_key)
+    tags = Vocabulary(lambda key: stable_id('tag', key))
+    breweries = Vocabulary(lambda key: stable_id('brewery', key))
+    comparison_sources = []
+    style_count = 0
+
     with open(output_file_path, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(sql_lines))
+        writer = FORMATS[output_format](f, batch_size)
+
+        f.write("-- Migration: Populate BeerStyle and BJCP_* tables with complete BJCP 2021 guidelines data\n")
+        f.write("-- Date: 2025-01-27\n")
+        f.write("-- Description: Seeds every table from migrations 039 and 052 with categories, tags, breweries, "
+                "styles, characteristics, commercial examples, judging criteria and style comparisons\n")
+        f.write(f"-- Generated from: {os.path.basename(json_file_path)}\n")
+        if output_format == 'copy':
+            f.write("-- Contains COPY ... FROM stdin blocks: apply with psql -f\n")
+        f.write("\nBEGIN;\n\n")
+
+        # Clear any existing data to avoid conflicts (in reverse dependency order)
+        f.write("-- Clear any existing BJCP data to avoid conflicts\n")
+        for table in CLEAR_TABLES[:-2] + ["BeerStyle"] + CLEAR_TABLES[-2:]:
+            f.write(f'DELETE FROM "{table}";\n')
+        f.write("\n")
+        if bulk:
+            f.write(bulk_prologue_sql(SHADOW_TABLES))
+
+        # Stream the BJCP JSON data a chunk of styles at a time
+        for chunk in metrics.timed('transform', chunked(entries, batch_size)):
+            f.write(f"-- Styles {style_count + 1}-{style_count + len(chunk)}\n\n")
+            write_vocabulary(writer, chunk, categories, tags, breweries)
+
+            styles = [(stable_id('style', entry['number']), entry) for entry in chunk]
+            writer.insert(
+                "BeerStyle",
+                BEER_STYLE_COLUMNS,
+                [style_row(entry, style_id, categories.ids.get(entry['category_number']))
+                 for style_id, entry in styles]
+            )
+            write_children(writer, styles, tags.ids, breweries.ids, stable_ids=True)
+            comparison_sources.extend(comparison_source(entry, style_id) for style_id, entry in styles)
+
+            style_count += len(chunk)
+            print(f"Processed {style_count} styles...")
+
+        f.write("-- Category, tag and brewery sort orders\n")
+        write_sort_orders(writer, categories, tags, breweries)
 
+        f.write("-- Comparisons between styles, resolved once every style is known\n\n")
+        write_comparisons(writer, comparison_sources, stable_ids=True)
+
+        if bulk:
+            f.write(bulk_epilogue_sql())
+
+        # Add indexes and completion
+        f.write("-- Create indexes for optimal query performance\n")
+        f.write('CREATE INDEX IF NOT EXISTS "IX_BeerStyle_BJCPNumber" ON "BeerStyle"("BJCPNumber");\n')
+        f.write('CREATE INDEX IF NOT EXISTS "IX_BeerStyle_Category" ON "BeerStyle"("Category");\n')
+        f.write('CREATE INDEX IF NOT EXISTS "IX_BeerStyle_StyleName" ON "BeerStyle"("StyleName");\n')
+        f.write("\nCOMMIT;\n\n")
+        if bulk:
+            f.write("-- Fresh planner statistics for the reloaded tables\n")
+            f.write(analyze_sql(SHADOW_TABLES) + "\n")
+        f.write(f"-- Migration completed: {style_count} BJCP beer styles imported successfully\n")
+
+    metrics.record_tables(writer.stats)
     print(f"Migration script generated successfully: {output_file_path}")
-    print(f"Total beer styles processed: {len(beer_styles)}")
+    print(f"Total beer styles processed: {style_count}")
+    for table, row_count in writer.counts.items():
+        print(f"   - {table}: {row_count} rows")
+
+def generate_delta_sql(old_json_file_path, json_file_path, output_file_path, output_format='insert',
+                       batch_size=DEFAULT_BATCH_SIZE, old_entries=None, entries=None, metrics=NO_METRICS):
+    """Write a migration with only the changes from one version of the style guide to another.
+
+    The migration expects the tables to hold the old version with the ids of
+    the full seed migration. Returns the DeltaSummary; when nothing changed,
+    no file is left behind.
+    """
+    if old_entries is None:
+        old_entries = iter_entries(old_json_file_path, batch_size)
+    if entries is None:
+        entries = iter_entries(json_file_path, batch_size)
+
+    with metrics.phase('read_old'):
+        old = CatalogState(chunked(old_entries, batch_size))
+    print(f"Read {len(old.styles)} styles from {os.path.basename(old_json_file_path)}")
+
+    with open(output_file_path, 'w', encoding='utf-8') as f:
+        writer = FORMATS[output_format](f, batch_size)
+
+        f.write("-- Migration: Update BeerStyle and BJCP_* tables to a revised BJCP style guide\n")
+        f.write(f"-- Date: {date.today().isoformat()}\n")
+        f.write("-- Description: Inserts, updates and deletes only the categories, tags, breweries, styles, "
+                "child rows and comparisons that changed; rows are addressed by the seed migration's ids\n")
+        f.write(f"-- Generated from: {os.path.basename(old_json_file_path)} -> {os.path.basename(json_file_path)}\n")
+        if output_format == 'copy':
+            f.write("-- Contains COPY ... FROM stdin blocks: apply with psql -f\n")
+        f.write("\nBEGIN;\n\n")
+        summary = write_delta(writer, old, metrics.timed('transform', chunked(entries, batch_size)))
+        if summary.removed_style_ids:
+            f.write(kept_styles_notice_sql(summary.removed_style_ids))
+        f.write("COMMIT;\n\n")
+        f.write(f"-- Migration completed: beer styles {summary.describe()}\n")
+
+    metrics.record_tables(writer.stats)
+    if not summary.changed:
+        os.remove(output_file_path)
+        print("✅ Style guides are identical, no migration written")
+        return summary
+
+    print(f"Delta migration generated successfully: {output_file_path}")
+    summary.print_summary()
+    for table, (row_count, statements, _) in writer.stats.items():
+        print(f"   - {table}: {row_count} rows in {statements} statements")
+    return summary
+
+def kept_styles_notice_sql(style_ids):
+    """A DO block that names the removed styles recipes or competition entries kept in place, if any."""
+    ids = ', '.join(sql_literal(style_id) for style_id in style_ids)
+    return ("DO $$\nDECLARE\n    kept text;\nBEGIN\n"
+            f"    SELECT string_agg(\"BJCPNumber\", ', ' ORDER BY \"BJCPNumber\") INTO kept\n"
+            f"    FROM \"BeerStyle\" WHERE \"StyleId\" IN ({ids});\n"
+            "    IF kept IS NOT NULL THEN\n"
+            "        RAISE NOTICE 'Kept styles dropped from the guide that recipes or competition entries "
+            "still reference: %', kept;\n"
+            "    END IF;\nEND $$;\n\n")
+
+def next_migration_path(migrations_dir, name):
+    """Path for a new migration numbered after the highest existing one."""
+    numbers = [int(filename[:3]) for filename in os.listdir(migrations_dir) if filename[:3].isdigit()]
+    return os.path.join(migrations_dir, f"{max(numbers, default=0) + 1:03d}_{name}.sql")
 
 if __name__ == "__main__":
     # Set up paths
     script_dir = os.path.dirname(os.path.abspath(__file__))
     project_root = os.path.join(script_dir, "..", "..")
-    json_file = os.path.join(project_root, "database", "bjcp-data.json")
-    output_file = os.path.join(project_root, "database", "migrations", "037_populate_complete_bjcp_beer_styles.sql")
+    migrations_dir = os.path.join(project_root, "database", "migrations")
+    default_output = os.path.join(migrations_dir, "037_populate_complete_bjcp_beer_styles.sql")
 
-    # Verify input file exists
-    if not os.path.exists(json_file):
-        print(f"Error: BJCP JSON file not found at {json_file}")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Generate a BJCP seed migration from bjcp2.json")
+    parser.add_argument('--format', choices=sorted(FORMATS), default='insert',
+                        help="write rows as multi-row INSERTs or COPY data blocks (copy requires psql)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"styles per chunk and rows per INSERT statement (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument('--json', default=os.path.join(project_root, "database", "bjcp2.json"),
+                        help="BeerJSON style guide to generate from (default: database/bjcp2.json)")
+    parser.add_argument('--bulk', action='store_true',
+                        help="defer foreign keys to COMMIT, drop secondary indexes while loading and rebuild them "
+                             "afterwards, then ANALYZE (requires migration 051; not with --diff-from)")
+    parser.add_argument('--diff-from', metavar='OLD_JSON',
+                        help="write only the changes from this older BeerJSON version instead of a full seed")
+    parser.add_argument('--output',
+                        help="path of the migration file to write (default: 037_populate_complete_bjcp_beer_styles.sql, "
+                             "or the next free NNN_update_bjcp_beer_styles.sql with --diff-from)")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help="directory of cached transformed catalogs (default: scripts/python/.bjcp_cache)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="always parse and transform bjcp2.json, without reading or writing the cache")
+    parser.add_argument('--metrics', metavar='PATH',
+                        help="write per-phase timings, row counts and peak memory as JSON "
+                             "('-' for stdout, with progress on stderr)")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="record the tracemalloc peak per phase (slows the run down)")
+    parser.add_argument('--profile', metavar='PATH',
+                        help="capture a cProfile to PATH, summarized in the metrics")
+    args = parser.parse_args()
+    progress_to_stderr(args.metrics)
+
+    if args.bulk and args.diff_from:
+        parser.error("--bulk only applies to full seed migrations, not --diff-from deltas")
+    json_file = args.json
+    output = args.output
+    if output is None:
+        output = next_migration_path(migrations_dir, "update_bjcp_beer_styles") if args.diff_from else default_output
+
+    # Verify input files exist
+    for path in [json_file] + ([args.diff_from] if args.diff_from else []):
+        if not os.path.exists(path):
+            print(f"Error: BJCP JSON file not found at {path}")
+            sys.exit(1)
+
+    metrics = NO_METRICS
+    if args.metrics or args.trace_memory or args.profile:
+        metrics = RunMetrics('generate_bjcp_migration', args.trace_memory, args.profile,
+                             format=args.format, batch_size=args.batch_size, diff_from=args.diff_from,
+                             bulk=args.bulk)
+
+    # Validate ranges before any SQL is written
+    with metrics.phase('validate'):
+        report, entries = open_catalog(json_file, args.batch_size, None if args.no_cache else args.cache_dir)
+    report.print_summary()
 
     # Generate the migration
     try:
-        generate_migration_sql(json_file, output_file)
+        with metrics.phase('generate'):
+            if args.diff_from:
+                _, old_entries = open_catalog(args.diff_from, args.batch_size,
+                                              None if args.no_cache else args.cache_dir)
+                generate_delta_sql(args.diff_from, json_file, output, args.format, args.batch_size,
+                                   old_entries, entries, metrics)
+            else:
+                generate_migration_sql(json_file, output, args.format, args.batch_size, entries, metrics,
+                                       args.bulk)
         print("Migration generation completed successfully!")
+        if metrics is not NO_METRICS:
+            metrics.finish(args.metrics, succeeded=True,
+                           output_bytes=os.path.getsize(output) if os.path.exists(output) else 0)
     except Exception as e:
         print(f"Error generating migration: {e}")
-        sys.exit(1)
\ No newline at end of file
+        if metrics is not NO_METRICS:
+            metrics.finish(args.metrics, succeeded=False, error=str(e).strip())
+        sys.exit(1)
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Score recipes against BJCP beer styles and populate BJCP_RecipeStyleMatch.
+Style ranges and recipe estimates (EstimatedOG/FG/ABV/IBU/SRM) are loaded into
+NumPy arrays; each block of recipes is scored against every style in one
+broadcast operation, and the top-K styles per recipe are written in bulk with
+a per-parameter breakdown.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import psycopg2
+
+from bjcp_normalize import RANGE_COLUMNS
+from bjcp_records import RANGE_FIELDS
+from populate_bjcp_data import DEFAULT_BATCH_SIZE, LOADERS, quote_columns
+
+DEFAULT_TOP_K = 5
+DEFAULT_BLOCK_SIZE = 2000
+CALCULATION_VERSION = '1.0'
+
+# Recipe estimate compared with each style range
+RECIPE_COLUMNS = {
+    'og': 'EstimatedOG',
+    'fg': 'EstimatedFG',
+    'abv': 'EstimatedABV',
+    'ibu': 'EstimatedIBU',
+    'srm': 'EstimatedSRM'
+}
+
+# Relative weight of each parameter in MatchPercentage
+PARAMETER_WEIGHTS = {'og': 1.0, 'fg': 1.0, 'abv': 1.0, 'ibu': 1.0, 'srm': 1.0}
+
+# Smallest range width used to judge how far outside a range a value is; a
+# value this far past the nearest bound scores 0 for the parameter
+MIN_TOLERANCE = {'og': 0.004, 'fg': 0.002, 'abv': 0.5, 'ibu': 5.0, 'srm': 2.0}
+
+# Display names and decimal places used in ParameterMatches and Recommendations
+PARAMETER_LABELS = {'og': 'OG', 'fg': 'FG', 'abv': 'ABV', 'ibu': 'IBU', 'srm': 'SRM'}
+DISPLAY_PLACES = {'og': 3, 'fg': 3, 'abv': 1, 'ibu': 0, 'srm': 0}
+
+MATCH_COLUMNS = [
+    "RecipeId", "StyleId", "MatchPercentage", "IsWithinGuidelines",
+    "ParameterMatches", "Recommendations", "CalculationVersion"
+]
+
+def format_bound(field, value):
+    """Format a style bound for display, e.g. 1.044 or 35."""
+    return f"{value:.{DISPLAY_PLACES[field]}f}"
+
+def as_float_array(rows, width):
+    """Convert rows of Decimal/None values into a float array with NaN for NULL."""
+    return np.array([[np.nan if value is None else float(value) for value in row] for row in rows],
+                    dtype=np.float64).reshape(len(rows), width)
+
+class StyleRanges:
+    """Minimum and maximum arrays of shape (styles, parameters) for every BeerStyle."""
+
+    def __init__(self, style_ids, minimums, maximums):
+        self.style_ids = style_ids
+        self.minimums = minimums
+        self.maximums = maximums
+        self.weights = np.array([PARAMETER_WEIGHTS[field] for field in RANGE_FIELDS])
+        self.tolerance = np.array([MIN_TOLERANCE[field] for field in RANGE_FIELDS])
+
+        # A style with only one bound is open-ended on the other side
+        self.lower = np.where(np.isnan(minimums), -np.inf, minimums)
+        self.upper = np.where(np.isnan(maximums), np.inf, maximums)
+        self.width = np.maximum(np.nan_to_num(maximums - minimums, nan=0.0), self.tolerance)
+        self.has_range = ~(np.isnan(minimums) & np.isnan(maximums))
+
+        # Display strings are per style, so format them once rather than once per recipe
+        self.minimum_text = [[format_bound(field, value) for field, value in zip(RANGE_FIELDS, row)]
+                             for row in minimums.tolist()]
+        self.maximum_text = [[format_bound(field, value) for field, value in zip(RANGE_FIELDS, row)]
+                             for row in maximums.tolist()]
+        self.targets = [['-'.join(text for text, value in ((low_text, low), (high_text, high)) if value == value)
+                         for low_text, high_text, low, high in zip(low_row, high_row, lows, highs)]
+                        for low_row, high_row, lows, highs in zip(self.minimum_text, self.maximum_text,
+                                                                   minimums.tolist(), maximums.tolist())]
+
+    @classmethod
+    def load(cls, cur):
+        """Read every style's ranges as loaded by populate_bjcp_data.py."""
+        columns = [column for field in RANGE_FIELDS for column in RANGE_COLUMNS[field]]
+        cur.execute(f'SELECT "StyleId", {quote_columns(columns)} FROM "BeerStyle" ORDER BY "BJCPNumber", "StyleId"')
+        rows = cur.fetchall()
+        values = as_float_array([row[1:] for row in rows], len(columns))
+        return cls([str(row[0]) for row in rows], values[:, 0::2], values[:, 1::2])
+
+    def score(self, estimates):
+        """Score a (recipes, parameters) block against every style.
+
+        Returns (match, within, scores, comparable, below, above): match
+        percentages and within-guidelines flags of shape (recipes, styles),
+        plus per-parameter scores, comparability and below/above-range flags
+        of shape (recipes, styles, parameters).
+        """
+        values = estimates[:, None, :]
+        below = values < self.lower[None]
+        above = values > self.upper[None]
+        distance = np.maximum(self.lower[None] - values, values - self.upper[None])
+        scores = np.clip(1.0 - np.maximum(distance, 0.0) / self.width[None], 0.0, 1.0)
+        comparable = ~np.isnan(values) & self.has_range[None]
+        scores = np.where(comparable, scores, 0.0)
+
+        weights = comparable * self.weights
+        total = weights.sum(axis=2)
+        match = 100.0 * np.divide((scores * weights).sum(axis=2), total,
+                                  out=np.zeros_like(total), where=total > 0)
+        within = (total > 0) & ~np.any(comparable & (below | above), axis=2)
+        return match, within, scores, comparable, below, above
+
+def top_k(match, k):
+    """Indices of the k best styles per recipe, best first (ties keep style order)."""
+    # argpartition picks arbitrarily among styles tied at the k-th score, so sort every row stably;
+    # a row is one recipe's scores against the guide, a few hundred values at most
+    return np.argsort(-match, axis=1, kind='stable')[:, :k]
+
+def describe_match(values, value_text, styles, style_index, scores, comparable, below, above):
+    """Build the ParameterMatches breakdown and Recommendations for one recipe/style pair from plain lists."""
+    breakdown = {}
+    recommendations = []
+    for p, field in enumerate(RANGE_FIELDS):
+        if not comparable[p]:
+            continue
+        breakdown[field] = {
+            "value": values[p],
+            "inRange": not (below[p] or above[p]),
+            "target": styles.targets[style_index][p],
+            "score": scores[p]
+        }
+        if below[p]:
+            recommendations.append(f"Raise {PARAMETER_LABELS[field]} from {value_text[p]} "
+                                   f"to at least {styles.minimum_text[style_index][p]}")
+        elif above[p]:
+            recommendations.append(f"Lower {PARAMETER_LABELS[field]} from {value_text[p]} "
+                                   f"to at most {styles.maximum_text[style_index][p]}")
+    return breakdown, recommendations
+
+def match_rows(recipe_ids, estimates, styles, k=DEFAULT_TOP_K):
+    """Score a block of recipes and return BJCP_RecipeStyleMatch rows for each recipe's top k styles."""
+    match, within, scores, comparable, below, above = styles.score(estimates)
+    best = top_k(match, k)
+    pairs = (np.arange(len(recipe_ids))[:, None], best)
+
+    # Gather the top-k slices once and hand plain lists to the row builder
+    pair_match = np.round(match[pairs], 2).tolist()
+    pair_within = within[pairs].tolist()
+    pair_scores = np.round(scores[pairs], 3).tolist()
+    pair_comparable = comparable[pairs].tolist()
+    pair_below = below[pairs].tolist()
+    pair_above = above[pairs].tolist()
+    has_estimates = comparable.any(axis=(1, 2)).tolist()
+    places = [DISPLAY_PLACES[field] + 1 for field in RANGE_FIELDS]
+    values = [[round(value, digits) for value, digits in zip(row, places)] for row in estimates.tolist()]
+
+    rows = []
+    for r, recipe_id in enumerate(recipe_ids):
+        if not has_estimates[r]:
+            continue  # no estimates at all, nothing meaningful to store
+        value_text = [f"{value:g}" for value in values[r]]
+        for i, s in enumerate(best[r].tolist()):
+            breakdown, recommendations = describe_match(
+                values[r], value_text, styles, s, pair_scores[r][i],
+                pair_comparable[r][i], pair_below[r][i], pair_above[r][i]
+            )
+            rows.append((
+                recipe_id,
+                styles.style_ids[s],
+                pair_match[r][i],
+                pair_within[r][i],
+                json.dumps(breakdown),
+                recommendations,
+                CALCULATION_VERSION
+            ))
+    return rows
+
+def match_recipes(db_config, top=DEFAULT_TOP_K, block_size=DEFAULT_BLOCK_SIZE,
+                  batch_size=DEFAULT_BATCH_SIZE, loader='insert', tenant_id=None):
+    """Rescore every recipe (optionally of one tenant) and replace its BJCP_RecipeStyleMatch rows."""
+
+    conn = psycopg2.connect(**db_config)
+    conn.autocommit = False
+    cur = conn.cursor()
+    writer = LOADERS[loader](cur, batch_size)
+
+    try:
+        started = time.perf_counter()
+        styles = StyleRanges.load(cur)
+        if not styles.style_ids:
+            print("⚠️  No beer styles loaded, run populate_bjcp_data.py first")
+            return
+        print(f"Loaded ranges for {len(styles.style_ids)} beer styles")
+
+        # Stream recipes through a server-side cursor so memory stays bounded by block_size
+        recipes = conn.cursor(name="recipe_estimates")
+        recipes.itersize = block_size
+        estimate_columns = quote_columns(RECIPE_COLUMNS[field] for field in RANGE_FIELDS)
+        if tenant_id:
+            recipes.execute(f'SELECT "RecipeId", {estimate_columns} FROM "Recipe" WHERE "TenantId" = %s',
+                            (tenant_id,))
+        else:
+            recipes.execute(f'SELECT "RecipeId", {estimate_columns} FROM "Recipe"')
+
+        recipe_count = match_count = 0
+        while True:
+            block = recipes.fetchmany(block_size)
+            if not block:
+                break
+            recipe_ids = [str(row[0]) for row in block]
+            estimates = as_float_array([row[1:] for row in block], len(RANGE_FIELDS))
+
+            writer.delete("BJCP_RecipeStyleMatch", "RecipeId", recipe_ids)
+            match_count += writer.insert("BJCP_RecipeStyleMatch", MATCH_COLUMNS,
+                                         match_rows(recipe_ids, estimates, styles, top))
+            recipe_count += len(block)
+            print(f"  Scored {recipe_count} recipes...")
+        recipes.close()
+
+        conn.commit()
+        elapsed = time.perf_counter() - started
+        print(f"\n✅ Matched {recipe_count} recipes against {len(styles.style_ids)} styles in {elapsed:.2f}s")
+        print(f"📊 {match_count} recipe-style matches written (top {top} per recipe)")
+        writer.report()
+
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error matching recipes: {e}")
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score recipes against BJCP styles into BJCP_RecipeStyleMatch")
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP_K,
+                        help=f"matches stored per recipe (default: {DEFAULT_TOP_K})")
+    parser.add_argument('--block-size', type=int, default=DEFAULT_BLOCK_SIZE,
+                        help=f"recipes scored per matrix operation (default: {DEFAULT_BLOCK_SIZE})")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"rows sent per INSERT statement or COPY buffer (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument('--loader', choices=sorted(LOADERS), default='insert',
+                        help="write rows with batched INSERTs or COPY through staging tables")
+    parser.add_argument('--tenant-id', help="only rescore recipes of this tenant")
+    args = parser.parse_args()
+
+    # Database configuration
+    db_config = {
+        'host': os.environ.get('DB_HOST', 'localhost'),
+        'database': os.environ.get('DB_NAME', 'fermentum'),
+        'user': os.environ.get('DB_USER', 'fermentum'),
+        'password': os.environ.get('DB_PASSWORD', 'dev_password_123'),
+        'port': int(os.environ.get('DB_PORT', 5432))
+    }
+
+    try:
+        match_recipes(db_config, args.top, args.block_size, args.batch_size, args.loader, args.tenant_id)
+        print("🎉 Recipe style matching completed successfully!")
+    except Exception as e:
+        print(f"💥 Error during matching: {e}")
+        sys.exit(1)
@@ -4,127 +4,674 @@ Populate BJCP database tables with data from bjcp2.json
 This script processes the BeerJSON format and populates all related tables.
 """
 
+import argparse
+import concurrent.futures
+import hashlib
+import io
 import json
 import sys
 import os
+import queue
+import threading
+import time
 import psycopg2
-import re
-from decimal import Decimal, InvalidOperation
+import psycopg2.extras
 from datetime import datetime
 import uuid
 
-def safe_decimal(value, max_digits=6, decimal_places=3):
-    """Safely convert a value to decimal with proper formatting."""
-    if not value:
-        return None
-    try:
-        return Decimal(str(value)).quantize(Decimal('0.' + '0' * decimal_places))
-    except (ValueError, InvalidOperation, TypeError):
-        return None
-
-def safe_gravity(value):
-    """Safely convert gravity values, handling both decimal and integer formats."""
-    if not value:
-        return None
-    try:
-        float_val = float(value)
-        # If value is > 2.0, it's likely in integer format (e.g., 1055 = 1.055)
-        if float_val > 2.0:
-            float_val = float_val / 1000.0
-        return Decimal(str(float_val)).quantize(Decimal('0.001'))
-    except (ValueError, InvalidOperation, TypeError):
-        return None
-
-def safe_int(value):
-    """Safely convert a value to integer."""
-    if not value:
-        return None
+from bjcp_breweries import DEFAULT_BREWERIES_PATH, BreweryGazetteer, learn_breweries
+from bjcp_bulk import BulkLoad
+from bjcp_cache import DEFAULT_CACHE_DIR, CatalogCache
+from bjcp_checkpoint import LoadLedger, load_key
+from bjcp_comparisons import resolve_comparisons
+from bjcp_keywords import DEFAULT_MODEL_PATH, KeywordModel
+from bjcp_metrics import NO_METRICS, RunMetrics, progress_to_stderr
+from bjcp_normalize import ValidationReport, iter_normalized, normalize_ranges
+from bjcp_records import iter_records
+from bjcp_shadow import ShadowTables
+from bjcp_snapshot import DEFAULT_SNAPSHOT_PATH, export_snapshot
+from bjcp_tags import categorize_tag
+
+DEFAULT_BATCH_SIZE = 500
+
+# Bump whenever build_entry, or the parsing, normalization or keyword scoring it
+# relies on, changes the entries it produces; cached entries of other versions are ignored
+TRANSFORM_VERSION = 4
+
+# Data files iter_entries reads besides the catalog. They are part of the cache
+# and checkpoint keys, so editing one needs no TRANSFORM_VERSION bump
+TRANSFORM_INPUTS = (DEFAULT_BREWERIES_PATH, DEFAULT_MODEL_PATH)
+
+# Write operations queued ahead of the database writer thread before the parser waits
+DEFAULT_PIPELINE_DEPTH = 8
+
+BEER_STYLE_COLUMNS = [
+    "StyleId", "BJCPNumber", "StyleName", "Category", "CategoryId", "Description",
+    "ABVMin", "ABVMax", "IBUMin", "IBUMax", "SRMMin", "SRMMax",
+    "OGMin", "OGMax", "FGMin", "FGMax",
+    "Appearance", "Aroma", "Flavor", "Mouthfeel", "Comments",
+    "History", "CharacteristicIngredients", "StyleComparison",
+    "CommercialExamples"
+]
+
+CATEGORY_COLUMNS = ["CategoryId", "CategoryNumber", "CategoryName", "Description", "SortOrder"]
+TAG_COLUMNS = ["TagId", "TagName", "Category", "SortOrder"]
+BREWERY_COLUMNS = ["BreweryId", "BreweryKey", "BreweryName", "SortOrder"]
+
+# Tables cleared before a full load, in reverse dependency order
+CLEAR_TABLES = [
+    "BJCP_StyleTagMapping", "BJCP_StyleCharacteristics", "BJCP_CommercialExample", "BJCP_Brewery",
+    "BJCP_StyleComparison", "BJCP_StyleRecommendation", "BJCP_RecipeStyleMatch",
+    "BJCP_StyleJudging", "BJCP_RecipeCompetitionEntry", "BJCP_StylePopularity",
+    "BJCP_StyleAnalytics", "BJCP_StyleTag", "BJCP_BeerCategory"
+]
+
+# Per-style child tables in load order: (table, id column, columns, summary label)
+CHILD_TABLES = [
+    ("BJCP_StyleTagMapping", None, ["StyleId", "TagId"], "style-tag mappings"),
+    ("BJCP_StyleCharacteristics", "CharacteristicId",
+     ["StyleId", "CharacteristicType", "Description", "Keywords"], "style characteristics"),
+    ("BJCP_CommercialExample", "ExampleId",
+     ["StyleId", "BeerName", "BreweryName", "Availability", "BreweryId"], "commercial examples"),
+    ("BJCP_StyleJudging", "JudgingId",
+     ["StyleId", "JudgingCriteria", "CommonFaults", "ScoringWeights"], "style judging criteria")
+]
+
+# Columns referencing BeerStyle and BJCP_BeerCategory without ON DELETE CASCADE (migrations 030 and 039).
+# A style or category dropped from the guide that one of them still uses is kept instead of deleted
+STYLE_REFERENCES = [("Recipe", "StyleId"), ("BJCP_RecipeCompetitionEntry", "StyleId")]
+CATEGORY_REFERENCES = [("BeerStyle", "CategoryId")]
+
+# Tables a --shadow load rebuilds and swaps in, in load order
+SHADOW_TABLES = (["BJCP_BeerCategory", "BJCP_StyleTag", "BJCP_Brewery", "BeerStyle"]
+                 + [table for table, _, _, _ in CHILD_TABLES] + ["BJCP_StyleComparison"])
+
+COMPARISON_COLUMNS = ["PrimaryStyleId", "ComparedStyleId", "ComparisonText", "Relationship", "ComparisonType"]
+
+CHARACTERISTIC_TYPES = ('aroma', 'appearance', 'flavor', 'mouthfeel')
+
+SCORING_WEIGHTS = {
+    "aroma": 12,
+    "appearance": 3,
+    "flavor": 20,
+    "mouthfeel": 5,
+    "overall": 10
+}
+
+# Namespace for the uuid5 ids used by --sync, so every run derives the same ids
+SYNC_NAMESPACE = uuid.UUID('6f1d7c2e-3b4a-5c8d-9e0f-1a2b3c4d5e6f')
+
+def quote_columns(columns):
+    """Render a quoted, comma-separated column list."""
+    return ', '.join(f'"{column}"' for column in columns)
+
+def reference_guards(table, key_column, references):
+    """NOT EXISTS conditions keeping the rows of table that a (table, column) of references still points at."""
+    return [f'NOT EXISTS (SELECT 1 FROM "{referencing_table}" r '
+            f'WHERE r."{referencing_column}" = "{table}"."{key_column}")'
+            for referencing_table, referencing_column in references or ()]
+
+class BatchWriter:
+    """Write rows in multi-row INSERT batches and keep per-table throughput stats."""
+
+    def __init__(self, cur, batch_size=DEFAULT_BATCH_SIZE):
+        self.cur = cur
+        self.batch_size = batch_size
+        self.stats = {}
+
+    def insert(self, table, columns, rows):
+        """Insert rows into table, sending batch_size rows per statement."""
+        rows = list(rows)
+        if not rows:
+            return 0
+        started = time.perf_counter()
+        column_list = quote_columns(columns)
+        psycopg2.extras.execute_values(
+            self.cur,
+            f'INSERT INTO "{table}" ({column_list}) VALUES %s',
+            rows,
+            page_size=self.batch_size
+        )
+        statements = (len(rows) + self.batch_size - 1) // self.batch_size
+        self._record(table, len(rows), statements, time.perf_counter() - started)
+        return len(rows)
+
+    def update(self, table, key_column, columns, rows, touch_column=None):
+        """Update rows given as (key, *values), sending batch_size statements per round-trip."""
+        rows = list(rows)
+        if not rows:
+            return 0
+        started = time.perf_counter()
+        assignments = [f'"{column}" = %s' for column in columns]
+        if touch_column:
+            assignments.append(f'"{touch_column}" = CURRENT_TIMESTAMP')
+        psycopg2.extras.execute_batch(
+            self.cur,
+            f'UPDATE "{table}" SET {", ".join(assignments)} WHERE "{key_column}" = %s',
+            [tuple(row[1:]) + (row[0],) for row in rows],
+            page_size=self.batch_size
+        )
+        statements = (len(rows) + self.batch_size - 1) // self.batch_size
+        self._record(table, len(rows), statements, time.perf_counter() - started)
+        return len(rows)
+
+    def delete(self, table, key_column, keys, unless_referenced_by=None):
+        """Delete every row whose key_column is in keys with a single statement.
+
+        unless_referenced_by lists (table, column) pairs whose rows keep the
+        keys they still reference. Returns the number of rows deleted.
+        """
+        keys = list(keys)
+        if not keys:
+            return 0
+        started = time.perf_counter()
+        guard = ''.join(f' AND {condition}'
+                        for condition in reference_guards(table, key_column, unless_referenced_by))
+        self.cur.execute(f'DELETE FROM "{table}" WHERE "{key_column}" = ANY(%s::uuid[]){guard}', (keys,))
+        self._record(table, self.cur.rowcount, 1, time.perf_counter() - started)
+        return self.cur.rowcount
+
+    def _record(self, table, row_count, statements, elapsed):
+        total_rows, total_statements, total_elapsed = self.stats.get(table, (0, 0, 0.0))
+        self.stats[table] = (total_rows + row_count, total_statements + statements, total_elapsed + elapsed)
+
+    def report(self):
+        """Print rows/sec for every table written so far."""
+        print("⏱️  Write throughput:")
+        for table, (row_count, statements, elapsed) in self.stats.items():
+            rate = row_count / elapsed if elapsed > 0 else float('inf')
+            print(f"   - {table}: {row_count} rows in {elapsed:.3f}s "
+                  f"({rate:,.0f} rows/sec, {statements} statements)")
+
+def copy_text_value(value):
+    """Format a Python value as a field for COPY ... FROM STDIN text format."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (list, tuple)):
+        items = []
+        for item in value:
+            if item is None:
+                items.append('NULL')
+            else:
+                items.append('"' + str(item).replace('\\', '\\\\').replace('"', '\\"') + '"')
+        value = '{' + ','.join(items) + '}'
+    return (str(value)
+            .replace('\\', '\\\\')
+            .replace('\t', '\\t')
+            .replace('\n', '\\n')
+            .replace('\r', '\\r'))
+
+class CopyWriter(BatchWriter):
+    """Stream rows with COPY into unlogged staging tables, then move them with INSERT ... SELECT."""
+
+    def insert(self, table, columns, rows):
+        """Copy rows into a staging table in batch_size buffers, then into table in one statement."""
+        started = time.perf_counter()
+        staging = f"{table}_Staging"
+        column_list = quote_columns(columns)
+
+        self.cur.execute(f'DROP TABLE IF EXISTS "{staging}"')
+        self.cur.execute(
+            f'CREATE UNLOGGED TABLE "{staging}" AS SELECT {column_list} FROM "{table}" WITH NO DATA'
+        )
+
+        row_count = 0
+        statements = 0
+        buffer = io.StringIO()
+        buffered = 0
+        for row in rows:
+            buffer.write('\t'.join(copy_text_value(value) for value in row))
+            buffer.write('\n')
+            buffered += 1
+            if buffered >= self.batch_size:
+                self._copy_buffer(staging, column_list, buffer)
+                row_count += buffered
+                statements += 1
+                buffer = io.StringIO()
+                buffered = 0
+        if buffered:
+            self._copy_buffer(staging, column_list, buffer)
+            row_count += buffered
+            statements += 1
+
+        self.cur.execute(
+            f'INSERT INTO "{table}" ({column_list}) SELECT {column_list} FROM "{staging}"'
+        )
+        self.cur.execute(f'DROP TABLE "{staging}"')
+        self._record(table, row_count, statements + 1, time.perf_counter() - started)
+        return row_count
+
+    def _copy_buffer(self, staging, column_list, buffer):
+        buffer.seek(0)
+        self.cur.copy_expert(f'COPY "{staging}" ({column_list}) FROM STDIN', buffer)
+
+LOADERS = {
+    'insert': BatchWriter,
+    'copy': CopyWriter
+}
+
+class PipelinedWriter:
+    """Run another writer's inserts and updates on a background thread, fed through a bounded queue.
+
+    The caller parses and transforms the next chunk of styles while the
+    previous one is written, so CPU and database work overlap. Once depth
+    operations are queued, insert() and update() block until the writer
+    thread catches up, which caps memory. The wrapped writer's cursor belongs
+    to the writer thread until close() returns.
+    """
+
+    def __init__(self, writer, depth=DEFAULT_PIPELINE_DEPTH):
+        self.writer = writer
+        self.queue = queue.Queue(maxsize=depth)
+        self.error = None
+        self.cancelled = False
+        self.thread = threading.Thread(target=self._drain, name="bjcp-writer", daemon=True)
+        self.thread.start()
+
+    @property
+    def stats(self):
+        return self.writer.stats
+
+    def _drain(self):
+        while True:
+            operation = self.queue.get()
+            try:
+                if operation is None:
+                    return
+                # After a failure the rest of the queue is discarded so the producer never blocks
+                if self.error is None and not self.cancelled:
+                    method, args = operation
+                    method(*args)
+            except Exception as e:
+                self.error = e
+            finally:
+                self.queue.task_done()
+
+    def _submit(self, method, *args):
+        if self.error is not None:
+            raise self.error
+        self.queue.put((method, args))
+
+    def insert(self, table, columns, rows):
+        """Queue rows for insertion; returns the row count without waiting for the write."""
+        rows = list(rows)
+        if rows:
+            self._submit(self.writer.insert, table, columns, rows)
+        return len(rows)
+
+    def update(self, table, key_column, columns, rows, touch_column=None):
+        """Queue row updates; returns the row count without waiting for the write."""
+        rows = list(rows)
+        if rows:
+            self._submit(self.writer.update, table, key_column, columns, rows, touch_column)
+        return len(rows)
+
+    def delete(self, table, key_column, keys, unless_referenced_by=None):
+        """Delete after everything queued so far is written, since the row count is needed now."""
+        self.flush()
+        return self.writer.delete(table, key_column, keys, unless_referenced_by)
+
+    def flush(self):
+        """Wait for every queued operation and re-raise the first write error."""
+        self.queue.join()
+        if self.error is not None:
+            raise self.error
+
+    def close(self, discard=False):
+        """Stop the writer thread, first writing everything queued unless discard is set."""
+        if not self.thread.is_alive():
+            return
+        self.cancelled = discard
+        self.queue.put(None)
+        self.thread.join()
+        if self.error is not None and not discard:
+            raise self.error
+
+    def report(self):
+        self.writer.report()
+
+def category_sort_key(cat_num):
+    """Sort categories numerically, keeping 'X' and other non-numeric ids last."""
+    if cat_num == 'X':
+        return 999
     try:
-        return int(float(str(value)))
-    except (ValueError, TypeError):
-        return None
-
-def extract_tags(tags_string):
-    """Extract individual tags from comma-separated string."""
-    if not tags_string:
-        return []
-    return [tag.strip() for tag in tags_string.split(',') if tag.strip()]
-
-def categorize_tag(tag_name):
-    """Categorize a tag based on its content."""
-    tag_lower = tag_name.lower()
-
-    if any(word in tag_lower for word in ['session', 'standard', 'high', 'very-high']):
-        return 'strength'
-    elif any(word in tag_lower for word in ['pale', 'amber', 'dark', 'black', 'color']):
-        return 'color'
-    elif any(word in tag_lower for word in ['bottom-fermented', 'top-fermented', 'lagered', 'ale', 'lager']):
-        return 'fermentation'
-    elif any(word in tag_lower for word in ['north-america', 'europe', 'british', 'german', 'belgian']):
-        return 'origin'
-    elif any(word in tag_lower for word in ['hoppy', 'malty', 'bitter', 'sweet', 'roasty', 'fruity']):
-        return 'flavor-profile'
-    elif any(word in tag_lower for word in ['traditional', 'specialty', 'historical']):
-        return 'style-type'
-    else:
-        return 'other'
-
-def extract_commercial_examples(examples_string):
-    """Extract individual commercial examples from comma-separated string."""
-    if not examples_string:
+        return int(cat_num)
+    except ValueError:
+        return 998
+
+def characteristic_texts(record):
+    """(type, text) for every characteristic a style describes."""
+    return [(char_type, getattr(record, char_type)) for char_type in CHARACTERISTIC_TYPES
+            if getattr(record, char_type)]
+
+def split_commercial_example(example, breweries):
+    """Split a commercial example into (beer_name, brewery_name, availability, brewery_key).
+
+    breweries is the BreweryGazetteer of the catalog; examples that start with
+    no brewery it knows keep their whole text as the beer name.
+    """
+    beer_name, brewery = breweries.split(example)
+    if brewery is None:
+        return example, None, 'unknown', None
+    return beer_name, brewery.name, 'unknown', brewery.key
+
+def extract_common_faults(comments):
+    """Collect the sentences of a comments block that mention faults."""
+    if 'fault' not in comments.lower():
         return []
+    return [sentence.strip() for sentence in comments.split('.') if 'fault' in sentence.lower()]
+
+def build_entry(record, ranges, keywords, breweries):
+    """Transform one StyleRecord, its normalized range columns, its keywords per characteristic
+    and the catalog's brewery gazetteer into the BeerStyle values and child rows every load mode writes."""
+    # Break down characteristics by type
+    characteristics = [(char_type, description, keywords[char_type])
+                       for char_type, description in characteristic_texts(record)]
+
+    examples = [split_commercial_example(example, breweries) for example in record.commercial_examples]
+
+    # Basic judging criteria based on BJCP standards
+    criteria = {
+        "scoring_system": "BJCP",
+        "max_score": 50,
+        "categories": SCORING_WEIGHTS,
+        "description": f"BJCP 2021 judging criteria for {record.name}"
+    }
 
-    # Split by comma and clean up each example
-    examples = []
-    for example in examples_string.split(','):
-        example = example.strip()
-        if example:
-            examples.append(example)
-    return examples
-
-def parse_style_comparisons(comparison_text, current_style_name):
-    """Parse style comparison text to extract referenced styles."""
-    if not comparison_text:
-        return []
-
-    # Common patterns for style references in BJCP text
-    style_patterns = [
-        r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*(?:\s+[A-Z][a-z]+)*)\b',  # Capitalized style names
-        r'\b\d+[A-Z]\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\b',  # BJCP style numbers
-    ]
-
-    comparisons = []
-    words = comparison_text.split()
-
-    # Look for comparison keywords and extract context
-    comparison_keywords = ['than', 'like', 'similar', 'compared', 'versus', 'less', 'more']
-
-    for i, word in enumerate(words):
-        if word.lower() in comparison_keywords and i > 0 and i < len(words) - 1:
-            # Extract potential style name before or after comparison word
-            context = ' '.join(words[max(0, i-3):min(len(words), i+4)])
-            comparisons.append({
-                'text': context,
-                'relationship': word.lower(),
-                'type': 'comparison'
-            })
-
-    return comparisons
-
-def populate_database(json_file_path, db_config):
-    """Main function to populate all BJCP tables."""
+    return {
+        'number': record.number,
+        'category_number': record.category_number or '',
+        'category': ((record.category_number, record.category, record.category_description or '')
+                     if record.category_number and record.category else None),
+        'style': {
+            "BJCPNumber": record.number,
+            "StyleName": record.name,
+            "Category": record.category,
+            "Description": record.overall_impression,
+            "ABVMin": ranges["ABVMin"],
+            "ABVMax": ranges["ABVMax"],
+            "IBUMin": ranges["IBUMin"],
+            "IBUMax": ranges["IBUMax"],
+            "SRMMin": ranges["SRMMin"],
+            "SRMMax": ranges["SRMMax"],
+            "OGMin": ranges["OGMin"],
+            "OGMax": ranges["OGMax"],
+            "FGMin": ranges["FGMin"],
+            "FGMax": ranges["FGMax"],
+            "Appearance": record.appearance,
+            "Aroma": record.aroma,
+            "Flavor": record.flavor,
+            "Mouthfeel": record.mouthfeel,
+            "Comments": record.comments,
+            "History": record.history,
+            "CharacteristicIngredients": record.ingredients,
+            "StyleComparison": record.style_comparison,
+            "CommercialExamples": record.examples
+        },
+        'tags': list(record.tags),
+        'characteristics': characteristics,
+        'examples': examples,
+        'judging': (json.dumps(criteria), extract_common_faults(record.comments or ''),
+                    json.dumps(SCORING_WEIGHTS))
+    }
 
-    # Read BJCP data
-    with open(json_file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+def iter_entries(json_file_path, chunk_size=DEFAULT_BATCH_SIZE):
+    """Stream catalog entries from a BeerJSON file.
+
+    Ranges are normalized, keywords scored against the pinned keyword model
+    and examples split by the brewery gazetteer chunk_size styles at a time.
+    """
+    breweries = BreweryGazetteer.from_file()
+    keywords = KeywordModel.from_file()
+    for records in chunked(iter_records(json_file_path), chunk_size):
+        texts = [characteristic_texts(record) for record in records]
+        terms = iter(keywords.top_terms([text for pairs in texts for _, text in pairs]))
+        for record, ranges, pairs in zip(records, normalize_ranges(records), texts):
+            yield build_entry(record, ranges, {char_type: next(terms) for char_type, _ in pairs}, breweries)
+
+def refresh_keyword_model(json_file_path, path=DEFAULT_MODEL_PATH):
+    """Recount keyword document frequencies over every characteristic text of a BeerJSON file and pin them.
+
+    Every style's keywords may change, so the next --sync rewrites most characteristics.
+    """
+    model = KeywordModel.from_texts(text for record in iter_records(json_file_path)
+                                    for _, text in characteristic_texts(record))
+    model.save(path)
+    return model
+
+def learn_catalog_breweries(json_file_path, path=DEFAULT_BREWERIES_PATH):
+    """Learn breweries from every commercial example of a BeerJSON file into the gazetteer file.
+
+    Examples of any style that start with a new brewery are split differently,
+    so the next --sync rewrites their commercial examples.
+    """
+    return learn_breweries((example for record in iter_records(json_file_path)
+                            for example in record.commercial_examples), path)
+
+def validate_catalog(json_file_path, chunk_size=DEFAULT_BATCH_SIZE):
+    """Normalize every style's ranges without touching the database and return the ValidationReport."""
+    report = ValidationReport()
+    for _ in iter_normalized(iter_records(json_file_path), report, chunk_size):
+        pass
+    return report
+
+def open_catalog(json_file_path, chunk_size=DEFAULT_BATCH_SIZE, cache_dir=DEFAULT_CACHE_DIR):
+    """Return (ValidationReport, entries) for a BeerJSON file.
+
+    Both come from the cache in cache_dir when the file, TRANSFORM_INPUTS and
+    TRANSFORM_VERSION are unchanged. Otherwise the file is validated and entries are streamed
+    from iter_entries(), being cached as they are consumed. A cache_dir of
+    None disables the cache.
+    """
+    if cache_dir is None:
+        return validate_catalog(json_file_path, chunk_size), iter_entries(json_file_path, chunk_size)
+
+    cache = CatalogCache(json_file_path, TRANSFORM_VERSION, cache_dir, TRANSFORM_INPUTS)
+    cached = cache.read()
+    if cached is not None:
+        print(f"📦 Using cached catalog {cache.key}")
+        return cached
+    report = validate_catalog(json_file_path, chunk_size)
+    return report, cache.write(report, iter_entries(json_file_path, chunk_size))
+
+def chunked(iterable, size):
+    """Yield lists of up to size items from iterable."""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+class Vocabulary:
+    """Categories, tags or breweries discovered while styles stream past.
+
+    Rows are (key, *values). Keys found in existing ({key: (id, key, *values,
+    sort_order)}) keep their id and sort order and are only rewritten when
+    their values changed; new keys get an id from make_id. New keys are
+    sorted after the stored ones once the stream is exhausted.
+    """
+
+    def __init__(self, make_id, existing=None, sort_key=None):
+        self.make_id = make_id
+        self.existing = existing or {}
+        self.sort_key = sort_key
+        self.ids = {}
+        self.added = 0
+        self.updated = 0
+
+    def resolve(self, rows):
+        """Register rows for unseen keys and return the (inserts, updates) they need."""
+        inserts = []
+        updates = []
+        for row in rows:
+            key = row[0]
+            if key in self.ids:
+                continue
+            current = self.existing.get(key)
+            if current is None:
+                self.ids[key] = self.make_id(key)
+                inserts.append((self.ids[key],) + row + (None,))
+            else:
+                self.ids[key] = str(current[0])
+                if tuple(current[1:-1]) != row:
+                    updates.append((self.ids[key],) + row)
+        self.added += len(inserts)
+        self.updated += len(updates)
+        return inserts, updates
+
+    def sort_orders(self):
+        """(id, SortOrder) rows for every key without a stored sort order.
+
+        Stored sort orders are never renumbered, so adding or removing a key
+        does not rewrite the others; new keys are appended after the highest
+        stored one, in sort_key order.
+        """
+        last = max((current[-1] for current in self.existing.values() if current[-1] is not None), default=0)
+        rows = []
+        for key in sorted(self.ids, key=self.sort_key):
+            current = self.existing.get(key)
+            if current is None or current[-1] is None:
+                last += 1
+                rows.append((self.ids[key], last))
+        return rows
+
+    def stale_ids(self):
+        """Ids of existing rows whose key never appeared in the stream."""
+        return [str(current[0]) for key, current in self.existing.items() if key not in self.ids]
+
+def write_vocabulary(writer, entries, categories, tags, breweries):
+    """Insert or update the categories, tags and breweries a chunk of entries refers to."""
+    inserts, updates = categories.resolve(entry['category'] for entry in entries if entry['category'])
+    writer.insert("BJCP_BeerCategory", CATEGORY_COLUMNS, inserts)
+    writer.update("BJCP_BeerCategory", "CategoryId", CATEGORY_COLUMNS[1:-1], updates, touch_column="Updated")
+
+    new_tags = dict.fromkeys(tag for entry in entries for tag in entry['tags'] if tag not in tags.ids)
+    inserts, updates = tags.resolve((tag, categorize_tag(tag)) for tag in new_tags)
+    writer.insert("BJCP_StyleTag", TAG_COLUMNS, inserts)
+    writer.update("BJCP_StyleTag", "TagId", TAG_COLUMNS[1:-1], updates)
+
+    inserts, updates = breweries.resolve(dict.fromkeys(
+        (key, name) for entry in entries for _, name, _, key in entry['examples'] if key and key not in breweries.ids
+    ))
+    writer.insert("BJCP_Brewery", BREWERY_COLUMNS, inserts)
+    writer.update("BJCP_Brewery", "BreweryId", BREWERY_COLUMNS[1:-1], updates)
+
+def write_sort_orders(writer, categories, tags, breweries):
+    """Store the final category, tag and brewery sort orders once every style has been seen."""
+    writer.update("BJCP_BeerCategory", "CategoryId", ["SortOrder"], categories.sort_orders())
+    writer.update("BJCP_StyleTag", "TagId", ["SortOrder"], tags.sort_orders())
+    writer.update("BJCP_Brewery", "BreweryId", ["SortOrder"], breweries.sort_orders())
+
+def style_row(entry, style_id, category_id):
+    """Build the BeerStyle row for a catalog entry."""
+    values = dict(entry['style'], StyleId=style_id, CategoryId=category_id)
+    return tuple(values[column] for column in BEER_STYLE_COLUMNS)
+
+def child_rows(entry, style_id, tag_ids, brewery_ids):
+    """Build the rows of every per-style child table for a catalog entry, keyed by table."""
+    return {
+        "BJCP_StyleTagMapping": [(style_id, tag_ids[tag]) for tag in entry['tags'] if tag in tag_ids],
+        "BJCP_StyleCharacteristics": [(style_id,) + row for row in entry['characteristics']],
+        "BJCP_CommercialExample": [(style_id, beer_name, brewery_name, availability, brewery_ids.get(key))
+                                   for beer_name, brewery_name, availability, key in entry['examples']],
+        "BJCP_StyleJudging": [(style_id,) + entry['judging']]
+    }
 
-    styles = data['beerjson']['styles']
-    print(f"Processing {len(styles)} beer styles...")
+def write_children(writer, styles, tag_ids, brewery_ids, stable_ids=False):
+    """Insert the child rows of (style_id, entry) pairs; return the row count per table.
+
+    With stable_ids, child rows get uuid5 ids derived from the BJCP number
+    instead of the table defaults.
+    """
+    children = [(entry['number'], child_rows(entry, style_id, tag_ids, brewery_ids)) for style_id, entry in styles]
+    counts = {}
+    for table, id_column, columns, _ in CHILD_TABLES:
+        if stable_ids and id_column:
+            counts[table] = writer.insert(table, [id_column] + columns, [
+                (stable_id(table, number, str(i)),) + row
+                for number, rows in children for i, row in enumerate(rows[table])
+            ])
+        else:
+            counts[table] = writer.insert(table, columns, [row for _, rows in children for row in rows[table]])
+    return counts
+
+def comparison_source(entry, style_id):
+    """The (style_id, number, name, comparison text) a style contributes to comparison resolution."""
+    return (style_id, entry['number'], entry['style']['StyleName'], entry['style']['StyleComparison'])
+
+def comparison_rows(sources, stable_ids=False):
+    """Resolve BJCP_StyleComparison rows for the whole catalog, optionally prefixed with uuid5 ids."""
+    rows = resolve_comparisons(sources)
+    if stable_ids:
+        return [(stable_id("BJCP_StyleComparison", row[0], row[1]),) + row for row in rows]
+    return rows
+
+def write_comparisons(writer, sources, stable_ids=False):
+    """Insert the comparisons between styles; needs every style, so it runs after the stream."""
+    columns = (["ComparisonId"] if stable_ids else []) + COMPARISON_COLUMNS
+    return writer.insert("BJCP_StyleComparison", columns, comparison_rows(sources, stable_ids))
+
+def catalog_chunks(json_file_path, batch_size, chunks=None):
+    """Chunks of catalog entries: the prepared chunks when given, else streamed from the JSON file."""
+    if chunks is not None:
+        return chunks
+    return chunked(iter_entries(json_file_path, batch_size), batch_size)
+
+def write_catalog(writer, chunks, categories, tags, breweries, make_style_id, stable_ids=False):
+    """Write every chunk of catalog entries into the BJCP tables and return the row count per table.
+
+    make_style_id(entry) assigns each style its StyleId; stable_ids is passed
+    on to the child-table and comparison writers.
+    """
+    counts = dict.fromkeys(["BeerStyle"] + [table for table, _, _, _ in CHILD_TABLES], 0)
+    comparison_sources = []
+
+    for chunk in chunks:
+        write_vocabulary(writer, chunk, categories, tags, breweries)
+
+        styles = [(make_style_id(entry), entry) for entry in chunk]
+        counts["BeerStyle"] += writer.insert(
+            "BeerStyle",
+            BEER_STYLE_COLUMNS,
+            [style_row(entry, style_id, categories.ids.get(entry['category_number']))
+             for style_id, entry in styles]
+        )
+        for table, count in write_children(writer, styles, tags.ids, breweries.ids, stable_ids).items():
+            counts[table] += count
+        comparison_sources.extend(comparison_source(entry, style_id) for style_id, entry in styles)
+
+        print(f"  Processed {counts['BeerStyle']} styles...")
+
+    write_sort_orders(writer, categories, tags, breweries)
+    counts["BJCP_StyleComparison"] = write_comparisons(writer, comparison_sources, stable_ids)
+    counts["BJCP_BeerCategory"] = len(categories.ids)
+    counts["BJCP_StyleTag"] = len(tags.ids)
+    counts["BJCP_Brewery"] = len(breweries.ids)
+    return counts
+
+def populate_database(json_file_path, db_config, batch_size=DEFAULT_BATCH_SIZE, loader='insert',
+                      pipeline_depth=DEFAULT_PIPELINE_DEPTH, chunks=None, metrics=NO_METRICS, bulk=False):
+    """Main function to populate all BJCP tables, streaming styles in chunks of batch_size.
+
+    Parsing and transforming run on this thread while a writer thread sends
+    the rows to Postgres, with at most pipeline_depth write operations queued
+    between them (0 writes inline). chunks replaces the JSON stream with
+    entries prepared by prepare_catalog() or read through open_catalog().
+    metrics (a RunMetrics) times each phase and counts statements and rows.
+    With bulk, foreign keys are deferred to COMMIT, secondary indexes are
+    dropped for the load and rebuilt afterwards, and the tables are analyzed.
+    """
 
     # Connect to database
-    conn = psycopg2.connect(**db_config)
+    conn = metrics.connect(db_config)
     conn.autocommit = False
     cur = conn.cursor()
+    writer = LOADERS[loader](cur, batch_size)
 
     try:
         # Start transaction
@@ -132,302 +679,622 @@ def populate_database(json_file_path, db_config):
 
         # Clear existing data (in reverse dependency order)
         print("Clearing existing BJCP data...")
-        clear_tables = [
-            "BJCP_StyleTagMapping", "BJCP_StyleCharacteristics", "BJCP_CommercialExample",
-            "BJCP_StyleComparison", "BJCP_StyleRecommendation", "BJCP_RecipeStyleMatch",
-            "BJCP_StyleJudging", "BJCP_RecipeCompetitionEntry", "BJCP_StylePopularity",
-            "BJCP_StyleAnalytics", "BJCP_StyleTag", "BJCP_BeerCategory"
-        ]
-
-        for table in clear_tables:
-            try:
-                cur.execute(f'DELETE FROM "{table}";')
-                print(f"  Cleared {table}")
-            except psycopg2.Error as e:
-                print(f"  Warning: Could not clear {table}: {e}")
-
-        # ============================================================================
-        # 1. POPULATE BEER CATEGORIES
-        # ============================================================================
-        print("\n1. Populating BJCP_BeerCategory table...")
-
-        categories = {}
-        for style in styles:
-            cat_num = style.get('category_id', '')
-            cat_name = style.get('category', '')
-            cat_desc = style.get('category_description', '')
-
-            if cat_num and cat_name and cat_num not in categories:
-                categories[cat_num] = {
-                    'name': cat_name,
-                    'description': cat_desc,
-                    'id': str(uuid.uuid4())
-                }
-
-        # Sort categories numerically (handle 'X' category)
-        def sort_key(cat_num):
-            if cat_num == 'X':
-                return 999
-            try:
-                return int(cat_num)
-            except:
-                return 998
-
-        sorted_categories = sorted(categories.items(), key=lambda x: sort_key(x[0]))
+        with metrics.phase('clear'):
+            for table in CLEAR_TABLES:
+                try:
+                    cur.execute(f'DELETE FROM "{table}";')
+                    print(f"  Cleared {table}")
+                except psycopg2.Error as e:
+                    print(f"  Warning: Could not clear {table}: {e}")
+
+        # The tables a full load writes are the ones a --shadow load rebuilds
+        bulk_load = BulkLoad(cur, SHADOW_TABLES) if bulk else None
+        if bulk_load:
+            with metrics.phase('drop_indexes'):
+                bulk_load.begin()
+                bulk_load.drop_indexes()
+
+        print(f"\nProcessing beer styles from {os.path.basename(json_file_path)}...")
+        if pipeline_depth:
+            writer = PipelinedWriter(writer, pipeline_depth)
+        categories = Vocabulary(lambda key: str(uuid.uuid4()), sort_key=category_sort_key)
+        tags = Vocabulary(lambda key: str(uuid.uuid4()))
+        breweries = Vocabulary(lambda key: str(uuid.uuid4()))
+        with metrics.phase('load'):
+            counts = write_catalog(
+                writer, metrics.timed('transform', catalog_chunks(json_file_path, batch_size, chunks)),
+                categories, tags, breweries, lambda entry: str(uuid.uuid4())
+            )
+        if pipeline_depth:
+            with metrics.phase('drain'):
+                writer.close()
+        if bulk_load:
+            with metrics.phase('rebuild_indexes'):
+                bulk_load.rebuild_indexes()
+
+        # Commit transaction; deferred foreign keys are checked here
+        with metrics.phase('commit'):
+            cur.execute("COMMIT;")
+        if bulk_load:
+            with metrics.phase('analyze'):
+                bulk_load.analyze()
+                conn.commit()
+        print(f"\n✅ Successfully populated all BJCP tables!")
+        print(f"📊 Summary:")
+        print(f"   - {len(categories.ids)} categories")
+        print(f"   - {len(tags.ids)} tags")
+        print(f"   - {len(breweries.ids)} breweries")
+        print(f"   - {counts['BeerStyle']} beer styles")
+        for table, _, _, label in CHILD_TABLES:
+            print(f"   - {counts[table]} {label}")
+        print(f"   - {counts['BJCP_StyleComparison']} style comparisons")
+        writer.report()
+        metrics.record_tables(writer.stats)
 
-        for i, (cat_num, cat_data) in enumerate(sorted_categories):
-            cur.execute("""
-                INSERT INTO "BJCP_BeerCategory"
-                ("CategoryId", "CategoryNumber", "CategoryName", "Description", "SortOrder")
-                VALUES (%s, %s, %s, %s, %s)
-            """, (cat_data['id'], cat_num, cat_data['name'], cat_data['description'], i + 1))
+    except Exception as e:
+        if isinstance(writer, PipelinedWriter):
+            writer.close(discard=True)
+        cur.execute("ROLLBACK;")
+        print(f"❌ Error populating database: {e}")
+        raise
+    finally:
+        cur.close()
+        conn.close()
 
-        print(f"  Inserted {len(categories)} categories")
+def stable_id(kind, *parts):
+    """Derive a deterministic UUID so repeated syncs address the same rows."""
+    return str(uuid.uuid5(SYNC_NAMESPACE, '/'.join((kind,) + parts)))
 
-        # ============================================================================
-        # 2. POPULATE STYLE TAGS
-        # ============================================================================
-        print("\n2. Populating BJCP_StyleTag table...")
+def content_hash(entry):
+    """Hash everything a catalog entry writes for its style, so unchanged styles can be skipped."""
+    payload = json.dumps({key: value for key, value in entry.items() if key != 'category'},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
 
-        all_tags = set()
-        for style in styles:
-            tags = extract_tags(style.get('tags', ''))
-            all_tags.update(tags)
+def read_vocabularies(cur):
+    """Category, tag and brewery Vocabularies that keep the ids of the rows already in the database.
 
-        tag_ids = {}
-        for i, tag in enumerate(sorted(all_tags)):
-            tag_id = str(uuid.uuid4())
-            category = categorize_tag(tag)
+    New keys get the uuid5 ids used by --sync.
+    """
+    cur.execute(f'SELECT {quote_columns(CATEGORY_COLUMNS)} FROM "BJCP_BeerCategory"')
+    categories = Vocabulary(lambda key: stable_id('category', key),
+                            {row[1]: row for row in cur.fetchall()}, category_sort_key)
 
-            cur.execute("""
-                INSERT INTO "BJCP_StyleTag"
-                ("TagId", "TagName", "Category", "SortOrder")
-                VALUES (%s, %s, %s, %s)
-            """, (tag_id, tag, category, i + 1))
+    cur.execute(f'SELECT {quote_columns(TAG_COLUMNS)} FROM "BJCP_StyleTag"')
+    tags = Vocabulary(lambda key: stable_id('tag', key), {row[1]: row for row in cur.fetchall()})
 
-            tag_ids[tag] = tag_id
+    cur.execute(f'SELECT {quote_columns(BREWERY_COLUMNS)} FROM "BJCP_Brewery"')
+    breweries = Vocabulary(lambda key: stable_id('brewery', key), {row[1]: row for row in cur.fetchall()})
+    return categories, tags, breweries
 
-        print(f"  Inserted {len(all_tags)} tags")
+def sync_database(json_file_path, db_config, batch_size=DEFAULT_BATCH_SIZE, loader='insert', chunks=None,
+                  metrics=NO_METRICS):
+    """Incrementally sync the BJCP tables, writing only categories, tags, breweries and styles that changed."""
 
-        # ============================================================================
-        # 3. POPULATE BEER STYLES
-        # ============================================================================
-        print("\n3. Populating BeerStyle table...")
+    conn = metrics.connect(db_config)
+    conn.autocommit = False
+    cur = conn.cursor()
+    writer = LOADERS[loader](cur, batch_size)
 
-        style_ids = {}
-        for style in styles:
-            style_id = str(uuid.uuid4())
-            category_id = categories.get(style.get('category_id', ''), {}).get('id')
-
-            # Extract ranges from nested structure
-            og_min = safe_gravity(style.get('original_gravity', {}).get('minimum', {}).get('value'))
-            og_max = safe_gravity(style.get('original_gravity', {}).get('maximum', {}).get('value'))
-            fg_min = safe_gravity(style.get('final_gravity', {}).get('minimum', {}).get('value'))
-            fg_max = safe_gravity(style.get('final_gravity', {}).get('maximum', {}).get('value'))
-            abv_min = safe_decimal(style.get('alcohol_by_volume', {}).get('minimum', {}).get('value'), 4, 2)
-            abv_max = safe_decimal(style.get('alcohol_by_volume', {}).get('maximum', {}).get('value'), 4, 2)
-            ibu_min = safe_int(style.get('international_bitterness_units', {}).get('minimum', {}).get('value'))
-            ibu_max = safe_int(style.get('international_bitterness_units', {}).get('maximum', {}).get('value'))
-            srm_min = safe_int(style.get('color', {}).get('minimum', {}).get('value'))
-            srm_max = safe_int(style.get('color', {}).get('maximum', {}).get('value'))
+    try:
+        with metrics.phase('read_state'):
+            categories, tags, breweries = read_vocabularies(cur)
 
+            # Styles are matched by BJCP number so existing StyleIds (and everything referencing them) survive
             cur.execute("""
-                INSERT INTO "BeerStyle" (
-                    "StyleId", "BJCPNumber", "StyleName", "Category", "CategoryId", "Description",
-                    "ABVMin", "ABVMax", "IBUMin", "IBUMax", "SRMMin", "SRMMax",
-                    "OGMin", "OGMax", "FGMin", "FGMax",
-                    "Appearance", "Aroma", "Flavor", "Mouthfeel", "Comments",
-                    "History", "CharacteristicIngredients", "StyleComparison",
-                    "CommercialExamples", "Created", "Updated"
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s,
-                    %s, %s, %s, %s, %s, %s,
-                    %s, %s, %s, %s,
-                    %s, %s, %s, %s, %s,
-                    %s, %s, %s,
-                    %s, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
-                )
-            """, (
-                style_id, style.get('style_id'), style.get('name'), style.get('category'),
-                category_id, style.get('overall_impression'),
-                abv_min, abv_max, ibu_min, ibu_max, srm_min, srm_max,
-                og_min, og_max, fg_min, fg_max,
-                style.get('appearance'), style.get('aroma'), style.get('flavor'),
-                style.get('mouthfeel'), style.get('comments'),
-                style.get('history'), style.get('ingredients'), style.get('style_comparison'),
-                style.get('examples')
-            ))
-
-            style_ids[style.get('style_id')] = style_id
-
-        print(f"  Inserted {len(styles)} beer styles")
-
-        # ============================================================================
-        # 4. POPULATE STYLE-TAG MAPPINGS
-        # ============================================================================
-        print("\n4. Populating BJCP_StyleTagMapping table...")
-
-        mapping_count = 0
-        for style in styles:
-            style_id = style_ids.get(style.get('style_id'))
-            if not style_id:
-                continue
+                SELECT s."StyleId", s."BJCPNumber", state."ContentHash"
+                FROM "BeerStyle" s
+                LEFT JOIN "BJCP_StyleSyncState" state ON state."StyleId" = s."StyleId"
+                WHERE s."BJCPNumber" IS NOT NULL
+                ORDER BY state."ContentHash" IS NULL, s."Created"
+            """)
+            existing_styles = {}
+            for style_id, number, digest in cur.fetchall():
+                existing_styles.setdefault(number, (str(style_id), digest))
+
+        print(f"Syncing beer styles from {os.path.basename(json_file_path)}...")
+        numbers = set()
+        comparison_sources = []
+        added = updated = 0
+
+        for chunk in metrics.timed('transform', catalog_chunks(json_file_path, batch_size, chunks)):
+            write_vocabulary(writer, chunk, categories, tags, breweries)
+
+            new_styles = []
+            changed_styles = []
+            for entry in chunk:
+                numbers.add(entry['number'])
+                digest = content_hash(entry)
+                current = existing_styles.get(entry['number'])
+                if current is None:
+                    style_id = stable_id('style', entry['number'])
+                    new_styles.append((style_id, entry, digest))
+                else:
+                    style_id = current[0]
+                    if current[1] != digest:
+                        changed_styles.append((style_id, entry, digest))
+                comparison_sources.append(comparison_source(entry, style_id))
+
+            changed_ids = [style_id for style_id, _, _ in changed_styles]
+            writer.update(
+                "BeerStyle", "StyleId", BEER_STYLE_COLUMNS[1:],
+                [style_row(entry, style_id, categories.ids.get(entry['category_number']))
+                 for style_id, entry, _ in changed_styles],
+                touch_column="Updated"
+            )
+            for table, _, _, _ in CHILD_TABLES:
+                writer.delete(table, "StyleId", changed_ids)
+            writer.delete("BJCP_StyleSyncState", "StyleId", changed_ids)
+
+            writer.insert(
+                "BeerStyle", BEER_STYLE_COLUMNS,
+                [style_row(entry, style_id, categories.ids.get(entry['category_number']))
+                 for style_id, entry, _ in new_styles]
+            )
+
+            synced = changed_styles + new_styles
+            write_children(writer, [(style_id, entry) for style_id, entry, _ in synced], tags.ids, breweries.ids,
+                           stable_ids=True)
+            writer.insert(
+                "BJCP_StyleSyncState", ["StyleId", "BJCPNumber", "ContentHash"],
+                [(style_id, entry['number'], digest) for style_id, entry, digest in synced]
+            )
+            added += len(new_styles)
+            updated += len(changed_styles)
+
+        # Children and sync state cascade from BeerStyle; styles recipes or competition entries use are kept
+        removed_styles = [style_id for number, (style_id, digest) in existing_styles.items()
+                          if digest is not None and number not in numbers]
+        deleted_styles = writer.delete("BeerStyle", "StyleId", removed_styles, unless_referenced_by=STYLE_REFERENCES)
+        kept_styles = []
+        if deleted_styles < len(removed_styles):
+            cur.execute('SELECT "BJCPNumber" FROM "BeerStyle" WHERE "StyleId" = ANY(%s::uuid[]) ORDER BY 1',
+                        (removed_styles,))
+            kept_styles = [number for number, in cur.fetchall()]
+
+        write_sort_orders(writer, categories, tags, breweries)
+
+        # Comparisons depend on every style's name, so they are re-resolved and diffed as a whole
+        desired = {row[0]: row for row in comparison_rows(comparison_sources, stable_ids=True)}
+        cur.execute(f'SELECT "ComparisonId", {quote_columns(COMPARISON_COLUMNS)} FROM "BJCP_StyleComparison"')
+        current_comparisons = {row[0]: row for row in cur.fetchall()}
+        stale_comparisons = [key for key, row in current_comparisons.items() if desired.get(key) != row]
+        writer.delete("BJCP_StyleComparison", "ComparisonId", stale_comparisons)
+        written_comparisons = writer.insert(
+            "BJCP_StyleComparison", ["ComparisonId"] + COMPARISON_COLUMNS,
+            [row for key, row in desired.items() if current_comparisons.get(key) != row]
+        )
+
+        # Tags cascade out of their mappings and every example names a brewery still in the catalog;
+        # categories only go once no style uses them
+        stale_tags = tags.stale_ids()
+        writer.delete("BJCP_StyleTag", "TagId", stale_tags)
+        stale_breweries = breweries.stale_ids()
+        writer.delete("BJCP_Brewery", "BreweryId", stale_breweries)
+        stale_categories = categories.stale_ids()
+        removed_categories = writer.delete("BJCP_BeerCategory", "CategoryId", stale_categories,
+                                           unless_referenced_by=CATEGORY_REFERENCES)
+
+        with metrics.phase('commit'):
+            conn.commit()
+        metrics.record_tables(writer.stats)
+        if not writer.stats:
+            print("✅ BJCP catalog already up to date, nothing to write")
+            return
+
+        print(f"\n✅ Successfully synced BJCP tables!")
+        print(f"📊 Summary:")
+        print(f"   - categories: {categories.added} added, {categories.updated} updated, "
+              f"{removed_categories} removed")
+        print(f"   - tags: {tags.added} added, {tags.updated} updated, {len(stale_tags)} removed")
+        print(f"   - breweries: {breweries.added} added, {breweries.updated} updated, "
+              f"{len(stale_breweries)} removed")
+        print(f"   - beer styles: {added} added, {updated} updated, {deleted_styles} removed, "
+              f"{len(numbers) - added - updated} unchanged")
+        print(f"   - style comparisons: {written_comparisons} written, {len(stale_comparisons)} removed, "
+              f"{len(desired)} total")
+        if kept_styles:
+            print(f"⚠️  Kept {len(kept_styles)} styles dropped from the guide that recipes or competition "
+                  f"entries still reference: {', '.join(kept_styles)}")
+        writer.report()
 
-            tags = extract_tags(style.get('tags', ''))
-            for tag in tags:
-                tag_id = tag_ids.get(tag)
-                if tag_id:
-                    cur.execute("""
-                        INSERT INTO "BJCP_StyleTagMapping" ("StyleId", "TagId")
-                        VALUES (%s, %s)
-                    """, (style_id, tag_id))
-                    mapping_count += 1
-
-        print(f"  Inserted {mapping_count} style-tag mappings")
-
-        # ============================================================================
-        # 5. POPULATE STYLE CHARACTERISTICS
-        # ============================================================================
-        print("\n5. Populating BJCP_StyleCharacteristics table...")
-
-        characteristics_count = 0
-        for style in styles:
-            style_id = style_ids.get(style.get('style_id'))
-            if not style_id:
-                continue
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error syncing database: {e}")
+        raise
+    finally:
+        cur.close()
+        conn.close()
 
-            # Break down characteristics by type
-            char_types = [
-                ('aroma', style.get('aroma')),
-                ('appearance', style.get('appearance')),
-                ('flavor', style.get('flavor')),
-                ('mouthfeel', style.get('mouthfeel'))
-            ]
-
-            for char_type, description in char_types:
-                if description:
-                    # Extract keywords from description (simple approach)
-                    keywords = []
-                    # Look for descriptive words
-                    descriptive_words = re.findall(r'\b[a-z]+(?:ly)?\b', description.lower())
-                    keywords = list(set([word for word in descriptive_words if len(word) > 3]))[:10]  # Limit keywords
-
-                    cur.execute("""
-                        INSERT INTO "BJCP_StyleCharacteristics"
-                        ("StyleId", "CharacteristicType", "Description", "Keywords")
-                        VALUES (%s, %s, %s, %s)
-                    """, (style_id, char_type, description, keywords))
-                    characteristics_count += 1
-
-        print(f"  Inserted {characteristics_count} style characteristics")
-
-        # ============================================================================
-        # 6. POPULATE COMMERCIAL EXAMPLES
-        # ============================================================================
-        print("\n6. Populating BJCP_CommercialExample table...")
-
-        examples_count = 0
-        for style in styles:
-            style_id = style_ids.get(style.get('style_id'))
-            if not style_id:
-                continue
+def carry_over_styles(cur, shadow):
+    """Copy live styles the catalog did not write, and the categories they use, into the shadow tables.
+
+    BeerStyle rows are never deleted by a reload, so recipes keep their
+    styles; returns the number of rows copied per table.
+    """
+    live_styles = shadow.live("BeerStyle")
+    shadow_styles = shadow.shadow("BeerStyle")
+    cur.execute(f"""
+        INSERT INTO {shadow.shadow("BJCP_BeerCategory")}
+        SELECT * FROM {shadow.live("BJCP_BeerCategory")} c
+        WHERE NOT EXISTS (SELECT 1 FROM {shadow.shadow("BJCP_BeerCategory")} s WHERE s."CategoryId" = c."CategoryId")
+          AND EXISTS (SELECT 1 FROM {live_styles} l
+                      WHERE l."CategoryId" = c."CategoryId"
+                        AND NOT EXISTS (SELECT 1 FROM {shadow_styles} s WHERE s."StyleId" = l."StyleId"))
+    """)
+    categories = cur.rowcount
+    cur.execute(f"""
+        INSERT INTO {shadow_styles}
+        SELECT * FROM {live_styles} l
+        WHERE NOT EXISTS (SELECT 1 FROM {shadow_styles} s WHERE s."StyleId" = l."StyleId")
+    """)
+    return {"BJCP_BeerCategory": categories, "BeerStyle": cur.rowcount}
+
+def shadow_populate_database(json_file_path, db_config, batch_size=DEFAULT_BATCH_SIZE, loader='insert',
+                             pipeline_depth=DEFAULT_PIPELINE_DEPTH, chunks=None, metrics=NO_METRICS):
+    """Reload the BJCP tables into shadow copies and swap them in without blocking readers.
+
+    Categories, tags, breweries and styles keep the ids of their live rows
+    (matched by category number, tag name, brewery key and BJCP number), so
+    recipes, matches and analytics stay attached; new rows get the uuid5 ids
+    used by --sync.
+    """
+
+    conn = metrics.connect(db_config)
+    conn.autocommit = False
+    cur = conn.cursor()
+    shadow = ShadowTables(cur, SHADOW_TABLES)
+    writer = None
 
-            examples = extract_commercial_examples(style.get('examples', ''))
-            for example in examples:
-                # Try to separate brewery and beer name
-                parts = example.split(' ')
-                if len(parts) > 1:
-                    # Simple heuristic: last word(s) might be beer name
-                    brewery_name = ' '.join(parts[:-1])
-                    beer_name = parts[-1]
-                else:
-                    brewery_name = None
-                    beer_name = example
-
-                cur.execute("""
-                    INSERT INTO "BJCP_CommercialExample"
-                    ("StyleId", "BeerName", "BreweryName", "Availability")
-                    VALUES (%s, %s, %s, %s)
-                """, (style_id, beer_name, brewery_name, 'unknown'))
-                examples_count += 1
-
-        print(f"  Inserted {examples_count} commercial examples")
-
-        # ============================================================================
-        # 7. POPULATE STYLE JUDGING CRITERIA
-        # ============================================================================
-        print("\n7. Populating BJCP_StyleJudging table...")
-
-        # Create basic BJCP judging criteria for each style
-        scoring_weights = {
-            "aroma": 12,
-            "appearance": 3,
-            "flavor": 20,
-            "mouthfeel": 5,
-            "overall": 10
-        }
-
-        judging_count = 0
-        for style in styles:
-            style_id = style_ids.get(style.get('style_id'))
-            if not style_id:
-                continue
+    try:
+        cur.execute(f'SELECT "CategoryNumber", "CategoryId" FROM {shadow.live("BJCP_BeerCategory")}')
+        category_ids = {number: str(category_id) for number, category_id in cur.fetchall()}
+        cur.execute(f'SELECT "TagName", "TagId" FROM {shadow.live("BJCP_StyleTag")}')
+        tag_ids = {name: str(tag_id) for name, tag_id in cur.fetchall()}
+        cur.execute(f'SELECT "BreweryKey", "BreweryId" FROM {shadow.live("BJCP_Brewery")}')
+        brewery_ids = {key: str(brewery_id) for key, brewery_id in cur.fetchall()}
+        cur.execute(f'SELECT "BJCPNumber", "StyleId" FROM {shadow.live("BeerStyle")} '
+                    'WHERE "BJCPNumber" IS NOT NULL ORDER BY "Created"')
+        style_ids = {}
+        for number, style_id in cur.fetchall():
+            style_ids.setdefault(number, str(style_id))
+
+        print(f"Building shadow BJCP tables from {os.path.basename(json_file_path)}...")
+        with metrics.phase('create_shadow'):
+            shadow.create()
+        writer = LOADERS[loader](cur, batch_size)
+        if pipeline_depth:
+            writer = PipelinedWriter(writer, pipeline_depth)
+        categories = Vocabulary(lambda key: category_ids.get(key) or stable_id('category', key),
+                                sort_key=category_sort_key)
+        tags = Vocabulary(lambda key: tag_ids.get(key) or stable_id('tag', key))
+        breweries = Vocabulary(lambda key: brewery_ids.get(key) or stable_id('brewery', key))
+        with metrics.phase('load'):
+            counts = write_catalog(
+                writer, metrics.timed('transform', catalog_chunks(json_file_path, batch_size, chunks)),
+                categories, tags, breweries,
+                lambda entry: style_ids.get(entry['number']) or stable_id('style', entry['number']),
+                stable_ids=True
+            )
+        if pipeline_depth:
+            with metrics.phase('drain'):
+                writer.close()
+        with metrics.phase('carry_over'):
+            carried = carry_over_styles(cur, shadow)
+        for table, row_count in carried.items():
+            counts[table] += row_count
+
+        with metrics.phase('finish_shadow'):
+            shadow.finish(counts)
+        with metrics.phase('commit'):
+            conn.commit()
+
+        # Styles created while the shadow tables loaded are copied over under the swap's locks
+        with metrics.phase('swap'):
+            shadow.swap(conn, lambda cur: carry_over_styles(cur, shadow))
+
+        print(f"\n✅ Successfully reloaded all BJCP tables!")
+        print(f"📊 Summary:")
+        print(f"   - {len(categories.ids)} categories")
+        print(f"   - {len(tags.ids)} tags")
+        print(f"   - {len(breweries.ids)} breweries")
+        print(f"   - {counts['BeerStyle']} beer styles ({carried['BeerStyle']} kept from the live table)")
+        for table, _, _, label in CHILD_TABLES:
+            print(f"   - {counts[table]} {label}")
+        print(f"   - {counts['BJCP_StyleComparison']} style comparisons")
+        writer.report()
+        metrics.record_tables(writer.stats)
 
-            # Basic judging criteria based on BJCP standards
-            criteria = {
-                "scoring_system": "BJCP",
-                "max_score": 50,
-                "categories": scoring_weights,
-                "description": f"BJCP 2021 judging criteria for {style.get('name')}"
-            }
-
-            # Extract common faults from comments if available
-            common_faults = []
-            comments = style.get('comments', '')
-            if 'fault' in comments.lower():
-                # Simple extraction of fault-related sentences
-                sentences = comments.split('.')
-                for sentence in sentences:
-                    if 'fault' in sentence.lower():
-                        common_faults.append(sentence.strip())
+    except Exception as e:
+        if isinstance(writer, PipelinedWriter):
+            writer.close(discard=True)
+        conn.rollback()
+        shadow.drop()
+        conn.commit()
+        print(f"❌ Error reloading database: {e}")
+        raise
+    finally:
+        cur.close()
+        conn.close()
 
-            cur.execute("""
-                INSERT INTO "BJCP_StyleJudging"
-                ("StyleId", "JudgingCriteria", "CommonFaults", "ScoringWeights")
-                VALUES (%s, %s, %s, %s)
-            """, (style_id, json.dumps(criteria), common_faults, json.dumps(scoring_weights)))
-            judging_count += 1
+def checkpoint_populate_database(json_file_path, db_config, batch_size=DEFAULT_BATCH_SIZE, loader='insert',
+                                 commit_every=None, chunks=None, metrics=NO_METRICS):
+    """Reload the BJCP tables in checkpointed phases, resuming after the last completed one.
+
+    The phases are the clear, every chunk of batch_size styles, the sort
+    orders and the comparisons. Each runs in a savepoint and is recorded in
+    BJCP_LoadProgress. A failing phase is rolled back on its own and the
+    phases before it are committed, so rerunning the same load skips them.
+    With commit_every, the transaction is also committed whenever at least
+    that many styles were written since the last commit, which keeps
+    transactions and the locks they hold short. Styles, categories, tags and
+    breweries keep the ids of their live rows, so resumed chunks and recipes agree with
+    the chunks written by an earlier run.
+    """
+
+    conn = metrics.connect(db_config)
+    conn.autocommit = False
+    cur = conn.cursor()
+    writer = LOADERS[loader](cur, batch_size)
 
-        print(f"  Inserted {judging_count} style judging criteria")
+    try:
+        with metrics.phase('read_state'):
+            ledger = LoadLedger(cur, load_key(json_file_path, TRANSFORM_VERSION, batch_size, TRANSFORM_INPUTS))
+            categories, tags, breweries = read_vocabularies(cur)
+            cur.execute('SELECT "BJCPNumber", "StyleId" FROM "BeerStyle" '
+                        'WHERE "BJCPNumber" IS NOT NULL ORDER BY "Created"')
+            style_ids = {}
+            for number, style_id in cur.fetchall():
+                style_ids.setdefault(number, str(style_id))
+
+        if ledger.discarded:
+            print(f"⚠️  Discarded the progress of {ledger.discarded} unfinished load(s) of another catalog")
+        if ledger.done:
+            print(f"⏩ Resuming an unfinished load: {len(ledger.done)} phases already completed")
+
+        # Child rows are rewritten for every style; styles, categories, tags and breweries are updated in place
+        if not ledger.completed('clear'):
+            with metrics.phase('clear'), ledger.phase('clear'):
+                for table in [table for table, _, _, _ in CHILD_TABLES] + ["BJCP_StyleComparison",
+                                                                          "BJCP_StyleSyncState"]:
+                    cur.execute(f'DELETE FROM "{table}";')
+                    print(f"  Cleared {table}")
+
+        print(f"\nProcessing beer styles from {os.path.basename(json_file_path)}...")
+        comparison_sources = []
+        loaded = skipped = uncommitted = 0
+        for index, chunk in enumerate(metrics.timed('transform', catalog_chunks(json_file_path, batch_size, chunks))):
+            styles = [(style_ids.get(entry['number']) or stable_id('style', entry['number']), entry)
+                      for entry in chunk]
+            comparison_sources.extend(comparison_source(entry, style_id) for style_id, entry in styles)
+            if ledger.completed('styles', index):
+                # Only registers the chunk's categories, tags and breweries, which an earlier run already wrote
+                write_vocabulary(writer, chunk, categories, tags, breweries)
+                skipped += len(chunk)
+                continue
 
-        # Commit transaction
-        cur.execute("COMMIT;")
+            with metrics.phase('load'), ledger.phase('styles', index, len(chunk)):
+                write_vocabulary(writer, chunk, categories, tags, breweries)
+                rows = [(style_row(entry, style_id, categories.ids.get(entry['category_number'])), entry['number'])
+                        for style_id, entry in styles]
+                writer.update("BeerStyle", "StyleId", BEER_STYLE_COLUMNS[1:],
+                              [row for row, number in rows if number in style_ids], touch_column="Updated")
+                writer.insert("BeerStyle", BEER_STYLE_COLUMNS, [row for row, number in rows if number not in style_ids])
+                write_children(writer, styles, tags.ids, breweries.ids, stable_ids=True)
+            loaded += len(chunk)
+            uncommitted += len(chunk)
+            print(f"  Processed {loaded + skipped} styles...")
+
+            if commit_every and uncommitted >= commit_every:
+                with metrics.phase('commit'):
+                    conn.commit()
+                uncommitted = 0
+
+        if not ledger.completed('sort_orders'):
+            with ledger.phase('sort_orders'):
+                write_sort_orders(writer, categories, tags, breweries)
+        if not ledger.completed('comparisons'):
+            with metrics.phase('comparisons'), ledger.phase('comparisons'):
+                write_comparisons(writer, comparison_sources, stable_ids=True)
+        ledger.finish()
+
+        with metrics.phase('commit'):
+            conn.commit()
         print(f"\n✅ Successfully populated all BJCP tables!")
         print(f"📊 Summary:")
-        print(f"   - {len(categories)} categories")
-        print(f"   - {len(all_tags)} tags")
-        print(f"   - {len(styles)} beer styles")
-        print(f"   - {mapping_count} tag mappings")
-        print(f"   - {characteristics_count} characteristics")
-        print(f"   - {examples_count} commercial examples")
-        print(f"   - {judging_count} judging criteria")
+        print(f"   - {len(categories.ids)} categories ({categories.added} added)")
+        print(f"   - {len(tags.ids)} tags ({tags.added} added)")
+        print(f"   - {len(breweries.ids)} breweries ({breweries.added} added)")
+        print(f"   - {loaded} beer styles written, {skipped} already loaded by an earlier run")
+        writer.report()
+        metrics.record_tables(writer.stats)
 
     except Exception as e:
-        cur.execute("ROLLBACK;")
+        # The failed phase was rolled back to its savepoint; keep the ones before it for the rerun
+        try:
+            conn.commit()
+        except psycopg2.Error:
+            conn.rollback()
         print(f"❌ Error populating database: {e}")
+        print("   Completed phases were committed; run the same load again to resume")
         raise
     finally:
         cur.close()
         conn.close()
 
+class ThreadOutput:
+    """sys.stdout stand-in that sends each registered thread's prints to its own buffer."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.buffers = {}
+
+    def register(self):
+        """Capture the calling thread's output and return the buffer."""
+        buffer = io.StringIO()
+        self.buffers[threading.get_ident()] = buffer
+        return buffer
+
+    def release(self):
+        self.buffers.pop(threading.get_ident(), None)
+
+    def write(self, text):
+        return self.buffers.get(threading.get_ident(), self.stream).write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+def parse_target(value):
+    """Turn 'name=dsn' or a bare DSN/URI into (name, dsn); bare DSNs are named dbname@host."""
+    try:
+        params = psycopg2.extensions.parse_dsn(value)
+        name = f"{params.get('dbname', params.get('user', '?'))}@{params.get('host', 'localhost')}"
+        return name, value
+    except psycopg2.ProgrammingError:
+        # Not a DSN by itself, so the text before the first '=' names the target
+        name, _, dsn = value.partition('=')
+        psycopg2.extensions.parse_dsn(dsn)
+        return name, dsn
+
+def read_targets_file(path):
+    """One target per line, as accepted by --target; blank lines and # comments are skipped."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+def prepare_catalog(json_file_path, batch_size=DEFAULT_BATCH_SIZE, entries=None):
+    """Parse and transform the whole catalog once, as chunks that every target load can share.
+
+    entries (e.g. from open_catalog()) replaces parsing the JSON file.
+    """
+    if entries is None:
+        entries = iter_entries(json_file_path, batch_size)
+    return list(chunked(entries, batch_size))
+
+def load_targets(json_file_path, targets, mode='full', batch_size=DEFAULT_BATCH_SIZE, loader='insert',
+                 pipeline_depth=DEFAULT_PIPELINE_DEPTH, max_parallel=None, entries=None, metrics=NO_METRICS,
+                 commit_every=None, bulk=False):
+    """Load the catalog into several databases concurrently, one connection per target.
+
+    targets: list of (name, dsn). The entries are prepared once and shared;
+    each target's progress is buffered and printed when it finishes. Returns
+    True when every target succeeded. metrics sums phases, statements and
+    rows over all targets and adds a 'target <name>' phase per target.
+    """
+    started = time.perf_counter()
+    print(f"Preparing catalog entries from {os.path.basename(json_file_path)}...")
+    with metrics.phase('prepare'):
+        chunks = prepare_catalog(json_file_path, batch_size, entries)
+    print(f"  Prepared {sum(len(chunk) for chunk in chunks)} styles in {time.perf_counter() - started:.2f}s\n")
+
+    if mode == 'sync':
+        load = lambda db_config: sync_database(json_file_path, db_config, batch_size, loader, chunks=chunks,
+                                               metrics=metrics)
+    elif mode == 'resume':
+        load = lambda db_config: checkpoint_populate_database(json_file_path, db_config, batch_size, loader,
+                                                              commit_every, chunks=chunks, metrics=metrics)
+    elif mode == 'shadow':
+        load = lambda db_config: shadow_populate_database(json_file_path, db_config, batch_size, loader,
+                                                          pipeline_depth, chunks=chunks, metrics=metrics)
+    else:
+        load = lambda db_config: populate_database(json_file_path, db_config, batch_size, loader,
+                                                   pipeline_depth, chunks=chunks, metrics=metrics, bulk=bulk)
+
+    output = ThreadOutput(sys.stdout)
+    def run(name, dsn):
+        buffer = output.register()
+        target_started = time.perf_counter()
+        try:
+            load({'dsn': dsn})
+            error = None
+        except Exception as e:
+            error = e
+        finally:
+            output.release()
+        return name, time.perf_counter() - target_started, error, buffer.getvalue()
+
+    results = []
+    sys.stdout = output
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_parallel or len(targets)) as pool:
+            futures = [pool.submit(run, name, dsn) for name, dsn in targets]
+            for future in concurrent.futures.as_completed(futures):
+                name, elapsed, error, log = future.result()
+                results.append((name, elapsed, error))
+                metrics.add_phase(f"target {name}", elapsed)
+                print(f"━━━ {name} ({elapsed:.2f}s) ━━━")
+                print(log, end='')
+                print()
+    finally:
+        sys.stdout = output.stream
+
+    print(f"📊 Loaded {len(targets)} targets in {time.perf_counter() - started:.2f}s:")
+    for name, elapsed, error in sorted(results, key=lambda result: result[0]):
+        if error is None:
+            print(f"   ✅ {name}: {elapsed:.2f}s")
+        else:
+            print(f"   ❌ {name}: failed after {elapsed:.2f}s: {str(error).strip()}")
+    return all(error is None for _, _, error in results)
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Populate BJCP tables from bjcp2.json")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"rows sent per INSERT statement or COPY buffer (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument('--loader', choices=sorted(LOADERS), default='insert',
+                        help="write rows with batched INSERTs or COPY through staging tables")
+    parser.add_argument('--pipeline-depth', type=int, default=DEFAULT_PIPELINE_DEPTH,
+                        help="write operations queued between the parser and the database writer thread; "
+                             f"0 writes inline (default: {DEFAULT_PIPELINE_DEPTH})")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--sync', action='store_true',
+                      help="only write styles, tags and categories that changed since the last sync")
+    mode.add_argument('--shadow', action='store_true',
+                      help="load into shadow tables and swap them in atomically, without blocking readers")
+    mode.add_argument('--resume', action='store_true',
+                      help="load in checkpointed phases recorded in BJCP_LoadProgress; "
+                           "rerunning after a failure resumes after the last completed phase")
+    parser.add_argument('--commit-every', type=int, metavar='N',
+                        help="with --resume, commit whenever N more styles have been written (default: once at the end)")
+    parser.add_argument('--bulk', action='store_true',
+                        help="full loads only: defer foreign keys to COMMIT, drop secondary indexes while loading "
+                             "and rebuild them afterwards, then ANALYZE (requires migration 051)")
+    parser.add_argument('--target', action='append', default=[], metavar='[NAME=]DSN',
+                        help="load into this database instead of the DB_* one; repeat to load several concurrently")
+    parser.add_argument('--targets-file',
+                        help="file with one --target value per line")
+    parser.add_argument('--max-parallel', type=int,
+                        help="targets loaded at the same time (default: all of them)")
+    parser.add_argument('--validate', action='store_true',
+                        help="only print the range validation report; exit 1 on inverted or out-of-range values")
+    parser.add_argument('--refresh-keyword-model', action='store_true',
+                        help="recount keyword document frequencies over bjcp2.json into bjcp_keyword_model.json "
+                             "and exit")
+    parser.add_argument('--learn-breweries', action='store_true',
+                        help="learn breweries shared by several commercial examples of bjcp2.json into "
+                             "bjcp_breweries.json and exit")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help="directory of cached transformed catalogs (default: scripts/python/.bjcp_cache)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="always parse and transform bjcp2.json, without reading or writing the cache")
+    parser.add_argument('--snapshot', nargs='?', const=DEFAULT_SNAPSHOT_PATH, metavar='PATH',
+                        help="after loading, export the read-only SQLite snapshot "
+                             "(default path: database/bjcp_catalog.sqlite)")
+    parser.add_argument('--metrics', metavar='PATH',
+                        help="write per-phase timings, statement and row counts and peak memory as JSON "
+                             "('-' for stdout, with progress on stderr)")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="record the tracemalloc peak per phase (slows the run down)")
+    parser.add_argument('--profile', metavar='PATH',
+                        help="capture a cProfile of the main thread to PATH, summarized in the metrics")
+    args = parser.parse_args()
+    progress_to_stderr(args.metrics)
+
     # Database configuration
     db_config = {
-        'host': 'localhost',
-        'database': 'fermentum',
-        'user': 'fermentum',
-        'password': 'dev_password_123',
-        'port': 5432
+        'host': os.environ.get('DB_HOST', 'localhost'),
+        'database': os.environ.get('DB_NAME', 'fermentum'),
+        'user': os.environ.get('DB_USER', 'fermentum'),
+        'password': os.environ.get('DB_PASSWORD', 'dev_password_123'),
+        'port': int(os.environ.get('DB_PORT', 5432))
     }
 
     # File paths
@@ -440,10 +1307,75 @@ if __name__ == "__main__":
         print(f"❌ Error: BJCP JSON file not found at {json_file}")
         sys.exit(1)
 
+    if args.refresh_keyword_model:
+        model = refresh_keyword_model(json_file)
+        print(f"🔤 Pinned document frequencies of {len(model.document_frequencies)} terms "
+              f"over {model.document_count} characteristic texts in {os.path.basename(DEFAULT_MODEL_PATH)}")
+        sys.exit(0)
+
+    if args.learn_breweries:
+        learned = learn_catalog_breweries(json_file)
+        print(f"🍺 Learned {len(learned)} new breweries into {os.path.basename(DEFAULT_BREWERIES_PATH)}")
+        for brewery in learned:
+            print(f"   - {brewery.name}")
+        sys.exit(0)
+
+    targets = args.target + (read_targets_file(args.targets_file) if args.targets_file else [])
+    if targets and args.snapshot:
+        parser.error("--snapshot exports from the DB_* database and cannot be combined with --target")
+    if args.commit_every and not args.resume:
+        parser.error("--commit-every requires --resume")
+    if args.bulk and (args.sync or args.shadow or args.resume):
+        parser.error("--bulk only applies to full loads (--shadow already builds indexes after loading)")
+    mode = 'sync' if args.sync else 'shadow' if args.shadow else 'resume' if args.resume else 'full'
+
+    metrics = NO_METRICS
+    if args.metrics or args.trace_memory or args.profile:
+        metrics = RunMetrics('populate_bjcp_data', args.trace_memory, args.profile, mode=mode,
+                             loader=args.loader, batch_size=args.batch_size,
+                             pipeline_depth=args.pipeline_depth, commit_every=args.commit_every, bulk=args.bulk,
+                             targets=len(targets))
+
+    def finish(**results):
+        if metrics is not NO_METRICS:
+            metrics.finish(args.metrics, **results)
+
+    # Validate ranges before any SQL is written
+    with metrics.phase('validate'):
+        report, entries = open_catalog(json_file, args.batch_size, None if args.no_cache else args.cache_dir)
+    report.print_summary()
+    if args.validate:
+        finish(succeeded=not report.has_errors(), styles=report.style_count)
+        sys.exit(1 if report.has_errors() else 0)
+    print()
+
+    if targets:
+        succeeded = load_targets(json_file, [parse_target(target) for target in targets], mode,
+                                 args.batch_size, args.loader, args.pipeline_depth, args.max_parallel, entries,
+                                 metrics, args.commit_every, args.bulk)
+        finish(succeeded=succeeded)
+        sys.exit(0 if succeeded else 1)
+
     # Populate database
+    chunks = chunked(entries, args.batch_size)
     try:
-        populate_database(json_file, db_config)
+        if args.sync:
+            sync_database(json_file, db_config, args.batch_size, args.loader, chunks=chunks, metrics=metrics)
+        elif args.shadow:
+            shadow_populate_database(json_file, db_config, args.batch_size, args.loader, args.pipeline_depth,
+                                     chunks=chunks, metrics=metrics)
+        elif args.resume:
+            checkpoint_populate_database(json_file, db_config, args.batch_size, args.loader, args.commit_every,
+                                         chunks=chunks, metrics=metrics)
+        else:
+            populate_database(json_file, db_config, args.batch_size, args.loader, args.pipeline_depth,
+                              chunks=chunks, metrics=metrics, bulk=args.bulk)
+        if args.snapshot:
+            with metrics.phase('snapshot'):
+                export_snapshot(db_config, args.snapshot)
         print("🎉 BJCP data population completed successfully!")
+        finish(succeeded=True)
     except Exception as e:
         print(f"💥 Error during population: {e}")
+        finish(succeeded=False, error=str(e).strip())
         sys.exit(1)
\ No newline at end of file
@@ -0,0 +1,55 @@
+"""Shared fixtures for the BJCP script tests; the scripts import each other as top-level modules."""
+
+import json
+import os
+import sys
+
+import pytest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+CATALOG_PATH = os.path.join(SCRIPTS_DIR, "..", "..", "database", "bjcp2.json")
+
+@pytest.fixture(scope='session')
+def catalog_path():
+    """The real BJCP 2021 style guide."""
+    return CATALOG_PATH
+
+@pytest.fixture
+def catalog_styles():
+    """A fresh copy of the styles of the real guide, for tests that edit them."""
+    with open(CATALOG_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)['beerjson']['styles']
+
+@pytest.fixture
+def write_catalog(tmp_path):
+    """Write a list of BeerJSON styles as a style guide file and return its path."""
+    def write(styles, name='catalog.json'):
+        path = tmp_path / name
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'beerjson': {'version': 2.01, 'styles': styles}}, f, ensure_ascii=False)
+        return str(path)
+    return write
+
+@pytest.fixture
+def database():
+    """db_config of an empty scratch schema in the BJCP_TEST_DSN database, dropped afterwards.
+
+    Tests that need Postgres are skipped when BJCP_TEST_DSN is not set.
+    """
+    dsn = os.environ.get('BJCP_TEST_DSN')
+    if not dsn:
+        pytest.skip("set BJCP_TEST_DSN to run tests against Postgres")
+    import psycopg2
+    schema = f"bjcp_test_{os.getpid()}"
+    conn = psycopg2.connect(dsn)
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute(f'DROP SCHEMA IF EXISTS {schema} CASCADE; CREATE SCHEMA {schema}')
+    try:
+        yield {'dsn': dsn, 'options': f'-c search_path={schema}'}
+    finally:
+        with conn.cursor() as cur:
+            cur.execute(f'DROP SCHEMA {schema} CASCADE')
+        conn.close()
@@ -0,0 +1,64 @@
+import datetime
+import uuid
+
+import psycopg2
+import pytest
+
+from aggregate_bjcp_analytics import aggregate
+
+SCHEMA = '''
+    CREATE TABLE "Recipe" ("RecipeId" uuid PRIMARY KEY, "StyleId" uuid, "TenantId" uuid,
+                           "Created" timestamp, "Updated" timestamp DEFAULT CURRENT_TIMESTAMP);
+    CREATE TABLE "RecipeBrewSession" ("RecipeId" uuid, "TenantId" uuid, "BrewDate" date,
+                                      "Updated" timestamp DEFAULT CURRENT_TIMESTAMP);
+    CREATE TABLE "BJCP_StylePopularity" (
+        "PopularityId" uuid PRIMARY KEY DEFAULT gen_random_uuid(), "StyleId" uuid NOT NULL,
+        "Period" varchar(20) NOT NULL, "PeriodDate" date NOT NULL, "RecipeCount" int DEFAULT 0,
+        "BrewSessionCount" int DEFAULT 0, "TenantCount" int DEFAULT 0, "TrendDirection" varchar(20),
+        "TrendPercentage" decimal(5,2), "Rank" int, UNIQUE ("StyleId", "Period", "PeriodDate"));
+    CREATE TABLE "BJCP_AggregationWatermark" ("Period" varchar(20) PRIMARY KEY, "Watermark" timestamp NOT NULL,
+                                              "StylesAggregated" int DEFAULT 0,
+                                              "Updated" timestamptz DEFAULT CURRENT_TIMESTAMP);
+'''
+
+STYLE = uuid.uuid4()
+TENANT = uuid.uuid4()
+
+@pytest.fixture
+def conn(database):
+    conn = psycopg2.connect(**database)
+    with conn.cursor() as cur:
+        cur.execute(SCHEMA)
+    conn.commit()
+    yield conn
+    conn.close()
+
+def add_recipe(conn, created, updated):
+    with conn.cursor() as cur:
+        cur.execute('INSERT INTO "Recipe" VALUES (%s, %s, %s, %s, %s)',
+                    (str(uuid.uuid4()), str(STYLE), str(TENANT), created, updated))
+    conn.commit()
+
+def monthly_counts(conn):
+    with conn.cursor() as cur:
+        cur.execute('SELECT "PeriodDate", "RecipeCount" FROM "BJCP_StylePopularity" '
+                    'WHERE "Period" = %s ORDER BY "PeriodDate"', ('monthly',))
+        return [(period.month, count) for period, count in cur.fetchall()]
+
+WATERMARK = datetime.datetime(2026, 3, 10, 12, 0)
+
+def run_with_late_commit(database, conn, overlap):
+    add_recipe(conn, datetime.datetime(2026, 3, 5), WATERMARK)
+    aggregate(database, ['monthly'], overlap=overlap)
+    # Its transaction started before the first run but committed after it
+    add_recipe(conn, datetime.datetime(2026, 2, 5), WATERMARK - datetime.timedelta(minutes=2))
+    aggregate(database, ['monthly'], overlap=overlap)
+    return monthly_counts(conn)
+
+def test_late_commit_with_an_older_updated_is_aggregated(database, conn):
+    assert run_with_late_commit(database, conn, datetime.timedelta(minutes=15)) == [(2, 1), (3, 1)]
+
+def test_late_commit_before_the_overlap_waits_for_a_full_run(database, conn):
+    assert run_with_late_commit(database, conn, datetime.timedelta(minutes=1)) == [(3, 1)]
+    aggregate(database, ['monthly'], full=True)
+    assert monthly_counts(conn) == [(2, 1), (3, 1)]
@@ -0,0 +1,32 @@
+import json
+import os
+
+from benchmark_bjcp_pipeline import BASELINE_FORMAT, DEFAULT_SIZES, STAGES, compare_with_baseline
+from conftest import SCRIPTS_DIR
+
+ROWS = {'BeerStyle': 1000}
+
+def result(seconds, rows=ROWS):
+    return {'stages': {stage: seconds for stage in STAGES}, 'rows': dict(rows), 'calibration': 0.4}
+
+BASELINE = {'calibration': 0.4, 'sizes': {'1000': result(1.0)}}
+
+def test_within_tolerance_passes():
+    assert compare_with_baseline({'1000': result(1.2)}, 0.4, BASELINE, 0.25) == 0
+
+def test_slower_stage_is_a_regression():
+    assert compare_with_baseline({'1000': result(1.3)}, 0.4, BASELINE, 0.25) == len(STAGES)
+
+def test_slower_machine_is_not_a_regression():
+    # The calibration took twice as long, so twice the time is expected
+    assert compare_with_baseline({'1000': result(2.0)}, 0.8, BASELINE, 0.25) == 0
+
+def test_row_count_mismatch_and_missing_sizes():
+    assert compare_with_baseline({'1000': result(1.0, {'BeerStyle': 999})}, 0.4, BASELINE, 0.25) == 1
+    assert compare_with_baseline({'5000': result(1.0)}, 0.4, BASELINE, 0.25) == 1
+
+def test_committed_baseline_covers_the_default_run():
+    with open(os.path.join(SCRIPTS_DIR, 'bjcp_benchmark_baseline.json'), 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    assert (baseline['format'], baseline['seed'], baseline['backend']) == (BASELINE_FORMAT, 0, 'sqlite')
+    assert sorted(baseline['sizes'], key=int) == [str(size) for size in DEFAULT_SIZES]
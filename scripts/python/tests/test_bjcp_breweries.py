@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from bjcp_breweries import BreweryGazetteer, brewery_key, learn_breweries
+
+@pytest.fixture
+def gazetteer():
+    return BreweryGazetteer(["Sierra Nevada", "Sierra", "Samuel Smith", "Spezial"],
+                            aliases={"Sam Smith": "Samuel Smith"}, lead_words=["New", "The"])
+
+def test_longest_known_prefix_wins(gazetteer):
+    beer, brewery = gazetteer.split("Sierra Nevada Pale Ale")
+    assert (beer, brewery.name) == ("Pale Ale", "Sierra Nevada")
+    beer, brewery = gazetteer.split("Sierra Madre Lager")
+    assert (beer, brewery.name) == ("Madre Lager", "Sierra")
+
+def test_case_possessives_and_aliases(gazetteer):
+    assert brewery_key("Samuel Smith’s") == brewery_key("SAMUEL SMITH") == 'samuel smith'
+    beer, brewery = gazetteer.split("Samuel Smith’s Oatmeal Stout")
+    assert (beer, brewery.name) == ("Oatmeal Stout", "Samuel Smith")
+    assert gazetteer.split("Sam Smith Taddy Porter")[1] is brewery
+
+def test_unknown_or_bare_brewery(gazetteer):
+    assert gazetteer.split("Hoppy Lager") == ("Hoppy Lager", None)
+    beer, brewery = gazetteer.split("Spezial")
+    assert (beer, brewery.name) == ("Spezial", "Spezial")
+
+def test_learns_shared_leading_words(gazetteer):
+    gazetteer.observe(["Grain Belt Premium", "Grain Belt NordEast", "Grain Belt Premium", "Lonely Pilsner"])
+    assert [brewery.name for brewery in gazetteer.learn()] == ["Grain Belt"]
+    assert gazetteer.split("Grain Belt Premium")[0] == "Premium"
+
+def test_lead_words_are_never_a_brewery_on_their_own(gazetteer):
+    gazetteer.observe(["New Glarus Spotted Cow", "New Glarus Moon Man", "New Belgium Fat Tire",
+                       "New Belgium La Folie"])
+    assert sorted(brewery.name for brewery in gazetteer.learn()) == ["New Belgium", "New Glarus"]
+
+def test_learning_stops_at_a_known_brewery(gazetteer):
+    gazetteer.observe(["Spezial Rauchbier Lager", "Spezial Rauchbier Märzen"])
+    assert gazetteer.learn() == []
+    assert gazetteer.split("Spezial Rauchbier Lager")[0] == "Rauchbier Lager"
+
+@pytest.fixture
+def gazetteer_file(tmp_path):
+    path = tmp_path / 'breweries.json'
+    path.write_text(json.dumps({'breweries': ["Spezial"], 'lead_words': ["New"]}), encoding='utf-8')
+    return str(path)
+
+def test_learned_breweries_are_persisted(gazetteer_file):
+    learned = learn_breweries(["Grain Belt Premium", "Grain Belt NordEast", "New Glarus Spotted Cow",
+                               "New Glarus Moon Man"], gazetteer_file)
+    assert sorted(brewery.name for brewery in learned) == ["Grain Belt", "New Glarus"]
+    with open(gazetteer_file, 'r', encoding='utf-8') as f:
+        assert json.load(f)['learned'] == ["Grain Belt", "New Glarus"]
+    assert learn_breweries(["Grain Belt Premium", "Grain Belt NordEast"], gazetteer_file) == []
+    assert BreweryGazetteer.from_file(gazetteer_file).split("Grain Belt Premium")[1].name == "Grain Belt"
+
+def test_splits_do_not_depend_on_other_examples(gazetteer_file):
+    learn_breweries(["Grain Belt Premium", "Grain Belt NordEast"], gazetteer_file)
+    # Only one Grain Belt example is left, which alone would not be learned
+    assert learn_breweries(["Grain Belt Premium"], gazetteer_file) == []
+    beer, brewery = BreweryGazetteer.from_file(gazetteer_file).split("Grain Belt Premium")
+    assert (beer, brewery.name) == ("Premium", "Grain Belt")
+
+def test_shipped_gazetteer_knows_the_learned_breweries():
+    gazetteer = BreweryGazetteer.from_file()
+    beer, brewery = gazetteer.split("Coors Banquet")
+    assert (beer, brewery.name) == ("Banquet", "Coors")
@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+from bjcp_breweries import DEFAULT_BREWERIES_PATH
+from bjcp_cache import CatalogCache
+from bjcp_checkpoint import load_key
+from bjcp_keywords import DEFAULT_MODEL_PATH
+from populate_bjcp_data import TRANSFORM_INPUTS
+
+ENTRIES = [{'number': str(i), 'value': i * i} for i in range(1203)]
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'catalog.json'
+    path.write_text('{"beerjson": {"styles": []}}', encoding='utf-8')
+    return str(path)
+
+def fill(cache, entries=ENTRIES, report='report'):
+    assert list(cache.write(report, iter(entries))) == entries
+
+def test_round_trip(tmp_path, source):
+    cache_dir = str(tmp_path / 'cache')
+    assert CatalogCache(source, 1, cache_dir).read() is None
+    fill(CatalogCache(source, 1, cache_dir))
+    report, entries = CatalogCache(source, 1, cache_dir).read()
+    assert report == 'report' and list(entries) == ENTRIES
+
+def test_changed_source_misses(tmp_path, source):
+    cache_dir = str(tmp_path / 'cache')
+    fill(CatalogCache(source, 1, cache_dir))
+    with open(source, 'a', encoding='utf-8') as f:
+        f.write('\n')
+    assert CatalogCache(source, 1, cache_dir).read() is None
+
+def test_other_transform_version_misses(tmp_path, source):
+    cache_dir = str(tmp_path / 'cache')
+    fill(CatalogCache(source, 1, cache_dir))
+    assert CatalogCache(source, 2, cache_dir).read() is None
+
+def test_interrupted_write_leaves_no_cache(tmp_path, source):
+    cache = CatalogCache(source, 1, str(tmp_path / 'cache'))
+    consumed = cache.write('report', iter(ENTRIES))
+    for _ in range(600):
+        next(consumed)
+    consumed.close()
+    assert cache.read() is None
+    assert os.listdir(cache.cache_dir) == []
+
+def test_prune_keeps_the_most_recently_used(tmp_path, source):
+    cache_dir = str(tmp_path / 'cache')
+    for version in range(4):
+        cache = CatalogCache(source, version, cache_dir)
+        fill(cache, ENTRIES[:3])
+        os.utime(cache.path, (version * 100, version * 100))
+    CatalogCache(source, 0, cache_dir).prune(keep=2)
+    kept = sorted(os.listdir(cache_dir))
+    assert kept == sorted(os.path.basename(CatalogCache(source, version, cache_dir).path) for version in (2, 3))
+
+def test_edited_data_file_misses(tmp_path, source):
+    cache_dir = str(tmp_path / 'cache')
+    gazetteer = tmp_path / 'breweries.json'
+    gazetteer.write_text('{"breweries": ["Sierra Nevada"]}', encoding='utf-8')
+    fill(CatalogCache(source, 1, cache_dir, [str(gazetteer)]))
+    assert CatalogCache(source, 1, cache_dir, [str(gazetteer)]).read() is not None
+    key = load_key(source, 1, 500, [str(gazetteer)])
+
+    gazetteer.write_text('{"breweries": ["Sierra Nevada", "Bell\'s"]}', encoding='utf-8')
+    assert CatalogCache(source, 1, cache_dir, [str(gazetteer)]).read() is None
+    assert load_key(source, 1, 500, [str(gazetteer)]) != key
+
+def test_shipped_data_files_are_part_of_the_key(catalog_path):
+    assert DEFAULT_BREWERIES_PATH in TRANSFORM_INPUTS and DEFAULT_MODEL_PATH in TRANSFORM_INPUTS
+    assert (CatalogCache(catalog_path, 1, inputs=TRANSFORM_INPUTS).key
+            != CatalogCache(catalog_path, 1, inputs=TRANSFORM_INPUTS[:1]).key)
@@ -0,0 +1,92 @@
+import re
+
+import pytest
+
+from bjcp_comparisons import DEFAULT_RELATIONSHIP, Automaton, ComparisonResolver, is_word, resolve_comparisons
+from populate_bjcp_data import comparison_source, iter_entries
+
+STYLES = [
+    ("ipa", "21A", "IPA"),
+    ("american-ipa", "21B", "American IPA"),
+    ("pale", "18B", "American Pale Ale"),
+    ("stout", "1A", "Stout"),
+    ("lager", "2A", "International Pale Lager"),
+]
+
+# Pairs the old substring resolver found that are not references: "strong bitterness" in 16D is not
+# Strong Bitter, and "Fruit Lambic" in 29D names Fruit Lambic rather than Lambic
+SUBSTRING_FALSE_POSITIVES = {("16D", "11C"), ("29D", "23D")}
+
+@pytest.fixture(scope='module')
+def guide_sources(catalog_path):
+    return [comparison_source(entry, entry['number']) for entry in iter_entries(catalog_path)]
+
+@pytest.fixture(scope='module')
+def guide_rows(guide_sources):
+    return resolve_comparisons(guide_sources)
+
+def substring_pairs(sources):
+    """The old resolver: any style name in the text, or its number as a word."""
+    pairs = set()
+    for style_id, _, _, text in sources:
+        text = (text or '').lower()
+        for other_id, number, name, _ in sources:
+            if other_id != style_id and (name.lower() in text
+                                         or re.search(r'\b' + re.escape(number.lower()) + r'\b', text)):
+                pairs.add((style_id, other_id))
+    return pairs
+
+def resolve(text, style_id="pale"):
+    return ComparisonResolver(STYLES).resolve(style_id, text)
+
+def test_every_guide_comparison_resolves(guide_sources, guide_rows):
+    assert len(guide_rows) == 210
+    assert len({row[:2] for row in guide_rows}) == len(guide_rows)
+    numbers = {number for _, number, _, _ in guide_sources}
+    assert all(primary in numbers and compared in numbers and primary != compared
+               for primary, compared, _, _, _ in guide_rows)
+
+def test_guide_matches_the_substring_resolver_where_it_was_right(guide_sources, guide_rows):
+    resolved = {row[:2] for row in guide_rows}
+    naive = substring_pairs(guide_sources)
+    assert resolved == naive - SUBSTRING_FALSE_POSITIVES
+
+def test_guide_rows_quote_their_sentence(guide_sources, guide_rows):
+    texts = {style_id: text for style_id, _, _, text in guide_sources}
+    assert all(sentence and sentence in texts[primary] for primary, _, sentence, _, _ in guide_rows)
+
+def test_longest_overlapping_name_wins():
+    assert [row[0] for row in resolve("Hoppier than an American IPA.")] == ["american-ipa"]
+    assert [row[0] for row in resolve("Like an IPA, not an American IPA.")] == ["ipa", "american-ipa"]
+
+def test_automaton_reports_overlapping_patterns():
+    automaton = Automaton()
+    for pattern in ("ipa", "american ipa", "can"):
+        automaton.add(pattern, pattern)
+    automaton.build()
+    assert list(automaton.iter_matches("an american ipa")) == [(8, 11, "can"), (3, 15, "american ipa"),
+                                                                 (12, 15, "ipa")]
+
+def test_mentions_must_be_whole_words():
+    assert resolve("Compare with 21A or 121A, or a Stoutish beer.") == [
+        ("ipa", "Compare with 21A or 121A, or a Stoutish beer.") + DEFAULT_RELATIONSHIP
+    ]
+    assert [row[0] for row in resolve("Drier than most Stouts.")] == ["stout"]
+
+def test_capital_after_lowercase_starts_a_word():
+    assert is_word("aDunkles Bock", 1, 13)
+    assert not is_word("adunkles bock", 1, 13)
+    assert [row[0] for row in resolve("Less malty thanaStout.")] == ["stout"]
+
+def test_cueless_mentions_are_similar():
+    assert resolve("See also Stout.") == [("stout", "See also Stout.") + DEFAULT_RELATIONSHIP]
+
+def test_relationship_cues():
+    rows = resolve("Stronger than Stout and International Pale Lager. Less hop character than an IPA. "
+                   "Unlike 21B.")
+    assert [(row[0], row[2]) for row in rows] == [("stout", "stronger"), ("lager", "stronger"),
+                                                  ("ipa", "less hoppy"), ("american-ipa", "different")]
+    assert rows[0][1] == "Stronger than Stout and International Pale Lager."
+
+def test_self_references_and_repeats_are_skipped():
+    assert [row[0] for row in resolve("Paler than 18B and Stout. Darker than Stout.")] == ["stout"]
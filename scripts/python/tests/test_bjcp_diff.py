@@ -0,0 +1,120 @@
+from collections import Counter
+
+import pytest
+
+from bjcp_diff import CatalogState, write_delta
+from generate_bjcp_migration import generate_delta_sql
+from populate_bjcp_data import chunked, iter_entries
+
+class RecordingWriter:
+    """Keeps every write write_delta makes, as (verb, table, columns, rows)."""
+
+    def __init__(self):
+        self.writes = []
+
+    def insert(self, table, columns, rows):
+        return self._record('insert', table, columns, rows)
+
+    def update(self, table, key_column, columns, rows, touch_column=None):
+        return self._record('update', table, columns, rows)
+
+    def delete(self, table, key_column, keys, **options):
+        return self._record('delete', table, key_column, keys)
+
+    def _record(self, verb, table, columns, rows):
+        rows = list(rows)
+        if rows:
+            self.writes.append((verb, table, columns, rows))
+        return len(rows)
+
+    def counts(self):
+        counts = Counter()
+        for verb, table, _, rows in self.writes:
+            counts[verb, table] += len(rows)
+        return counts
+
+@pytest.fixture(scope='module')
+def old_state(catalog_path):
+    return CatalogState(chunked(iter_entries(catalog_path), 50))
+
+def delta(old_state, styles, write_catalog):
+    writer = RecordingWriter()
+    summary = write_delta(writer, old_state, chunked(iter_entries(write_catalog(styles)), 50))
+    return writer, summary
+
+def find(styles, number):
+    return next(style for style in styles if style['style_id'] == number)
+
+def test_identical_guides_write_nothing(old_state, catalog_styles, write_catalog):
+    writer, summary = delta(old_state, catalog_styles, write_catalog)
+    assert writer.writes == []
+    assert not summary.changed and summary.unchanged == len(catalog_styles)
+
+def test_one_field_edit_updates_one_row(old_state, catalog_styles, write_catalog):
+    find(catalog_styles, '10A')['history'] += " Revised for this test."
+    writer, summary = delta(old_state, catalog_styles, write_catalog)
+    assert writer.counts() == {('update', 'BeerStyle'): 1}
+    (_, _, columns, rows), = writer.writes
+    assert columns == ['History'] and rows[0][1].endswith("Revised for this test.")
+    assert (summary.updated, summary.columns, summary.unchanged) == (1, 1, len(catalog_styles) - 1)
+
+def test_characteristic_edit_touches_only_its_style(old_state, catalog_styles, write_catalog):
+    style = find(catalog_styles, '21A')
+    style['aroma'] = style['aroma'].replace('.', '. Notes of fresh-cut grass and gooseberry.', 1)
+    writer, summary = delta(old_state, catalog_styles, write_catalog)
+    assert writer.counts() == {('update', 'BeerStyle'): 1, ('update', 'BJCP_StyleCharacteristics'): 1}
+    characteristic = next(rows for verb, table, _, rows in writer.writes if table == 'BJCP_StyleCharacteristics')
+    assert characteristic[0][2] == 'aroma' and 'gooseberry' in characteristic[0][3]
+    assert summary.updated == 1
+
+def test_new_tag_is_appended_without_renumbering(old_state, catalog_styles, write_catalog):
+    style = find(catalog_styles, '1A')
+    style['tags'] += ', aardvark-aged'
+    writer, summary = delta(old_state, catalog_styles, write_catalog)
+    assert writer.counts() == {('insert', 'BJCP_StyleTag'): 1, ('update', 'BJCP_StyleTag'): 1,
+                               ('insert', 'BJCP_StyleTagMapping'): 1}
+    sort_order, = next(rows for verb, table, _, rows in writer.writes if verb == 'update')
+    # Sorted first by name, but appended after every existing tag
+    assert sort_order[1] == len(old_state.tags) + 1
+    assert summary.tags.added == 1
+
+def test_stale_category_delete_spares_referenced_rows(catalog_path, catalog_styles, write_catalog, tmp_path):
+    output = str(tmp_path / 'delta.sql')
+    remaining = [style for style in catalog_styles if style['category_id'] != '1']
+    summary = generate_delta_sql(catalog_path, write_catalog(remaining), output)
+    assert summary.removed_categories == 1
+    with open(output, 'r', encoding='utf-8') as f:
+        sql = f.read()
+    delete = sql[sql.index('DELETE FROM "BJCP_BeerCategory"'):]
+    assert delete.index('NOT EXISTS (SELECT 1 FROM "BeerStyle" r WHERE r."CategoryId" = '
+                        '"BJCP_BeerCategory"."CategoryId")') < delete.index(';')
+
+def test_removed_style_leaves_other_splits_alone(old_state, catalog_styles, write_catalog):
+    # 1B holds examples of breweries that only 1A and 1B share, which used to be un-learned
+    remaining = [style for style in catalog_styles if style['style_id'] != '1B']
+    writer, summary = delta(old_state, remaining, write_catalog)
+    assert writer.counts()[('delete', 'BeerStyle')] == 1
+    assert not any(verb == 'update' for verb, _, _, _ in writer.writes)
+    assert (summary.updated, summary.removed) == (0, 1)
+
+def test_mixed_edits_touch_only_their_styles(old_state, catalog_styles, write_catalog):
+    remaining = [style for style in catalog_styles if style['style_id'] != '2C']
+    find(remaining, '5B')['name'] = "Kölsch Bier"
+    find(remaining, '21A')['examples'] += ", Mystery Brewing Test IPA"
+    writer, summary = delta(old_state, remaining, write_catalog)
+    assert not any(table == 'BJCP_Brewery' for verb, table, _, _ in writer.writes if verb == 'update')
+    assert summary.updated == 2 and summary.removed == 1
+    assert summary.unchanged == len(catalog_styles) - 3
+
+def test_removed_style_delete_spares_styles_recipes_use(catalog_path, catalog_styles, write_catalog, tmp_path):
+    output = str(tmp_path / 'delta.sql')
+    remaining = [style for style in catalog_styles if style['style_id'] != '1B']
+    summary = generate_delta_sql(catalog_path, write_catalog(remaining), output)
+    assert summary.removed == 1
+    with open(output, 'r', encoding='utf-8') as f:
+        sql = f.read()
+    delete = sql[sql.index('DELETE FROM "BeerStyle"'):]
+    delete = delete[:delete.index(';')]
+    for table in ("Recipe", "BJCP_RecipeCompetitionEntry"):
+        assert f'NOT EXISTS (SELECT 1 FROM "{table}" r WHERE r."StyleId" = "BeerStyle"."StyleId")' in delete
+    assert "RAISE NOTICE 'Kept styles" in sql[sql.index('DELETE FROM "BeerStyle"'):sql.index('COMMIT;')]
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from bjcp_index import RangeIndex, StyleIndex, sample_queries
+from populate_bjcp_data import iter_entries
+
+@pytest.fixture(scope='module')
+def index(catalog_path):
+    return StyleIndex(iter_entries(catalog_path))
+
+def test_range_index_candidates_cover_every_match():
+    bounds = np.array([[1, 3], [2, 5], [4, 6], [np.nan, 2], [0, np.nan], [5, 9]], dtype=float)
+    ranges = RangeIndex(bounds)
+    for value in (0, 1, 2, 2.5, 4, 5, 7, 10):
+        expected = [i for i, (low, high) in enumerate(bounds) if low <= value <= high]
+        candidates = ranges.candidates(value)
+        assert set(expected) <= set(candidates.tolist())
+        assert sorted(ranges.filter(candidates, value).tolist()) == expected
+
+def test_queries_match_the_linear_scan(index):
+    for query in sample_queries(index, 500, seed=3):
+        assert index.query(**query) == index.scan(**query)
+
+def test_constraints(index):
+    style = index.get('21A')
+    assert style.name == 'American IPA'
+    assert style in index.query(abv=6.5, ibu=60, category=style.category_number)
+    assert all('21A' != found.number for found in index.query(abv=12.0))
+    assert index.query(tags=('no-such-tag',)) == []
+    assert index.get('99Z') is None
+
+def test_brewery_is_matched_by_normalized_name(index):
+    found = index.query(brewery="SIERRA NEVADA")
+    assert found and found == index.query(brewery="Sierra Nevada")
+    assert all('sierra nevada' in style.breweries for style in found)
+
+def test_unknown_statistic_is_rejected(index):
+    with pytest.raises(ValueError):
+        index.query(ph=4.2)
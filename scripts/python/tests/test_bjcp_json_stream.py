@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from bjcp_json_stream import CHUNK_SIZE, iter_json_array, iter_styles
+
+TRICKY_DOCUMENT = r'''
+{
+  "version": [1, {"nested": "] } [ {"}, "\"quoted\" \\ backslash"],
+  "beerjson": {
+    "skipped": {"styles": [1, 2, 3], "text": "{[\"]}"},
+    "styles" : [
+      {"name": "Bière de Garde", "escapes": "tab\tnew\nline é 🍺", "tags": "a, b"},
+      1.055e0, -12, 0, 3.5E-2,
+      true, false, null,
+      "plain string with , and ] inside",
+      [[], {}, [1, [2, [3]]]],
+      {"deep": {"deeper": {"deepest": ["x", {"y": "}"}]}}}
+    ]
+  }
+}
+'''
+
+def write(tmp_path, text, name='doc.json'):
+    path = tmp_path / name
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+def test_real_guide_matches_json_load(catalog_path):
+    with open(catalog_path, 'r', encoding='utf-8') as f:
+        expected = json.load(f)['beerjson']['styles']
+    for chunk_size in (4096, CHUNK_SIZE):
+        assert list(iter_styles(catalog_path, chunk_size)) == expected
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 16, 64, CHUNK_SIZE])
+def test_tricky_values_match_json_load_at_every_chunk_size(tmp_path, chunk_size):
+    path = write(tmp_path, TRICKY_DOCUMENT)
+    expected = json.loads(TRICKY_DOCUMENT)['beerjson']['styles']
+    assert list(iter_json_array(path, chunk_size=chunk_size)) == expected
+
+@pytest.mark.parametrize('chunk_size', [1, 3, CHUNK_SIZE])
+def test_root_array_and_trailing_literal(tmp_path, chunk_size):
+    text = '[1, "two", {"three": [3]}, 4.5, null]'
+    path = write(tmp_path, text)
+    assert list(iter_json_array(path, keys=(), chunk_size=chunk_size)) == json.loads(text)
+
+def test_empty_array(tmp_path):
+    path = write(tmp_path, '{"beerjson": {"styles": [ ]}}')
+    assert list(iter_styles(path)) == []
+
+def test_missing_key_raises(tmp_path):
+    path = write(tmp_path, '{"beerjson": {"version": 2.01}}')
+    with pytest.raises(KeyError):
+        list(iter_styles(path))
+
+def test_truncated_document_raises(tmp_path):
+    path = write(tmp_path, '{"beerjson": {"styles": [{"name": "a"}, {"name": ')
+    with pytest.raises(ValueError):
+        list(iter_styles(path, chunk_size=8))
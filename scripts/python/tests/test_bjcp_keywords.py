@@ -0,0 +1,37 @@
+from bjcp_keywords import KeywordModel, tokenize
+from populate_bjcp_data import iter_entries
+
+def test_tokenize_drops_stopwords_short_words_and_numbers():
+    assert tokenize("A moderate, Bready malt with 25 IBUs and low-to-moderate esters") == [
+        'moderate', 'bready', 'malt', 'ibus', 'low-to-moderate', 'esters']
+
+def test_distinctive_terms_rank_first():
+    model = KeywordModel.from_texts(["malt malt bread", "malt hops", "malt smoke"])
+    assert model.top_terms(["malt smoke smoke"], count=2) == [['smoke', 'malt']]
+    # Terms the model never saw score as the rarest
+    assert model.top_terms(["malt lactose"], count=1) == [['lactose']]
+
+def test_ties_keep_text_order():
+    model = KeywordModel.from_texts(["alpha beta gamma"])
+    assert model.top_terms(["gamma beta alpha", "beta"]) == [['gamma', 'beta', 'alpha'], ['beta']]
+
+def test_saved_model_scores_the_same(tmp_path):
+    model = KeywordModel.from_texts(["roasty coffee chocolate", "coffee notes", "grainy bready"])
+    path = str(tmp_path / 'model.json')
+    model.save(path)
+    loaded = KeywordModel.from_file(path)
+    assert loaded.document_count == 3 and loaded.idf == model.idf
+    texts = ["coffee roasty finish", "bready grainy coffee"]
+    assert loaded.top_terms(texts) == model.top_terms(texts)
+
+def test_keywords_do_not_depend_on_other_styles(catalog_styles, write_catalog):
+    before = {entry['number']: entry['characteristics'] for entry in iter_entries(write_catalog(catalog_styles))}
+
+    edited = [dict(style) for style in catalog_styles if style['style_id'] != '1B']
+    edited[0]['aroma'] = "Intense smoky peat and iodine, unlike any other lager."
+    edited.append(dict(catalog_styles[5], style_id='99Z', name='Extra Style',
+                       flavor="Pineapple, mango and resinous pine dominate."))
+    after = {entry['number']: entry['characteristics'] for entry in iter_entries(write_catalog(edited, 'new.json'))}
+
+    changed = {number for number in after if number in before and after[number] != before[number]}
+    assert changed == {edited[0]['style_id']}
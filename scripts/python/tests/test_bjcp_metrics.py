@@ -0,0 +1,25 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import SCRIPTS_DIR
+
+def run(script, *args):
+    return subprocess.run([sys.executable, os.path.join(SCRIPTS_DIR, script), *args],
+                          capture_output=True, text=True, check=True)
+
+@pytest.mark.parametrize('script, args', [
+    ('populate_bjcp_data.py', ['--validate', '--no-cache']),
+    ('generate_bjcp_migration.py', ['--no-cache', '--output'])
+])
+def test_metrics_on_stdout_is_the_only_output(tmp_path, script, args):
+    if args[-1] == '--output':
+        args = args + [str(tmp_path / 'seed.sql')]
+    result = run(script, *args, '--metrics', '-')
+    document = json.loads(result.stdout)
+    assert document['script'] == os.path.splitext(script)[0] and document['succeeded']
+    # Progress still reaches the user, on stderr
+    assert 'styles' in result.stderr
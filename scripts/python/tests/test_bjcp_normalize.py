@@ -0,0 +1,50 @@
+from decimal import Decimal
+
+from bjcp_normalize import ValidationReport, iter_normalized, normalize_ranges
+from bjcp_records import StyleRecord, iter_records
+
+def bound(minimum, maximum):
+    return {'minimum': {'value': minimum}, 'maximum': {'value': maximum}}
+
+def record(number, og=(1.040, 1.050), fg=(1.008, 1.012), abv=(4.2, 5.3), ibu=(20, 30), srm=(3, 6)):
+    return StyleRecord.from_beerjson({
+        'style_id': number, 'name': number,
+        'original_gravity': bound(*og), 'final_gravity': bound(*fg),
+        'alcohol_by_volume': bound(*abv), 'international_bitterness_units': bound(*ibu), 'color': bound(*srm)
+    })
+
+def issues(report, kind):
+    return [(number, column) for number, column, found, _ in report.issues if found == kind]
+
+def test_values_are_typed_per_column():
+    report = ValidationReport()
+    row, = normalize_ranges([record('1A', ibu=(20.9, 30.2))], report)
+    assert row['OGMin'] == Decimal('1.040') and row['FGMax'] == Decimal('1.012')
+    assert row['ABVMin'] == Decimal('4.20') and row['ABVMax'] == Decimal('5.30')
+    assert (row['IBUMin'], row['IBUMax']) == (20, 30)
+    assert isinstance(row['SRMMin'], int)
+    assert report.issues == [] and report.style_count == 1
+
+def test_integer_gravities_are_divided_by_1000():
+    report = ValidationReport()
+    row, = normalize_ranges([record('1A', og=(1044, 1.052))], report)
+    assert row['OGMin'] == Decimal('1.044') and row['OGMax'] == Decimal('1.052')
+    assert issues(report, 'gravity_units') == [('1A', 'OGMin')]
+    assert not report.has_errors()
+
+def test_inverted_out_of_range_and_missing_values_are_reported():
+    report = ValidationReport()
+    rows = normalize_ranges([record('1A', abv=(6.0, 5.0)), record('1B', abv=(4.0, 120.0)),
+                             record('1C', srm=(None, 'n/a'))], report)
+    assert issues(report, 'inverted') == [('1A', 'ABVMin/ABVMax')]
+    assert issues(report, 'out_of_range') == [('1B', 'ABVMax')]
+    assert rows[1]['ABVMax'] is None and rows[1]['ABVMin'] == Decimal('4.00')
+    assert issues(report, 'missing') == [('1C', 'SRMMin'), ('1C', 'SRMMax')]
+    assert rows[2]['SRMMin'] is None and rows[2]['SRMMax'] is None
+    assert report.has_errors()
+
+def test_batches_agree_with_one_style_at_a_time(catalog_path):
+    records = list(iter_records(catalog_path))
+    batched = [row for _, row in iter_normalized(records, chunk_size=7)]
+    assert batched == [normalize_ranges([record])[0] for record in records]
+    assert len(batched) == len(records)
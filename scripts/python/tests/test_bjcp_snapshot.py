@@ -0,0 +1,107 @@
+import sqlite3
+from decimal import Decimal
+
+import pytest
+
+from bjcp_snapshot import SNAPSHOT_TABLES, StyleSnapshot, write_snapshot
+
+def style(style_id, number, name, category_id, abv=(None, None), ibu=(None, None), og=(None, None)):
+    return ((style_id, number, name, None, category_id, f"{name} description")
+            + abv + ibu + (None, None) + og + (None, None) + (None,) * 9)
+
+# Rows in the column order of SNAPSHOT_TABLES, as the export queries return them
+TABLE_ROWS = {
+    "BJCP_BeerCategory": [("cat-1", "1", "Standard American Beer", None, 1),
+                          ("cat-21", "21", "IPA", None, 2)],
+    "BeerStyle": [
+        style("s-1a", "1A", "American Light Lager", "cat-1",
+              (Decimal("2.8"), Decimal("4.2")), (8, 12), (Decimal("1.028"), Decimal("1.040"))),
+        style("s-21a", "21A", "American IPA", "cat-21",
+              (Decimal("5.5"), Decimal("7.5")), (40, 70), (Decimal("1.056"), Decimal("1.070"))),
+        style("s-21b", "21B", "Specialty IPA", "cat-21"),
+    ],
+    "BJCP_StyleTag": [("t-hoppy", "hoppy", "flavor", 2), ("t-pale", "pale-color", "color", 1)],
+    "BJCP_StyleTagMapping": [("s-21a", "t-hoppy"), ("s-21a", "t-pale"), ("s-1a", "t-pale")],
+    "BJCP_StyleCharacteristics": [("c-1", "s-21a", "aroma", "Citrus hops", ["citrus", "pine"])],
+    "BJCP_Brewery": [("b-sn", "sierra nevada", "Sierra Nevada", 1)],
+    "BJCP_CommercialExample": [("e-1", "s-21a", "Celebration", "Sierra Nevada", None, "b-sn"),
+                               ("e-2", "s-1a", "Bud Light", "Anheuser-Busch", None, None)],
+    "BJCP_StyleJudging": [("j-1", "s-21a", None, None, {"aroma": 12})],
+    "BJCP_StyleComparison": [("cmp-1", "s-21a", "s-1a", "Hoppier than a light lager.", "hoppier", "difference")],
+}
+
+def fetch_from(table_rows, batch_size=1000):
+    def fetch_rows(table, query):
+        rows = table_rows.get(table, [])
+        for i in range(0, len(rows), batch_size):
+            yield rows[i:i + batch_size]
+    return fetch_rows
+
+@pytest.fixture
+def snapshot(tmp_path):
+    version, counts = write_snapshot(str(tmp_path / 'catalog.sqlite'), fetch_from(TABLE_ROWS))
+    assert counts == {table: len(TABLE_ROWS[table]) for table, _, _ in SNAPSHOT_TABLES}
+    snapshot = StyleSnapshot(str(tmp_path / 'catalog.sqlite'))
+    assert snapshot.version == version
+    yield snapshot
+    snapshot.close()
+
+def numbers(styles):
+    return [row['BJCPNumber'] for row in styles]
+
+def test_style_lookups(snapshot):
+    assert snapshot.style("21A")['StyleName'] == "American IPA"
+    assert snapshot.style("21A")['OGMin'] == 1.056
+    assert snapshot.style("99Z") is None
+    assert numbers(snapshot.find_styles("ipa")) == ["21A", "21B"]
+    assert numbers(snapshot.styles_in_category("21")) == ["21A", "21B"]
+    assert numbers(snapshot.styles_with_tag("pale-color")) == ["1A", "21A"]
+    assert numbers(snapshot.styles_by_brewery("SIERRA NEVADA")) == ["21A"]
+
+def test_styles_in_range(snapshot):
+    assert numbers(snapshot.styles_in_range(abv=6, ibu=55)) == ["21A"]
+    assert numbers(snapshot.styles_in_range(abv=4.2)) == ["1A"]
+    assert snapshot.styles_in_range(abv=6, ibu=10) == []
+    # Styles without ranges only come back when no range is asked for
+    assert numbers(snapshot.styles_in_range()) == ["1A", "21A", "21B"]
+
+def test_style_details(snapshot):
+    assert [tag['TagName'] for tag in snapshot.tags("s-21a")] == ["pale-color", "hoppy"]
+    assert snapshot.characteristics("s-21a") == [
+        {'CharacteristicType': "aroma", 'Description': "Citrus hops", 'Keywords': ["citrus", "pine"]}
+    ]
+    assert [example['BeerName'] for example in snapshot.examples("s-21a")] == ["Celebration"]
+    assert snapshot.comparisons("s-21a") == [
+        {'BJCPNumber': "1A", 'StyleName': "American Light Lager", 'Relationship': "hoppier",
+         'ComparisonType': "difference"}
+    ]
+    assert snapshot.comparisons("s-1a") == []
+
+def test_version_depends_only_on_the_rows(tmp_path, snapshot):
+    path = str(tmp_path / 'again.sqlite')
+    assert write_snapshot(path, fetch_from(TABLE_ROWS, batch_size=1))[0] == snapshot.version
+
+    renamed = dict(TABLE_ROWS, BJCP_StyleTag=[("t-hoppy", "hop-forward", "flavor", 2),
+                                              TABLE_ROWS["BJCP_StyleTag"][1]])
+    assert write_snapshot(path, fetch_from(renamed))[0] != snapshot.version
+
+def test_rewrite_replaces_the_file_for_new_readers(tmp_path, snapshot):
+    path = str(tmp_path / 'catalog.sqlite')
+    fewer = dict(TABLE_ROWS, BeerStyle=TABLE_ROWS["BeerStyle"][:2])
+    version, _ = write_snapshot(path, fetch_from(fewer))
+    # The open snapshot keeps its view; a reopened one sees the new file
+    assert snapshot.style("21B") is not None
+    reopened = StyleSnapshot(path)
+    assert (reopened.version, reopened.style("21B")) == (version, None)
+    reopened.close()
+    assert list(tmp_path.iterdir()) == [tmp_path / 'catalog.sqlite']
+
+def test_other_formats_are_refused(tmp_path):
+    path = str(tmp_path / 'catalog.sqlite')
+    write_snapshot(path, fetch_from(TABLE_ROWS))
+    conn = sqlite3.connect(path)
+    conn.execute('UPDATE "SnapshotInfo" SET "Value" = \'1\' WHERE "Key" = \'format\'')
+    conn.commit()
+    conn.close()
+    with pytest.raises(ValueError, match="format 1"):
+        StyleSnapshot(path)
@@ -0,0 +1,45 @@
+import pytest
+
+from bjcp_tags import TagClassifier, categorize_tag, normalize_tag
+
+RULES = [
+    {'category': 'strength', 'terms': ['high', 'very-high', 'session']},
+    {'category': 'fermentation', 'terms': ['ale', 'top-fermented']},
+    {'category': 'color', 'terms': ['pale', 'dark']}
+]
+
+@pytest.mark.parametrize('tag, normalized', [
+    ('pale-ale-family', 'pale ale family'),
+    ('TopFermented', 'top fermented'),
+    ('  Very_High  ', 'very high'),
+    ('north-america', 'north america')
+])
+def test_normalize_tag(tag, normalized):
+    assert normalize_tag(tag) == normalized
+
+def test_every_matching_category_in_priority_order():
+    classifier = TagClassifier(RULES)
+    assert classifier.labels('pale-ale') == ('fermentation', 'color')
+    assert classifier.categorize('dark-session') == 'strength'
+
+def test_terms_match_whole_words_only():
+    classifier = TagClassifier(RULES)
+    # 'ale' is inside 'pale' and 'highland' contains 'high', but neither is a word of its own
+    assert classifier.labels('pale') == ('color',)
+    assert classifier.labels('highland') == ('other',)
+
+def test_longest_term_wins():
+    classifier = TagClassifier([{'category': 'high', 'terms': ['high']},
+                                {'category': 'very high', 'terms': ['very-high']}])
+    assert classifier.labels('very-high-strength') == ('very high',)
+
+def test_fallback_and_memoization():
+    classifier = TagClassifier(RULES, fallback='misc')
+    assert classifier.categorize('wood-aged') == 'misc'
+    assert classifier.labels('wood-aged') is classifier.labels('wood-aged')
+
+def test_default_rule_file():
+    assert categorize_tag('pale-ale-family') == 'fermentation'
+    assert categorize_tag('very-high-strength') == 'strength'
+    assert categorize_tag('amber-color') == 'color'
+    assert categorize_tag('wood') == 'other'
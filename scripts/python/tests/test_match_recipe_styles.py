@@ -0,0 +1,111 @@
+import json
+import math
+
+import numpy as np
+import pytest
+
+from bjcp_normalize import RANGE_COLUMNS
+from bjcp_records import RANGE_FIELDS
+from match_recipe_styles import MIN_TOLERANCE, PARAMETER_WEIGHTS, StyleRanges, match_rows
+from populate_bjcp_data import iter_entries
+
+NAN = float('nan')
+
+# Styles with only one bound, open-ended on the other side
+HALF_OPEN_STYLES = [
+    ("open-og", [(1.060, NAN), (NAN, NAN), (NAN, NAN), (NAN, NAN), (NAN, NAN)]),
+    ("open-ibu", [(NAN, NAN), (NAN, NAN), (NAN, NAN), (NAN, 20), (NAN, NAN)]),
+]
+
+@pytest.fixture(scope='module')
+def guide_ranges(catalog_path):
+    style_ids = []
+    bounds = []
+    for entry in iter_entries(catalog_path):
+        style_ids.append(entry['number'])
+        bounds.append([tuple(NAN if entry['style'][column] is None else float(entry['style'][column])
+                             for column in RANGE_COLUMNS[field]) for field in RANGE_FIELDS])
+    # A copy of 1A ties with it on every recipe
+    style_ids.append("1A-copy")
+    bounds.append(bounds[style_ids.index("1A")])
+    for style_id, style_bounds in HALF_OPEN_STYLES:
+        style_ids.append(style_id)
+        bounds.append(style_bounds)
+    values = np.array(bounds, dtype=np.float64)
+    return StyleRanges(style_ids, values[:, :, 0].copy(), values[:, :, 1].copy())
+
+@pytest.fixture(scope='module')
+def recipes(guide_ranges):
+    rng = np.random.default_rng(11)
+    lower = np.nanmin(guide_ranges.minimums, axis=0)
+    upper = np.nanmax(guide_ranges.maximums, axis=0)
+    estimates = rng.uniform(lower, upper, size=(300, len(RANGE_FIELDS)))
+    estimates[rng.random(estimates.shape) < 0.2] = NAN
+    # Midpoints of real styles fall inside several overlapping ranges, so scores tie at 100
+    midpoints = (guide_ranges.minimums[:40] + guide_ranges.maximums[:40]) / 2
+    estimates = np.vstack([estimates, midpoints, np.full((2, len(RANGE_FIELDS)), NAN)])
+    return [f"recipe-{i}" for i in range(len(estimates))], estimates
+
+def reference_matches(estimates, minimums, maximums, k):
+    """Score each recipe against each style one value at a time: [(recipe, style, match, within)]."""
+    matches = []
+    for r, values in enumerate(estimates.tolist()):
+        scored = []
+        for s, (lows, highs) in enumerate(zip(minimums.tolist(), maximums.tolist())):
+            weighted = total = 0.0
+            within = True
+            for field, value, low, high in zip(RANGE_FIELDS, values, lows, highs):
+                if math.isnan(value) or (math.isnan(low) and math.isnan(high)):
+                    continue
+                low = -math.inf if math.isnan(low) else low
+                high = math.inf if math.isnan(high) else high
+                width = max(0.0 if math.isinf(high - low) else high - low, MIN_TOLERANCE[field])
+                distance = max(low - value, value - high, 0.0)
+                weighted += PARAMETER_WEIGHTS[field] * min(max(1.0 - distance / width, 0.0), 1.0)
+                total += PARAMETER_WEIGHTS[field]
+                within = within and low <= value <= high
+            scored.append((100.0 * (weighted / total) if total else 0.0, total > 0 and within, s, total > 0))
+        if not any(comparable for _, _, _, comparable in scored):
+            continue
+        scored.sort(key=lambda item: -item[0])
+        matches.extend((r, s, match, within) for match, within, s, _ in scored[:k])
+    return matches
+
+@pytest.mark.parametrize('k', [1, 5, 200])
+def test_matches_agree_with_a_per_recipe_loop(guide_ranges, recipes, k):
+    recipe_ids, estimates = recipes
+    rows = match_rows(recipe_ids, estimates, guide_ranges, k)
+    expected = reference_matches(estimates, guide_ranges.minimums, guide_ranges.maximums, k)
+
+    assert [(row[0], row[1]) for row in rows] == [(recipe_ids[r], guide_ranges.style_ids[s])
+                                                  for r, s, _, _ in expected]
+    assert [row[2] for row in rows] == pytest.approx([match for _, _, match, _ in expected], abs=0.005)
+    assert [row[3] for row in rows] == [within for _, _, _, within in expected]
+
+def test_k_larger_than_the_style_count_returns_every_style(guide_ranges, recipes):
+    recipe_ids, estimates = recipes
+    rows = match_rows(recipe_ids[:1], estimates[:1], guide_ranges, 1000)
+    assert sorted(row[1] for row in rows) == sorted(guide_ranges.style_ids)
+
+def test_recipes_without_estimates_get_no_rows(guide_ranges):
+    estimates = np.array([[NAN] * len(RANGE_FIELDS), [1.050] + [NAN] * (len(RANGE_FIELDS) - 1)])
+    rows = match_rows(["none", "og-only"], estimates, guide_ranges, 3)
+    assert {row[0] for row in rows} == {"og-only"}
+
+def test_ties_keep_style_order(guide_ranges):
+    lows, highs = guide_ranges.minimums[0], guide_ranges.maximums[0]
+    rows = match_rows(["mid"], ((lows + highs) / 2)[None], guide_ranges, len(guide_ranges.style_ids))
+    perfect = [row[1] for row in rows if row[2] == 100.0]
+    assert perfect == sorted(perfect, key=guide_ranges.style_ids.index)
+    assert perfect.index("1A-copy") > perfect.index("1A")
+
+def test_half_open_ranges(guide_ranges):
+    estimates = np.array([[1.100, NAN, NAN, 10, NAN], [1.040, NAN, NAN, 40, NAN]])
+    rows = {(row[0], row[1]): row for row in match_rows(["big", "small"], estimates, guide_ranges, 1000)}
+    assert rows["big", "open-og"][2:4] == (100.0, True)
+    assert rows["big", "open-ibu"][2:4] == (100.0, True)
+    assert rows["small", "open-og"][3] is False
+    assert rows["small", "open-ibu"][3] is False
+    breakdown = json.loads(rows["small", "open-og"][4])
+    assert list(breakdown) == ['og'] and breakdown['og']['target'] == '1.060'
+    assert rows["small", "open-og"][5] == ["Raise OG from 1.04 to at least 1.060"]